@@ -0,0 +1,70 @@
+"""add_tenant_schema_pool
+
+Revision ID: 3f1c2b7d9e40
+Revises: a2a4d4e49528
+Create Date: 2026-10-17 10:12:41.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2b7d9e40'
+down_revision: Union[str, None] = 'a2a4d4e49528'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 1. 预置池表
+    op.create_table('tenant_schema_pool',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('schema_name', sa.String(length=63), nullable=False),
+    sa.Column('plan_type', sa.String(length=20), nullable=False),
+    sa.Column('template_version', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('schema_name'),
+    schema='public'
+    )
+    op.create_index(op.f('ix_public_tenant_schema_pool_id'), 'tenant_schema_pool', ['id'], unique=False, schema='public')
+    op.create_index(op.f('ix_public_tenant_schema_pool_plan_type'), 'tenant_schema_pool', ['plan_type'], unique=False, schema='public')
+
+    # 2. 认领函数：原子地取出一个预置schema并重命名为目标schema
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.claim_pooled_schema(p_plan_type text, p_template_version text, p_target text)
+    RETURNS boolean
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        pooled text;
+    BEGIN
+        DELETE FROM public.tenant_schema_pool
+        WHERE id = (
+            SELECT id FROM public.tenant_schema_pool
+            WHERE plan_type = p_plan_type AND template_version = p_template_version
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING schema_name INTO pooled;
+
+        IF pooled IS NULL THEN
+            RETURN false;
+        END IF;
+
+        EXECUTE format('ALTER SCHEMA %I RENAME TO %I', pooled, p_target);
+        RETURN true;
+    END;
+    $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS public.claim_pooled_schema(text, text, text)")
+    op.drop_index(op.f('ix_public_tenant_schema_pool_plan_type'), table_name='tenant_schema_pool', schema='public')
+    op.drop_index(op.f('ix_public_tenant_schema_pool_id'), table_name='tenant_schema_pool', schema='public')
+    op.drop_table('tenant_schema_pool', schema='public')
@@ -0,0 +1,58 @@
+"""add_tenant_changed_notify
+
+Revision ID: 5d8e7a1c4b26
+Revises: 3f1c2b7d9e40
+Create Date: 2026-10-17 15:03:27.402116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e7a1c4b26'
+down_revision: Union[str, None] = '3f1c2b7d9e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户增删改后通知各worker失效缓存，payload为受影响的缓存键（新旧值）：
+    # [["tenant_id", ...], ["domain", ...], ["schema_name", ...], ...]
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.notify_tenant_changed()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        keys jsonb := '[]'::jsonb;
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            keys := keys || jsonb_build_array(
+                jsonb_build_array('tenant_id', OLD.tenant_id),
+                jsonb_build_array('domain', OLD.domain),
+                jsonb_build_array('schema_name', OLD.schema_name));
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            keys := keys || jsonb_build_array(
+                jsonb_build_array('tenant_id', NEW.tenant_id),
+                jsonb_build_array('domain', NEW.domain),
+                jsonb_build_array('schema_name', NEW.schema_name));
+        END IF;
+        PERFORM pg_notify('tenant_changed', keys::text);
+        RETURN NULL;
+    END;
+    $$
+    """)
+    op.execute("""
+    CREATE TRIGGER tenants_notify_changed
+    AFTER INSERT OR UPDATE OR DELETE ON public.tenants
+    FOR EACH ROW EXECUTE FUNCTION public.notify_tenant_changed()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS tenants_notify_changed ON public.tenants")
+    op.execute("DROP FUNCTION IF EXISTS public.notify_tenant_changed()")
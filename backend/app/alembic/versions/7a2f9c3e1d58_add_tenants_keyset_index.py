@@ -0,0 +1,27 @@
+"""add_tenants_keyset_index
+
+Revision ID: 7a2f9c3e1d58
+Revises: 5d8e7a1c4b26
+Create Date: 2026-10-17 16:41:09.572310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2f9c3e1d58'
+down_revision: Union[str, None] = '5d8e7a1c4b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 游标分页按 (created_at, id) 排序和比较
+    op.create_index('ix_public_tenants_created_at_id', 'tenants', ['created_at', 'id'], unique=False, schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_public_tenants_created_at_id', table_name='tenants', schema='public')
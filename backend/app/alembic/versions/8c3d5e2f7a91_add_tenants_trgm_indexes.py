@@ -0,0 +1,37 @@
+"""add_tenants_trgm_indexes
+
+Revision ID: 8c3d5e2f7a91
+Revises: 7a2f9c3e1d58
+Create Date: 2026-10-17 18:20:44.916537
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3d5e2f7a91'
+down_revision: Union[str, None] = '7a2f9c3e1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 租户搜索字段
+SEARCH_COLUMNS = ['name', 'domain', 'tenant_id']
+
+
+def upgrade() -> None:
+    # 三元组索引支持 ILIKE '%关键词%' 及 word_similarity 相关度计算
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_public_tenants_{column}_trgm', 'tenants', [column], unique=False, schema='public',
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_public_tenants_{column}_trgm', table_name='tenants', schema='public')
+    # pg_trgm可能被其他对象使用，不在此处删除扩展
@@ -0,0 +1,38 @@
+"""add_tenant_migration_checkpoints
+
+Revision ID: 9e4b1f6c2a37
+Revises: 8c3d5e2f7a91
+Create Date: 2026-10-17 21:05:12.630419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b1f6c2a37'
+down_revision: Union[str, None] = '8c3d5e2f7a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户schema迁移断点：每个批次中各schema的迁移结果，用于续跑和排查
+    op.create_table('tenant_migration_checkpoints',
+    sa.Column('run_id', sa.String(length=32), nullable=False),
+    sa.Column('schema_name', sa.String(length=63), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('from_version', sa.String(length=32), nullable=True),
+    sa.Column('to_version', sa.String(length=32), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('run_id', 'schema_name'),
+    schema='public'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tenant_migration_checkpoints', schema='public')
@@ -0,0 +1,35 @@
+"""add_tenant_api_usage
+
+Revision ID: b3d7e9a15c40
+Revises: 9e4b1f6c2a37
+Create Date: 2026-10-17 22:14:36.185302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7e9a15c40'
+down_revision: Union[str, None] = '9e4b1f6c2a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户API用量：按(租户, 月份)累计，限流中间件定期批量upsert
+    op.create_table('tenant_api_usage',
+    sa.Column('tenant_id', sa.String(length=50), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('request_count', sa.BigInteger(), nullable=False),
+    sa.Column('throttled_count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id', 'period'),
+    schema='public'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tenant_api_usage', schema='public')
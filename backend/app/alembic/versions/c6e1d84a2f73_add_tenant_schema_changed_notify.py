@@ -0,0 +1,82 @@
+"""add_tenant_schema_changed_notify
+
+Revision ID: c6e1d84a2f73
+Revises: e7b3c9d25f18
+Create Date: 2026-10-18 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e1d84a2f73'
+down_revision: Union[str, None] = 'e7b3c9d25f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户schema（tenant_前缀）创建、改名、删除后通知各worker增量更新schema集合缓存，
+    # payload为 ["add" / "drop", schema名称]；改名只能取到新名称
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.notify_tenant_schema_added()
+    RETURNS event_trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        schema_name name;
+    BEGIN
+        FOR schema_name IN
+            SELECT n.nspname FROM pg_event_trigger_ddl_commands() c
+            JOIN pg_namespace n ON n.oid = c.objid
+            WHERE c.object_type = 'schema' AND n.nspname LIKE 'tenant\\_%'
+        LOOP
+            PERFORM pg_notify('tenant_schema_changed', json_build_array('add', schema_name)::text);
+        END LOOP;
+    END;
+    $$
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.notify_tenant_schema_dropped()
+    RETURNS event_trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        schema_name text;
+    BEGIN
+        FOR schema_name IN
+            SELECT object_name FROM pg_event_trigger_dropped_objects()
+            WHERE object_type = 'schema' AND object_name LIKE 'tenant\\_%'
+        LOOP
+            PERFORM pg_notify('tenant_schema_changed', json_build_array('drop', schema_name)::text);
+        END LOOP;
+    END;
+    $$
+    """)
+    # 事件触发器需要超级用户；没有权限时跳过，缓存退化为定期全量同步 + 未命中回查
+    op.execute("""
+    DO $$
+    BEGIN
+        IF (SELECT rolsuper FROM pg_roles WHERE rolname = current_user) THEN
+            EXECUTE 'CREATE EVENT TRIGGER tenant_schema_added_notify ON ddl_command_end '
+                    'WHEN TAG IN (''CREATE SCHEMA'', ''ALTER SCHEMA'') '
+                    'EXECUTE FUNCTION public.notify_tenant_schema_added()';
+            EXECUTE 'CREATE EVENT TRIGGER tenant_schema_dropped_notify ON sql_drop '
+                    'WHEN TAG IN (''DROP SCHEMA'') '
+                    'EXECUTE FUNCTION public.notify_tenant_schema_dropped()';
+        ELSE
+            RAISE NOTICE '当前用户不是超级用户，未创建租户schema变更事件触发器';
+        END IF;
+    END;
+    $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP EVENT TRIGGER IF EXISTS tenant_schema_dropped_notify")
+    op.execute("DROP EVENT TRIGGER IF EXISTS tenant_schema_added_notify")
+    op.execute("DROP FUNCTION IF EXISTS public.notify_tenant_schema_dropped()")
+    op.execute("DROP FUNCTION IF EXISTS public.notify_tenant_schema_added()")
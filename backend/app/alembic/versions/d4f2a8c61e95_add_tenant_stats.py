@@ -0,0 +1,129 @@
+"""add_tenant_stats
+
+Revision ID: d4f2a8c61e95
+Revises: b3d7e9a15c40
+Create Date: 2026-10-17 23:02:51.447120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f2a8c61e95'
+down_revision: Union[str, None] = 'b3d7e9a15c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户统计汇总：每个租户一行
+    op.create_table('tenant_stats',
+    sa.Column('tenant_id', sa.String(length=50), nullable=False),
+    sa.Column('total_users', sa.BigInteger(), nullable=False),
+    sa.Column('active_users', sa.BigInteger(), nullable=False),
+    sa.Column('new_users_period', sa.Date(), nullable=True),
+    sa.Column('new_users_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id'),
+    schema='public'
+    )
+
+    # 租户schema中users表的语句级触发器函数（触发器由租户迁移创建）：
+    # 按转换表汇总本条语句带来的用户数变化，累加到 public.tenant_stats；
+    # 模板和预置池schema在 public.tenants 中没有登记，直接忽略
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.tenant_stats_users_changed()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        tid varchar(50);
+        month_start timestamp := date_trunc('month', now() AT TIME ZONE 'UTC');
+        d_total bigint := 0;
+        d_active bigint := 0;
+        d_new bigint := 0;
+        n_total bigint;
+        n_active bigint;
+        n_new bigint;
+    BEGIN
+        SELECT tenant_id INTO tid FROM public.tenants WHERE schema_name = TG_TABLE_SCHEMA;
+        IF tid IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT count(*), count(*) FILTER (WHERE status = 'active'),
+                   count(*) FILTER (WHERE created_at >= month_start AT TIME ZONE 'UTC')
+            INTO n_total, n_active, n_new FROM new_rows;
+            d_total := d_total + n_total;
+            d_active := d_active + n_active;
+            d_new := d_new + n_new;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            SELECT count(*), count(*) FILTER (WHERE status = 'active'),
+                   count(*) FILTER (WHERE created_at >= month_start AT TIME ZONE 'UTC')
+            INTO n_total, n_active, n_new FROM old_rows;
+            d_total := d_total - n_total;
+            d_active := d_active - n_active;
+            d_new := d_new - n_new;
+        END IF;
+        IF d_total = 0 AND d_active = 0 AND d_new = 0 THEN
+            RETURN NULL;
+        END IF;
+
+        INSERT INTO public.tenant_stats AS s
+            (tenant_id, total_users, active_users, new_users_period, new_users_count, updated_at)
+        VALUES (tid, d_total, d_active, month_start::date, d_new, now())
+        ON CONFLICT (tenant_id) DO UPDATE SET
+            total_users = s.total_users + EXCLUDED.total_users,
+            active_users = s.active_users + EXCLUDED.active_users,
+            new_users_count = CASE WHEN s.new_users_period = EXCLUDED.new_users_period
+                                   THEN s.new_users_count + EXCLUDED.new_users_count
+                                   ELSE EXCLUDED.new_users_count END,
+            new_users_period = EXCLUDED.new_users_period,
+            updated_at = now();
+        RETURN NULL;
+    END;
+    $$
+    """)
+
+    # 租户schema中audit_logs表的语句级触发器函数：记录最近活动时间
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.tenant_stats_audit_logged()
+    RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        tid varchar(50);
+        latest timestamptz;
+    BEGIN
+        SELECT tenant_id INTO tid FROM public.tenants WHERE schema_name = TG_TABLE_SCHEMA;
+        IF tid IS NULL THEN
+            RETURN NULL;
+        END IF;
+        SELECT max(created_at) INTO latest FROM new_rows;
+        IF latest IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        INSERT INTO public.tenant_stats AS s
+            (tenant_id, total_users, active_users, new_users_count, last_activity_at, updated_at)
+        VALUES (tid, 0, 0, 0, latest, now())
+        ON CONFLICT (tenant_id) DO UPDATE SET
+            last_activity_at = GREATEST(s.last_activity_at, EXCLUDED.last_activity_at),
+            updated_at = now();
+        RETURN NULL;
+    END;
+    $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS public.tenant_stats_audit_logged() CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS public.tenant_stats_users_changed() CASCADE")
+    op.drop_table('tenant_stats', schema='public')
@@ -0,0 +1,35 @@
+"""add_tenant_storage_usage
+
+Revision ID: e7b3c9d25f18
+Revises: d4f2a8c61e95
+Create Date: 2026-10-17 23:41:08.912547
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9d25f18'
+down_revision: Union[str, None] = 'd4f2a8c61e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 租户存储用量：每个租户一行，存储统计任务整体覆盖
+    op.create_table('tenant_storage_usage',
+    sa.Column('tenant_id', sa.String(length=50), nullable=False),
+    sa.Column('table_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('index_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('used_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('measured_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id'),
+    schema='public'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tenant_storage_usage', schema='public')
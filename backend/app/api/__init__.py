@@ -1,6 +1,21 @@
 # API package
-from .tenant import tenant_router
+# 路由按需导入：只用到某个路由时不加载其余路由模块（见 app.main 中的延迟路由）
+from importlib import import_module
+
+_ROUTER_MODULES = {
+    "tenant_router": ".tenant",
+    "system_router": ".system",
+    "audit_router": ".audit",
+}
 
 __all__ = [
-    "tenant_router"
+    "tenant_router",
+    "system_router",
+    "audit_router"
 ]
+
+
+def __getattr__(name):
+    if name in _ROUTER_MODULES:
+        return getattr(import_module(_ROUTER_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,6 @@
+# Audit API package
+from .audit_api import router as audit_router
+
+__all__ = [
+    "audit_router"
+]
@@ -0,0 +1,131 @@
+"""
+审计日志API接口
+
+租户由请求的自定义域名或平台子域名、路径、tenant_id 查询参数或 X-Tenant-ID 请求头确定（见 app.core.tenant_resolver），
+只能读取当前租户schema中的审计日志。
+"""
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db_metrics import tag_request_tenant
+from app.core.tenant_context import get_tenant_db, get_tenant_dependency, require_tenant_plan_type, tenant_db_session
+from app.schemas.audit import AuditLogListResponse
+from app.services.audit import AuditLogService, parse_details_filter
+
+router = APIRouter(prefix="/audit-logs", tags=["审计日志"])
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _bad_request(field: str, message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "code": 400,
+            "message": "请求参数验证失败",
+            "errors": [{"field": field, "message": message}]
+        }
+    )
+
+
+def _audit_filters(
+    action: Optional[str] = Query(None, description="操作，如 user.login"),
+    resource_type: Optional[str] = Query(None, description="资源类型"),
+    resource_id: Optional[str] = Query(None, description="资源ID（与resource_type一起使用）"),
+    user_id: Optional[int] = Query(None, description="操作用户ID"),
+    since: Optional[datetime] = Query(None, description="起始时间（含）"),
+    until: Optional[datetime] = Query(None, description="结束时间（不含）"),
+    details: Optional[str] = Query(None, description='details包含的JSON对象，如 {"field": "title"}')
+) -> dict:
+    """审计日志过滤条件"""
+    try:
+        details_filter = parse_details_filter(details)
+    except ValueError as e:
+        raise _bad_request("details", str(e))
+    if since and until and since >= until:
+        raise _bad_request("until", "结束时间必须晚于起始时间")
+    return {
+        "action": action, "resource_type": resource_type, "resource_id": resource_id, "user_id": user_id,
+        "since": since, "until": until, "details": details_filter,
+    }
+
+
+@router.get("",
+            response_model=AuditLogListResponse,
+            summary="查询审计日志",
+            description="按条件查询当前租户的审计日志（游标分页，从新到旧）")
+async def list_audit_logs(
+    size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(_audit_filters),
+    db: AsyncSession = Depends(get_tenant_db)
+):
+    """
+    查询审计日志
+
+    - **size**: 每页数量（默认50）
+    - **cursor**: 翻页游标，取自上一页的 next_cursor（更早）/ prev_cursor（更新）
+    - **action / resource_type / resource_id / user_id**: 精确匹配
+    - **since / until**: 时间范围 [since, until)
+    - **details**: JSON对象，返回 details 包含该对象的日志
+    """
+    try:
+        result = await AuditLogService(db).list_audit_logs(size=size, cursor=cursor, **filters)
+        return AuditLogListResponse(
+            code=200,
+            message="获取成功",
+            data=result
+        )
+
+    except ValueError as e:
+        raise _bad_request("cursor", str(e))
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "code": 500,
+                "message": f"查询审计日志失败: {str(e)}",
+                "errors": [{"field": "general", "message": str(e)}]
+            }
+        )
+
+
+@router.get("/export",
+            summary="导出审计日志",
+            description="按条件流式导出当前租户的审计日志（CSV或NDJSON，从旧到新）")
+async def export_audit_logs(
+    format: Literal["csv", "ndjson"] = "ndjson",
+    filters: dict = Depends(_audit_filters),
+    tenant_id: str = Depends(get_tenant_dependency)
+):
+    """
+    导出审计日志
+
+    过滤条件同查询接口；结果通过服务端游标分批读取并逐块输出，适合导出大时间范围。
+
+    - **format**: 导出格式 csv / ndjson（默认ndjson）
+    """
+    plan_type = await require_tenant_plan_type(tenant_id)
+    tag_request_tenant(tenant_id)
+
+    # 请求级依赖（get_tenant_db）可能在响应体发送前就已清理，
+    # 导出在生成器内自行占用准入名额和租户会话，直到输出结束或客户端断开
+    async def chunks():
+        async with tenant_db_session(tenant_id, plan_type) as db:
+            yield ""
+            async for chunk in AuditLogService(db).export(format, **filters):
+                yield chunk
+
+    body = chunks()
+    # 先执行到取得会话为止，排队超时在响应开始前返回503
+    await anext(body)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="audit_logs.{format}"'}
+    )
@@ -0,0 +1,6 @@
+# System API package
+from .system_api import router as system_router
+
+__all__ = [
+    "system_router"
+]
@@ -0,0 +1,22 @@
+"""
+系统运维API接口
+"""
+from fastapi import APIRouter
+
+from app.core.metrics import registry
+
+router = APIRouter(prefix="/system", tags=["系统运维"])
+
+
+@router.get("/metrics",
+            summary="获取运行指标",
+            description="获取当前进程的运行指标快照（预置池深度、认领耗时、补充速率等）")
+async def get_metrics():
+    """
+    获取当前进程的运行指标快照
+    """
+    return {
+        "code": 200,
+        "message": "获取成功",
+        "data": registry.snapshot()
+    }
@@ -1,18 +1,28 @@
 """
 租户API接口
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
+import asyncio
+import json
+import tempfile
 
-from app.core.pq_db import get_db
-from app.services.tenant import TenantService
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Literal, Optional
+
+from app.config import settings
+from app.core.pagination import PaginationParamError
+from app.core.pq_db import get_async_db
+from app.core.responses import model_response, row_values
+from app.services.tenant import AsyncTenantService, TenantBulkImporter, parse_rows, read_chunks
 from app.schemas.tenant import (
     TenantCreateRequest,
     TenantCreateResponse,
+    TenantData,
     TenantResponse,
     TenantListResponse,
-    TenantUpdateRequest
+    TenantUpdateRequest,
+    TenantStatsResponse
 )
 
 router = APIRouter(prefix="/tenants", tags=["租户管理"])
@@ -25,7 +35,7 @@ router = APIRouter(prefix="/tenants", tags=["租户管理"])
              description="租户自助注册，提供公司信息，自动生成tenant_id和管理员账号")
 async def register_tenant(
     tenant_data: TenantCreateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     租户自助注册接口
@@ -39,16 +49,16 @@ async def register_tenant(
     """
     try:
         # 创建租户服务实例
-        tenant_service = TenantService(db)
+        tenant_service = AsyncTenantService(db)
         
         # 调用服务层创建租户
-        result = tenant_service.create_tenant(tenant_data.dict())
+        result = await tenant_service.create_tenant(tenant_data)
         
-        return TenantCreateResponse(
-            code=201,
-            message="租户注册成功",
-            data=result
-        )
+        return model_response(TenantCreateResponse, {
+            "code": 201,
+            "message": "租户注册成功",
+            "data": result
+        }, status_code=status.HTTP_201_CREATED)
         
     except ValueError as e:
         # 参数验证失败
@@ -73,12 +83,48 @@ async def register_tenant(
         )
 
 
+@router.post("/bulk-register",
+             summary="批量注册租户",
+             description="流式导入NDJSON或CSV格式的租户列表，逐行返回处理结果（NDJSON）")
+async def bulk_register_tenants(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None
+):
+    """
+    批量注册租户
+
+    请求体为NDJSON（每行一个与注册接口相同的JSON对象）或CSV（首行列名，
+    管理员字段使用 admin_user.email 等点号列名）。
+
+    - **format**: 输入格式 ndjson / csv（默认按Content-Type判断，text/csv为CSV，其余为NDJSON）
+
+    响应为NDJSON流：每行一个结果 {"row", "status": created/error, ...}，最后一行为 {"summary": {...}}
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    # StreamingResponse 输出期间会读取 receive() 监听客户端断开，先读完请求体（较大时暂存到临时文件）再开始响应
+    body = tempfile.SpooledTemporaryFile(max_size=settings.TENANT_IMPORT_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        await asyncio.to_thread(body.write, chunk)
+    body.seek(0)
+    importer = TenantBulkImporter()
+
+    async def results():
+        # 客户端断开时生成器被关闭，导入随之取消，未完成的租户事务回滚
+        try:
+            async for result in importer.run(parse_rows(read_chunks(body), fmt)):
+                yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        finally:
+            body.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @router.get("/me", 
             response_model=TenantResponse,
             summary="获取当前租户信息",
             description="获取当前登录用户所属租户的详细信息")
 async def get_current_tenant(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # 这里需要添加租户上下文依赖，暂时省略
 ):
     """
@@ -116,24 +162,30 @@ async def get_current_tenant(
 @router.get("/", 
             response_model=TenantListResponse,
             summary="获取租户列表",
-            description="获取租户列表（分页），需要超级管理员权限")
+            description="获取租户列表（页码分页或游标分页），需要超级管理员权限")
 async def list_tenants(
     page: int = 1,
     size: int = 20,
-    status: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
     plan_type: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    pagination: Literal["page", "cursor"] = "page",
+    cursor: Optional[str] = None,
+    total: Optional[Literal["exact", "estimated", "none"]] = None,
+    db: AsyncSession = Depends(get_async_db)
     # 这里需要添加超级管理员权限验证，暂时省略
 ):
     """
     获取租户列表（分页）
     
-    - **page**: 页码（默认1）
+    - **page**: 页码（默认1，页码分页）
     - **size**: 每页数量（默认20）
     - **status**: 状态过滤（可选）
     - **plan_type**: 套餐类型过滤（可选）
     - **search**: 搜索关键词（可选）
+    - **pagination**: 分页方式 page / cursor（默认page；传入cursor时按游标分页）
+    - **cursor**: 翻页游标，取自上一页的 next_cursor / prev_cursor
+    - **total**: 总数模式 exact / estimated / none（默认页码分页exact，游标分页none）
     """
     try:
         # TODO: 验证超级管理员权限
@@ -141,21 +193,37 @@ async def list_tenants(
         #     raise HTTPException(status_code=403, detail="权限不足")
         
         # 创建租户服务实例
-        tenant_service = TenantService(db)
+        tenant_service = AsyncTenantService(db)
         
         # 调用服务层获取租户列表
-        result = tenant_service.list_tenants(
+        result = await tenant_service.list_tenants(
             page=page,
             size=size,
-            status=status,
+            status=status_filter,
             plan_type=plan_type,
-            search=search
+            search=search,
+            cursor=cursor,
+            pagination=pagination,
+            total_mode=total
         )
         
-        return TenantListResponse(
-            code=200,
-            message="获取成功",
-            data=result
+        return model_response(TenantListResponse, {
+            "code": 200,
+            "message": "获取成功",
+            "data": {
+                "tenants": [row_values(tenant, TenantData) for tenant in result["tenants"]],
+                "pagination": result["pagination"]
+            }
+        })
+        
+    except PaginationParamError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": 400,
+                "message": "请求参数验证失败",
+                "errors": [{"field": e.field, "message": str(e)}]
+            }
         )
         
     except Exception as e:
@@ -175,7 +243,7 @@ async def list_tenants(
             description="获取指定租户的详细信息，需要超级管理员权限")
 async def get_tenant(
     tenant_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # 这里需要添加超级管理员权限验证，暂时省略
 ):
     """
@@ -189,10 +257,10 @@ async def get_tenant(
         #     raise HTTPException(status_code=403, detail="权限不足")
         
         # 创建租户服务实例
-        tenant_service = TenantService(db)
+        tenant_service = AsyncTenantService(db)
         
         # 调用服务层获取租户信息
-        tenant = tenant_service.get_tenant(tenant_id)
+        tenant = await tenant_service.get_tenant(tenant_id)
         
         if not tenant:
             raise HTTPException(
@@ -204,11 +272,11 @@ async def get_tenant(
                 }
             )
         
-        return TenantResponse(
-            code=200,
-            message="获取成功",
-            data=tenant_service._format_tenant_response(tenant)
-        )
+        return model_response(TenantResponse, {
+            "code": 200,
+            "message": "获取成功",
+            "data": row_values(tenant, TenantData)
+        })
         
     except HTTPException:
         raise
@@ -223,6 +291,53 @@ async def get_tenant(
         )
 
 
+@router.get("/{tenant_id}/stats",
+            response_model=TenantStatsResponse,
+            summary="获取租户统计信息",
+            description="获取租户的用户、存储、API用量和账单统计，读取预先汇总的统计数据")
+async def get_tenant_stats(
+    tenant_id: str,
+    db: AsyncSession = Depends(get_async_db)
+    # 这里需要添加权限验证，暂时省略
+):
+    """
+    获取租户统计信息
+    
+    - **tenant_id**: 租户ID
+    """
+    try:
+        tenant_service = AsyncTenantService(db)
+        stats = await tenant_service.get_tenant_stats(tenant_id)
+        
+        if not stats:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "code": 404,
+                    "message": "租户不存在",
+                    "errors": [{"field": "tenant_id", "message": f"租户 {tenant_id} 不存在"}]
+                }
+            )
+        
+        return model_response(TenantStatsResponse, {
+            "code": 200,
+            "message": "获取成功",
+            "data": stats
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "code": 500,
+                "message": f"获取租户统计信息失败: {str(e)}",
+                "errors": [{"field": "general", "message": str(e)}]
+            }
+        )
+
+
 @router.put("/{tenant_id}", 
             response_model=TenantResponse,
             summary="更新租户信息",
@@ -230,7 +345,7 @@ async def get_tenant(
 async def update_tenant(
     tenant_id: str,
     tenant_data: TenantUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # 这里需要添加权限验证，暂时省略
 ):
     """
@@ -245,10 +360,10 @@ async def update_tenant(
         #     raise HTTPException(status_code=403, detail="权限不足")
         
         # 创建租户服务实例
-        tenant_service = TenantService(db)
+        tenant_service = AsyncTenantService(db)
         
         # 获取现有租户
-        tenant = tenant_service.get_tenant(tenant_id)
+        tenant = await tenant_service.get_tenant(tenant_id)
         if not tenant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -290,7 +405,7 @@ async def update_tenant(
                description="软删除租户（标记为inactive），需要超级管理员权限")
 async def delete_tenant(
     tenant_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
     # 这里需要添加超级管理员权限验证，暂时省略
 ):
     """
@@ -0,0 +1,91 @@
+"""
+密码哈希代价校准
+
+在当前主机上测量各代价参数下单次哈希的耗时，给出最接近目标耗时的参数，
+输出可直接写入 app/config.py 的配置项。
+
+用法（在backend目录下）:
+    python -m app.commands.calibrate_password_hash --algorithm scrypt --target-ms 250
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.core.password_hasher import ALGORITHMS, compute_hash, hash_params
+
+SAMPLE_PASSWORD = "Calibrate-Passw0rd"
+
+
+def measure(params: Dict[str, Any], rounds: int) -> float:
+    """多次哈希取最小耗时（毫秒），减少调度抖动的影响"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        compute_hash(SAMPLE_PASSWORD, params)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def calibrate_linear(params: Dict[str, Any], key: str, target_ms: float, rounds: int,
+                     minimum: int) -> Tuple[Dict[str, Any], float]:
+    """耗时与参数近似线性（pbkdf2迭代次数、argon2时间代价）：先测量再按比例缩放"""
+    probe = dict(params)
+    elapsed = measure(probe, rounds)
+    scaled = max(minimum, round(probe[key] * target_ms / elapsed))
+    result = {**params, key: scaled}
+    return result, measure(result, rounds)
+
+
+def calibrate_power_of_two(params: Dict[str, Any], key: str, target_ms: float, rounds: int,
+                           minimum: int) -> Tuple[Dict[str, Any], float]:
+    """参数必须是2的幂（scrypt的N）：逐级翻倍，取耗时最接近目标的一级"""
+    candidates: List[Tuple[Dict[str, Any], float]] = []
+    value = minimum
+    while True:
+        current = {**params, key: value}
+        elapsed = measure(current, rounds)
+        candidates.append((current, elapsed))
+        print(f"   {key}={value:<10} {elapsed:8.1f} ms")
+        if elapsed >= target_ms:
+            break
+        value *= 2
+    return min(candidates, key=lambda item: abs(item[1] - target_ms))
+
+
+CALIBRATORS: Dict[str, Tuple[str, Callable, int]] = {
+    "pbkdf2": ("iterations", calibrate_linear, 100000),
+    "scrypt": ("n", calibrate_power_of_two, 1024),
+    "argon2": ("time_cost", calibrate_linear, 1),
+}
+
+SETTING_NAMES = {
+    "iterations": "PASSWORD_HASH_PBKDF2_ITERATIONS",
+    "n": "PASSWORD_HASH_SCRYPT_N",
+    "r": "PASSWORD_HASH_SCRYPT_R",
+    "p": "PASSWORD_HASH_SCRYPT_P",
+    "time_cost": "PASSWORD_HASH_ARGON2_TIME_COST",
+    "memory_cost": "PASSWORD_HASH_ARGON2_MEMORY_COST",
+    "parallelism": "PASSWORD_HASH_ARGON2_PARALLELISM",
+}
+
+
+def main(args):
+    key, calibrate, minimum = CALIBRATORS[args.algorithm]
+    params = hash_params(args.algorithm)
+    print(f"🔧 校准 {args.algorithm}，目标 {args.target_ms} ms/次（当前配置 {params}）")
+    print(f"   当前配置耗时: {measure(params, args.rounds):.1f} ms")
+
+    result, elapsed = calibrate(params, key, args.target_ms, args.rounds, minimum)
+    print(f"\n✅ 推荐参数（实测 {elapsed:.1f} ms/次）:")
+    print(f'    PASSWORD_HASH_ALGORITHM: str = "{args.algorithm}"')
+    for name, value in result.items():
+        if name != "algorithm":
+            print(f"    {SETTING_NAMES[name]}: int = {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="scrypt", help="哈希算法")
+    parser.add_argument("--target-ms", type=float, default=250, help="单次哈希目标耗时（毫秒）")
+    parser.add_argument("--rounds", type=int, default=3, help="每个参数测量次数（取最小值）")
+    main(parser.parse_args())
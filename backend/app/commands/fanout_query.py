@@ -0,0 +1,77 @@
+"""
+跨租户查询
+
+对每个租户schema执行同一条只读查询，SQL中用 {schema} 表示租户schema。
+
+用法（在backend目录下）:
+    python -m app.commands.fanout_query "SELECT count(*) AS active_users FROM {schema}.users WHERE status = 'active'" --merge sum
+    python -m app.commands.fanout_query "SELECT max(last_login_at) AS last_login FROM {schema}.users" --stream > logins.ndjson
+    python -m app.commands.fanout_query "SELECT count(*) AS logins FROM {schema}.audit_logs WHERE action = :action AND created_at >= :since" \\
+        --param action=user.login --param since=2026-10-17T00:00:00+00:00 --merge rows
+
+- --merge sum:  各列求和，输出一个汇总
+- --merge rows: 拼接所有租户的行（附带tenant_id）
+- --stream:     每个schema完成即输出一行NDJSON结果，最后一行为汇总
+失败或超时的schema列在汇总的 errors 中，有失败时退出码为1。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime
+
+from app.core.tenant_fanout import MERGERS, STATUS_ERROR, STATUS_OK, STATUS_TIMEOUT, TenantFanOut
+
+
+def parse_param(raw: str):
+    """解析 name=value 参数，ISO格式的时间转换为datetime，整数转换为int"""
+    name, _, value = raw.partition("=")
+    if not name or not _:
+        raise argparse.ArgumentTypeError(f"参数格式应为 name=value: {raw}")
+    for convert in (int, datetime.fromisoformat):
+        try:
+            return name, convert(value)
+        except ValueError:
+            pass
+    return name, value
+
+
+async def run(args) -> dict:
+    fanout = TenantFanOut(concurrency=args.concurrency, statement_timeout_ms=args.timeout_ms)
+    params = dict(args.params or [])
+    try:
+        if not args.stream:
+            return await fanout.run(args.sql, params, args.schemas, MERGERS.get(args.merge))
+        counts = {STATUS_OK: 0, STATUS_ERROR: 0, STATUS_TIMEOUT: 0}
+        async for result in fanout.stream(args.sql, params, args.schemas):
+            counts[result.status] += 1
+            sys.stdout.write(json.dumps(result.to_dict(), ensure_ascii=False, default=str) + "\n")
+        return {"ok": counts[STATUS_OK], "failed": counts[STATUS_ERROR], "timed_out": counts[STATUS_TIMEOUT]}
+    finally:
+        await fanout.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对每个租户schema执行同一条只读查询")
+    parser.add_argument("sql", help="SQL，用 {schema} 表示租户schema")
+    parser.add_argument("--param", action="append", dest="params", type=parse_param, help="查询参数 name=value，可重复")
+    parser.add_argument("--schema", action="append", dest="schemas", help="只查询指定schema，可重复")
+    parser.add_argument("--merge", choices=sorted(MERGERS), default=None)
+    parser.add_argument("--stream", action="store_true", help="逐个schema输出NDJSON结果")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--timeout-ms", type=int, default=None, help="单个schema的语句超时（毫秒）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    summary = asyncio.run(run(args))
+    key = "summary" if args.stream else None
+    print(json.dumps({key: summary} if key else summary, ensure_ascii=False, indent=None if key else 2, default=str))
+    if summary.get("failed") or summary.get("timed_out"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+租户批量导入
+
+从NDJSON或CSV文件流式导入租户，逐行输出处理结果（NDJSON），最后一行为汇总。
+
+用法（在backend目录下）:
+    python -m app.commands.import_tenants tenants.ndjson
+    python -m app.commands.import_tenants tenants.csv --concurrency 8 > results.ndjson
+    cat tenants.ndjson | python -m app.commands.import_tenants - --format ndjson
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+from typing import BinaryIO
+
+from app.core.password_hasher import password_hasher
+from app.services.tenant import IMPORT_FORMATS, TenantBulkImporter, parse_rows, read_chunks
+
+
+async def import_tenants(stream: BinaryIO, fmt: str, batch_size: int, concurrency: int) -> dict:
+    # Ctrl+C 时取消导入任务，而不是在任意位置抛出 KeyboardInterrupt，未完成的租户事务随之回滚
+    asyncio.get_running_loop().add_signal_handler(signal.SIGINT, asyncio.current_task().cancel)
+    importer = TenantBulkImporter(batch_size=batch_size, concurrency=concurrency)
+    summary = {}
+    try:
+        async for result in importer.run(parse_rows(read_chunks(stream), fmt)):
+            if "summary" in result:
+                summary = result["summary"]
+            print(json.dumps(result, ensure_ascii=False, default=str), flush=True)
+    except asyncio.CancelledError:
+        print(f"导入已中断: {importer.summary}", file=sys.stderr)
+        raise SystemExit(130)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从NDJSON/CSV文件批量导入租户")
+    parser.add_argument("path", help="输入文件，- 表示标准输入")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="默认按文件扩展名判断")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    from app.core.pq_db import async_engine
+    async_engine.echo = False
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        summary = asyncio.run(import_tenants(stream, fmt, args.batch_size, args.concurrency))
+    finally:
+        stream.close()
+        password_hasher.shutdown()
+    print(f"导入完成: {summary}", file=sys.stderr)
+    if summary.get("failed"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
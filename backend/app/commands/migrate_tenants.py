@@ -0,0 +1,53 @@
+"""
+租户schema迁移
+
+把所有租户schema并发升级到最新（或指定）的租户迁移版本。
+
+用法（在backend目录下）:
+    python -m app.commands.migrate_tenants --dry-run
+    python -m app.commands.migrate_tenants --canary 50 --workers 16
+    python -m app.commands.migrate_tenants --resume <run_id>
+
+- --dry-run:  只输出待迁移的schema数量及其当前版本分布
+- --canary N: 先迁移N个schema，全部成功才继续迁移其余schema
+- --resume:   使用已有批次ID续跑，跳过该批次中已完成的schema并重试失败的schema
+"""
+import argparse
+import json
+import logging
+
+from app.core.tenant_migrations import HEAD_REVISION, TenantMigrationRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发迁移所有租户schema")
+    parser.add_argument("--target", default=None, help=f"目标版本，默认最新版本 {HEAD_REVISION}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--schema", action="append", dest="schemas", help="只迁移指定schema，可重复")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--canary", type=int, default=0)
+    parser.add_argument("--canary-only", action="store_true", help="只迁移金丝雀批次")
+    parser.add_argument("--resume", default=None, metavar="RUN_ID")
+    parser.add_argument("--lock-timeout-ms", type=int, default=None)
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    runner = TenantMigrationRunner(
+        workers=args.workers, target=args.target,
+        lock_timeout_ms=args.lock_timeout_ms, progress_interval=args.progress_interval,
+    )
+    runner.engine.echo = False
+    summary = runner.run(
+        schemas=args.schemas, run_id=args.resume, dry_run=args.dry_run,
+        canary=args.canary, canary_only=args.canary_only,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if summary.get("failed") or summary.get("aborted"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,100 @@
 import os
+from typing import Dict, Tuple
 
 
 class Settings:
     DATABASE_URL: str = "postgresql+psycopg2://rancy:@localhost:5432/brick_local"
+    ASYNC_DATABASE_URL: str = "postgresql+asyncpg://rancy:@localhost:5432/brick_local"
     DEBUG: bool = True
 
+    # 连接池配置
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # 数据库指标：慢查询阈值（毫秒）、保留的慢查询样本数
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_SLOW_QUERY_SAMPLES: int = 50
+    # 快速启动：延迟加载的路由（app.main.ROUTERS 的键），启动时不导入，首个命中其路径前缀的请求
+    # 到达（或生成接口文档）时才加载；为空则启动时加载全部路由
+    LAZY_ROUTERS: Tuple[str, ...] = ("system", "audit")
 
-settings = Settings()
\ No newline at end of file
+    # 租户schema预置池：各套餐保持的空闲schema数量（为0则不预置）
+    TENANT_POOL_SIZES: Dict[str, int] = {"basic": 5, "pro": 2, "enterprise": 1}
+    # 预置池巡检间隔（秒），认领后会立即触发补充
+    TENANT_POOL_REFILL_INTERVAL: float = 30.0
+    # 租户注册表缓存：最大条目数、TTL（秒）、负缓存TTL（秒）
+    TENANT_CACHE_SIZE: int = 10000
+    TENANT_CACHE_TTL: float = 300.0
+    TENANT_CACHE_NEGATIVE_TTL: float = 30.0
+    # 租户schema集合缓存全量校正间隔（秒），平时按schema变更通知增量更新
+    TENANT_SCHEMA_CACHE_RESYNC_INTERVAL: float = 300.0
+    # 按Host解析租户：平台子域名（<tenant_id>.<基础域名>）的基础域名，
+    # Host解析结果缓存的最大条目数、TTL（秒）、未知Host的负缓存TTL（秒）
+    TENANT_BASE_DOMAINS: Tuple[str, ...] = ("localhost",)
+    TENANT_HOST_CACHE_SIZE: int = 10000
+    TENANT_HOST_CACHE_TTL: float = 300.0
+    TENANT_HOST_CACHE_NEGATIVE_TTL: float = 30.0
+    # 不需要租户的路径（精确匹配），不按Host查询租户
+    TENANT_HOST_RESOLVE_SKIP_PATHS: Tuple[str, ...] = (
+        "/", "/health", "/metrics", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json",
+    )
+    # 密码哈希：算法（pbkdf2 / scrypt / argon2）及代价参数，可用
+    # python -m app.commands.calibrate_password_hash 按目标耗时校准
+    PASSWORD_HASH_ALGORITHM: str = "scrypt"
+    PASSWORD_HASH_PBKDF2_ITERATIONS: int = 600000
+    PASSWORD_HASH_SCRYPT_N: int = 32768
+    PASSWORD_HASH_SCRYPT_R: int = 8
+    PASSWORD_HASH_SCRYPT_P: int = 1
+    PASSWORD_HASH_ARGON2_TIME_COST: int = 3
+    PASSWORD_HASH_ARGON2_MEMORY_COST: int = 65536  # KiB
+    PASSWORD_HASH_ARGON2_PARALLELISM: int = 1
+    # 密码哈希进程池大小、排队上限
+    PASSWORD_HASH_WORKERS: int = min(4, os.cpu_count() or 1)
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # 租户schema迁移：并发迁移的工作线程数、单个schema等待表锁的超时（毫秒）
+    TENANT_MIGRATION_WORKERS: int = 16
+    TENANT_MIGRATION_LOCK_TIMEOUT_MS: int = 5000
+    # 租户批量导入：每批行数、并发开通schema数（需小于数据库连接池容量）
+    TENANT_IMPORT_BATCH_SIZE: int = 200
+    TENANT_IMPORT_CONCURRENCY: int = 8
+    # 批量注册接口的请求体先读完再处理，超过该大小（字节）时暂存到临时文件
+    TENANT_IMPORT_SPOOL_MAX_BYTES: int = 8 * 1024 * 1024
+    # 租户数据库准入：全局容量（小于连接池上限，为管理请求保留余量）、按套餐的租户并发上限、
+    # 公平调度权重、排队超时（秒）
+    TENANT_DB_CAPACITY: int = DB_POOL_SIZE + DB_MAX_OVERFLOW - 4
+    TENANT_DB_CONCURRENCY_LIMITS: Dict[str, int] = {"basic": 3, "pro": 6, "enterprise": 12}
+    TENANT_DB_SCHEDULER_WEIGHTS: Dict[str, int] = {"basic": 1, "pro": 2, "enterprise": 4}
+    TENANT_DB_QUEUE_TIMEOUT: float = 10.0
+    # 租户API限流：按套餐的每分钟请求上限、允许突发的秒数、令牌桶分片数、用量写入间隔（秒）
+    TENANT_RATE_LIMITS: Dict[str, int] = {"basic": 600, "pro": 3000, "enterprise": 12000}
+    TENANT_RATE_LIMIT_BURST_SECONDS: float = 10.0
+    TENANT_RATE_LIMIT_SHARDS: int = 16
+    TENANT_USAGE_FLUSH_INTERVAL: float = 5.0
+    # 租户统计汇总：后台校正间隔（秒）、每轮校正租户数、汇总最长多久必须全量校正一次（秒）
+    TENANT_STATS_REFRESH_INTERVAL: float = 60.0
+    TENANT_STATS_REFRESH_BATCH: int = 500
+    TENANT_STATS_MAX_AGE: float = 3600.0
+    # 租户存储统计间隔（秒）
+    TENANT_STORAGE_REFRESH_INTERVAL: float = 300.0
+    # 审计日志异步写入：缓冲上限（条）、触发提前写入的缓冲条数、写入间隔（秒）、并发写入租户数、
+    # 缓冲已满时log()最长等待时间（秒）
+    AUDIT_QUEUE_SIZE: int = 50000
+    AUDIT_BATCH_SIZE: int = 1000
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+    AUDIT_FLUSH_CONCURRENCY: int = 4
+    AUDIT_ENQUEUE_TIMEOUT: float = 0.5
+    # 审计日志月度分区：按套餐的保留月数（早于此的整月分区被删除）、预建未来分区的月数、
+    # 维护间隔（秒）、并发维护的schema数
+    AUDIT_LOG_RETENTION_MONTHS: Dict[str, int] = {"basic": 3, "pro": 12, "enterprise": 36}
+    AUDIT_LOG_PARTITIONS_AHEAD: int = 2
+    AUDIT_LOG_PARTITION_INTERVAL: float = 3600.0
+    AUDIT_LOG_PARTITION_CONCURRENCY: int = 4
+    # 审计日志导出：每批从服务端游标读取并输出的行数
+    AUDIT_EXPORT_BATCH_SIZE: int = 1000
+    # 跨租户并发查询：并发schema数（即独立连接池大小）、单个schema的语句超时（毫秒）
+    TENANT_FANOUT_CONCURRENCY: int = 16
+    TENANT_FANOUT_STATEMENT_TIMEOUT_MS: int = 5000
+    # 各套餐月费（用于账单统计）
+    TENANT_PLAN_MONTHLY_PRICES: Dict[str, float] = {"basic": 0.0, "pro": 99.0, "enterprise": 499.0}
+
+
+settings = Settings()
@@ -0,0 +1,258 @@
+"""
+租户审计日志异步写入（write-behind）
+
+请求内只把审计事件追加到内存缓冲并立即返回，不产生SQL；
+后台任务每 AUDIT_FLUSH_INTERVAL 秒（或缓冲达到 AUDIT_BATCH_SIZE 条时提前）取出缓冲，
+按租户分组后用 COPY 一次写入各租户schema的 audit_logs，多个租户并发写入。
+
+- 有界：缓冲中（含正在写入）的事件总数不超过 AUDIT_QUEUE_SIZE；
+- 背压：缓冲已满时 log() 最多等待 AUDIT_ENQUEUE_TIMEOUT 秒，log_nowait() 直接丢弃，
+  丢弃按原因计数；
+- 写入失败：数据库拒绝的数据（schema不存在、数据错误）丢弃；连接类错误放回缓冲下次重试；
+- 停止时写完缓冲中的全部事件，之后到达的事件丢弃。
+
+写入是尽力而为的：进程崩溃时缓冲中尚未写入的事件会丢失。
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+from app.core.tenant_routing import tenant_schema_name
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = (
+    "user_id", "action", "resource_type", "resource_id", "details", "ip_address", "user_agent", "created_at"
+)
+
+audit_events_enqueued_total = registry.counter(
+    "audit_events_enqueued_total", "进入缓冲的审计事件数")
+audit_events_written_total = registry.counter(
+    "audit_events_written_total", "已写入的审计事件数")
+audit_events_dropped_total = registry.counter(
+    "audit_events_dropped_total", "丢弃的审计事件数", ["reason"])
+audit_batch_size = registry.histogram(
+    "audit_batch_size", "单次COPY写入的审计事件数",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000))
+audit_flush_seconds = registry.histogram(
+    "audit_flush_seconds", "单次COPY写入耗时（秒）")
+audit_queue_depth = registry.gauge(
+    "audit_queue_depth", "缓冲中（含正在写入）的审计事件数")
+
+# 一条审计记录，字段顺序与 AUDIT_COLUMNS 一致
+AuditRecord = Tuple[Any, ...]
+
+
+class AuditLogWriter:
+    """租户审计日志缓冲与批量写入"""
+
+    def __init__(self, queue_size: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, concurrency: Optional[int] = None,
+                 enqueue_timeout: Optional[float] = None):
+        self.queue_size = queue_size or settings.AUDIT_QUEUE_SIZE
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.concurrency = concurrency or settings.AUDIT_FLUSH_CONCURRENCY
+        self.enqueue_timeout = settings.AUDIT_ENQUEUE_TIMEOUT if enqueue_timeout is None else enqueue_timeout
+        self._buffers: Dict[str, List[AuditRecord]] = {}
+        self._pending = 0
+        self._buffered = 0
+        self._space_waiters: Deque[asyncio.Future] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def start(self) -> None:
+        """在当前事件循环中启动后台写入任务"""
+        if self._task:
+            return
+        self._closed = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def stop(self) -> None:
+        """停止后台写入任务，写完缓冲中的事件；之后到达的事件丢弃"""
+        self._closed = True
+        if self._task:
+            # 不取消任务，等待正在进行的写入完成后退出，避免已取出的事件丢失
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        # 连接类错误会把事件放回缓冲，最多重试几轮
+        for _ in range(3):
+            if not self._buffered:
+                break
+            await self.flush()
+        if self._buffered:
+            audit_events_dropped_total.inc(self._buffered, reason="shutdown")
+            logger.error(f"停止时仍有 {self._buffered} 条审计事件未能写入")
+            self._pending -= self._buffered
+            self._buffers.clear()
+            self._buffered = 0
+        for future in self._space_waiters:
+            if not future.done():
+                future.set_result(None)
+        self._space_waiters.clear()
+
+    def log_nowait(self, tenant_id: str, action: str, user_id: Optional[int] = None,
+                   resource_type: Optional[str] = None, resource_id: Optional[str] = None,
+                   details: Optional[Dict[str, Any]] = None, ip_address: Optional[str] = None,
+                   user_agent: Optional[str] = None) -> bool:
+        """
+        记录一条审计事件（不等待），缓冲已满时丢弃
+
+        Args:
+            tenant_id: 租户ID
+            action: 操作，如 user.login
+            user_id: 操作用户ID
+            resource_type: 资源类型
+            resource_id: 资源ID
+            details: 详情（JSON）
+            ip_address: 客户端IP
+            user_agent: 客户端User-Agent
+
+        Returns:
+            是否进入缓冲
+        """
+        if self._closed:
+            audit_events_dropped_total.inc(reason="shutdown")
+            return False
+        if self._pending >= self.queue_size:
+            audit_events_dropped_total.inc(reason="full")
+            return False
+        try:
+            ip = ipaddress.ip_address(ip_address) if ip_address else None
+        except ValueError:
+            ip = None
+        record = (
+            user_id, action, resource_type, resource_id,
+            json.dumps(details, ensure_ascii=False, default=str) if details is not None else None,
+            ip, user_agent, datetime.now(timezone.utc),
+        )
+        self._append(tenant_id, [record])
+        audit_events_enqueued_total.inc()
+        return True
+
+    async def log(self, tenant_id: str, action: str, **fields) -> bool:
+        """
+        记录一条审计事件，缓冲已满时最多等待 enqueue_timeout 秒
+
+        参数同 log_nowait。
+
+        Returns:
+            是否进入缓冲
+        """
+        if self._pending >= self.queue_size and not self._closed and self._task:
+            future = asyncio.get_running_loop().create_future()
+            self._space_waiters.append(future)
+            try:
+                await asyncio.wait_for(future, self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.log_nowait(tenant_id, action, **fields)
+
+    async def flush(self) -> int:
+        """
+        写入当前缓冲中的全部事件
+
+        Returns:
+            写入的事件数
+        """
+        buffers, self._buffers = self._buffers, {}
+        self._buffered = 0
+        if not buffers:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def write(tenant_id: str, records: List[AuditRecord]) -> int:
+            async with semaphore:
+                return await self._write(tenant_id, records)
+
+        written = await asyncio.gather(*(write(tenant_id, records) for tenant_id, records in buffers.items()))
+        return sum(written)
+
+    def stats(self) -> Dict[str, Any]:
+        """当前缓冲状态"""
+        return {
+            "pending": self._pending,
+            "buffered": self._buffered,
+            "tenants": len(self._buffers),
+            "queue_size": self.queue_size,
+        }
+
+    def _append(self, tenant_id: str, records: List[AuditRecord]) -> None:
+        buffer = self._buffers.get(tenant_id)
+        if buffer is None:
+            buffer = self._buffers[tenant_id] = []
+        buffer.extend(records)
+        self._pending += len(records)
+        self._buffered += len(records)
+        audit_queue_depth.set(self._pending)
+        if self._buffered >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _release(self, count: int) -> None:
+        """写入完成（或丢弃）后释放缓冲名额，唤醒等待的记录者"""
+        self._pending -= count
+        audit_queue_depth.set(self._pending)
+        while self._space_waiters and self._pending < self.queue_size:
+            future = self._space_waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    async def _write(self, tenant_id: str, records: List[AuditRecord]) -> int:
+        # asyncpg 随异步引擎按需加载，不在模块导入时引入
+        import asyncpg
+
+        start = time.perf_counter()
+        try:
+            async with get_async_engine().connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    "audit_logs", schema_name=tenant_schema_name(tenant_id),
+                    columns=AUDIT_COLUMNS, records=records,
+                )
+        except asyncpg.PostgresError as e:
+            # 数据库拒绝的数据（租户schema不存在、数据错误等）重试也不会成功，直接丢弃
+            logger.error(f"写入租户 {tenant_id} 审计日志失败，丢弃 {len(records)} 条: {str(e)}")
+            audit_events_dropped_total.inc(len(records), reason="rejected")
+            self._release(len(records))
+            return 0
+        except Exception as e:
+            logger.error(f"写入租户 {tenant_id} 审计日志失败，稍后重试 {len(records)} 条: {str(e)}")
+            # 放回缓冲（名额仍被占用），下一轮重试
+            self._pending -= len(records)
+            self._append(tenant_id, records)
+            return 0
+
+        audit_flush_seconds.observe(time.perf_counter() - start)
+        audit_batch_size.observe(len(records))
+        audit_events_written_total.inc(len(records))
+        self._release(len(records))
+        return len(records)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"写入审计日志失败: {str(e)}")
+            if self._closed:
+                return
+
+
+# 全局审计日志写入器，后台任务由应用lifespan启动和停止
+audit_log_writer = AuditLogWriter()
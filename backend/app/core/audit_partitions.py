@@ -0,0 +1,224 @@
+"""
+租户审计日志分区维护
+
+各租户schema中的 audit_logs 是按 created_at 月度范围分区的分区表（租户迁移 d3a6f1c8b042），
+分区命名为 audit_logs_pYYYYMM，区间为UTC当月1日至次月1日，created_at 上建BRIN索引。
+
+后台任务定期执行一轮维护：
+- 一次系统目录查询列出全部租户schema（含模板、预置池schema）的现有分区；
+- 为每个schema预建当月及之后 AUDIT_LOG_PARTITIONS_AHEAD 个月的分区；
+- 按租户套餐的保留月数（AUDIT_LOG_RETENTION_MONTHS）整块删除过期分区，不做大批量DELETE。
+
+多个worker同时运行时，通过advisory lock保证同一时刻只有一个在维护。
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAN = "basic"
+PARTITION_PREFIX = "audit_logs_p"
+PARTITION_NAME_RE = re.compile(r"^audit_logs_p(\d{4})(\d{2})$")
+
+audit_partitions_created_total = registry.counter(
+    "audit_partitions_created_total", "新建的审计日志分区数")
+audit_partitions_dropped_total = registry.counter(
+    "audit_partitions_dropped_total", "按保留策略删除的审计日志分区数")
+audit_partition_maintenance_seconds = registry.histogram(
+    "audit_partition_maintenance_seconds", "一轮审计日志分区维护耗时（秒）")
+
+# 全部租户schema中分区表 audit_logs 的现有分区，及所属租户的套餐
+PARTITIONS_SQL = text("""
+SELECT n.nspname AS schema_name,
+       t.plan_type,
+       COALESCE(array_agg(p.relname ORDER BY p.relname) FILTER (WHERE p.relname IS NOT NULL), '{}') AS partitions
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN public.tenants t ON t.schema_name = n.nspname
+LEFT JOIN pg_inherits i ON i.inhparent = c.oid
+LEFT JOIN pg_class p ON p.oid = i.inhrelid
+WHERE c.relname = 'audit_logs' AND c.relkind = 'p'
+GROUP BY n.nspname, t.plan_type
+""")
+
+
+def retention_months(plan_type: Optional[str]) -> int:
+    """套餐对应的审计日志保留月数"""
+    months = settings.AUDIT_LOG_RETENTION_MONTHS
+    return months.get(plan_type or DEFAULT_PLAN, months[DEFAULT_PLAN])
+
+
+def month_start(now: Optional[datetime] = None) -> date:
+    """UTC当月1日"""
+    return (now or datetime.now(timezone.utc)).date().replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """月份加减（month为当月1日）"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """月份对应的分区名"""
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """从分区名解析月份，不是按月命名的分区返回None"""
+    match = PARTITION_NAME_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_partition_sql(schema_name: str, month: date) -> str:
+    """创建单月分区的DDL（已存在时跳过）"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {schema_name}.{partition_name(month)} "
+        f"PARTITION OF {schema_name}.audit_logs "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def ensure_partitions(conn: Connection, schema_name: str, now: Optional[datetime] = None) -> None:
+    """
+    在调用方事务中为单个schema建好当月及之后几个月的分区（同步连接，用于开通租户）
+
+    Args:
+        conn: 数据库连接
+        schema_name: 租户schema名称
+        now: 当前时间，默认UTC当前时间
+    """
+    current = month_start(now)
+    for offset in range(settings.AUDIT_LOG_PARTITIONS_AHEAD + 1):
+        conn.execute(text(create_partition_sql(schema_name, add_months(current, offset))))
+
+
+def plan_schema(partitions: Sequence[str], plan_type: Optional[str], now: Optional[datetime] = None):
+    """
+    计算单个schema需要新建和删除的分区
+
+    Args:
+        partitions: 现有分区名
+        plan_type: 租户套餐，模板和预置池schema为None
+        now: 当前时间
+
+    Returns:
+        (需要新建的月份列表, 需要删除的分区名列表)
+    """
+    current = month_start(now)
+    existing = {partition_month(name): name for name in partitions}
+    wanted = [add_months(current, offset) for offset in range(settings.AUDIT_LOG_PARTITIONS_AHEAD + 1)]
+    missing = [month for month in wanted if month not in existing]
+    cutoff = add_months(current, -retention_months(plan_type))
+    expired = [name for month, name in existing.items() if month is not None and month < cutoff]
+    return missing, sorted(expired)
+
+
+class AuditLogPartitionManager:
+    """定期预建审计日志分区并按保留策略删除过期分区"""
+
+    def __init__(self, interval: Optional[float] = None, concurrency: Optional[int] = None):
+        self.interval = interval or settings.AUDIT_LOG_PARTITION_INTERVAL
+        self.concurrency = concurrency or settings.AUDIT_LOG_PARTITION_CONCURRENCY
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动定期维护任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="audit-log-partition-manager")
+
+    async def stop(self) -> None:
+        """停止定期维护任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def maintain(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        维护一轮全部租户schema的审计日志分区（另一个worker正在维护时跳过）
+
+        Args:
+            now: 当前时间，默认UTC当前时间
+
+        Returns:
+            {"schemas": 检查的schema数, "created": 新建分区数, "dropped": 删除分区数, "failed": 失败schema数}，
+            跳过时 schemas 为 -1
+        """
+        start = time.perf_counter()
+        result = {"schemas": -1, "created": 0, "dropped": 0, "failed": 0}
+        async with get_async_engine().connect() as lock_conn:
+            locked = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(hashtext('audit_log_partitions'))"))
+            if not locked:
+                return result
+            try:
+                rows = (await lock_conn.execute(PARTITIONS_SQL)).all()
+                await lock_conn.commit()
+                result["schemas"] = len(rows)
+                semaphore = asyncio.Semaphore(self.concurrency)
+
+                async def maintain_schema(row) -> None:
+                    missing, expired = plan_schema(row.partitions, row.plan_type, now)
+                    if not missing and not expired:
+                        return
+                    async with semaphore:
+                        try:
+                            await self._apply(row.schema_name, missing, expired)
+                        except Exception as e:
+                            logger.error(f"维护 {row.schema_name} 审计日志分区失败，下一轮重试: {str(e)}")
+                            result["failed"] += 1
+                            return
+                    result["created"] += len(missing)
+                    result["dropped"] += len(expired)
+
+                await asyncio.gather(*(maintain_schema(row) for row in rows))
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext('audit_log_partitions'))"))
+
+        audit_partitions_created_total.inc(result["created"])
+        audit_partitions_dropped_total.inc(result["dropped"])
+        audit_partition_maintenance_seconds.observe(time.perf_counter() - start)
+        return result
+
+    async def _apply(self, schema_name: str, missing: List[date], expired: List[str]) -> None:
+        """在一个事务中为单个schema新建和删除分区；拿不到表锁时放弃，避免阻塞审计日志写入"""
+        async with get_async_engine().begin() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{settings.TENANT_MIGRATION_LOCK_TIMEOUT_MS}ms'"))
+            for month in missing:
+                await conn.execute(text(create_partition_sql(schema_name, month)))
+            for name in expired:
+                await conn.execute(text(f"DROP TABLE IF EXISTS {schema_name}.{name}"))
+        if expired:
+            logger.info(f"删除 {schema_name} 过期审计日志分区: {', '.join(expired)}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"维护审计日志分区失败，稍后重试: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+# 全局审计日志分区维护任务，由应用lifespan启动和停止
+audit_log_partition_manager = AuditLogPartitionManager()
@@ -0,0 +1,253 @@
+"""
+数据库访问指标（按请求统计）
+
+- DBMetricsMiddleware：纯ASGI中间件，为每个请求建立一个 RequestDBStats（经ContextVar传递，
+  同步路由的线程池和SQLAlchemy异步驱动的greenlet中同样可见），请求结束后按
+  方法、路由模板、租户记录请求耗时、数据库耗时、语句数和行数；
+- instrument_engine：在引擎上注册 before/after_cursor_execute 事件，每条语句只做一次计时和
+  几次属性累加，不访问指标注册表；超过 DB_SLOW_QUERY_MS 的语句记入慢查询样本；
+- InstrumentedQueuePool / InstrumentedAsyncQueuePool：记录从连接池获取连接的等待耗时和等待中的请求数，
+  连接占用、溢出数在导出指标时采集。
+
+租户标签只在租户存在时由 get_tenant_db 设置（tag_request_tenant），路由标签使用路由模板，
+未匹配到路由的请求统一记为 unmatched，避免标签基数随请求路径增长。
+"""
+import re
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.config import settings
+from app.core.metrics import _Metric, registry
+
+# 请求耗时分桶（秒）、每请求语句数分桶
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNMATCHED_ROUTE = "unmatched"
+
+request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "请求耗时（秒）", ["method", "route", "tenant"], buckets=REQUEST_BUCKETS)
+request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "单个请求内数据库语句累计耗时（秒）", ["method", "route", "tenant"],
+    buckets=REQUEST_BUCKETS)
+request_db_queries = registry.histogram(
+    "http_request_db_queries", "单个请求执行的数据库语句数", ["method", "route"], buckets=QUERY_COUNT_BUCKETS)
+db_queries_total = registry.counter(
+    "db_queries_total", "请求内执行的数据库语句数", ["route", "tenant"])
+db_rows_total = registry.counter(
+    "db_rows_total", "请求内数据库语句返回或影响的行数", ["route", "tenant"])
+db_slow_queries_total = registry.counter(
+    "db_slow_queries_total", "超过慢查询阈值的数据库语句数", ["route", "tenant"])
+pool_checked_out = registry.gauge("db_pool_checked_out", "连接池中已借出的连接数", ["pool"])
+pool_overflow = registry.gauge("db_pool_overflow", "连接池当前溢出连接数（超出pool_size的部分）", ["pool"])
+pool_size = registry.gauge("db_pool_size", "连接池常驻连接数上限", ["pool"])
+pool_waiting = registry.gauge("db_pool_waiting", "正在等待获取连接的数量", ["pool"])
+pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "从连接池获取连接的耗时（秒，含新建连接）", ["pool"])
+
+
+class RequestDBStats:
+    """单个请求的数据库访问统计"""
+
+    __slots__ = ("scope", "tenant_id", "queries", "db_seconds", "rows")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.tenant_id = ""
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+    @property
+    def route(self) -> str:
+        """路由模板（路由匹配后写入 scope["route"]）"""
+        return route_template(self.scope)
+
+
+def route_template(scope: dict) -> str:
+    """
+    请求匹配到的完整路由模板，如 /api/v1/tenants/{tenant_id}
+
+    include_router 引入的路由在 scope["route"] 中只有路由器内的路径，
+    用路径参数还原出该段的实际路径后，从请求路径中取出前缀拼回模板。
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    path_format = getattr(route, "path_format", template)
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + template
+    return template
+
+
+_request_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestDBStats]:
+    """当前请求的数据库访问统计（请求之外为None）"""
+    return _request_stats.get()
+
+
+def tag_request_tenant(tenant_id: str) -> None:
+    """把当前请求的指标归属到租户（仅对已确认存在的租户调用）"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.tenant_id = tenant_id
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SlowQuerySamples(_Metric):
+    """
+    最近的慢查询样本
+
+    按 (路由, 租户, 语句) 去重，只保留最近 capacity 条，导出为 gauge（值为最近一次耗时），
+    语句按空白折叠并截断，参数不导出。
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, capacity: int, max_statement_length: int = 300):
+        super().__init__(name, documentation, ("route", "tenant", "statement"))
+        self.capacity = capacity
+        self.max_statement_length = max_statement_length
+        self._samples: "OrderedDict[tuple, float]" = OrderedDict()
+
+    def record(self, statement: str, seconds: float, route: str, tenant_id: str) -> None:
+        statement = _WHITESPACE.sub(" ", statement).strip()[:self.max_statement_length]
+        key = (route, tenant_id, statement)
+        with self._lock:
+            self._samples.pop(key, None)
+            self._samples[key] = seconds
+            while len(self._samples) > self.capacity:
+                self._samples.popitem(last=False)
+
+    def samples(self) -> List[dict]:
+        with self._lock:
+            return [{"labels": self._labels(key), "value": value} for key, value in self._samples.items()]
+
+
+slow_query_samples = registry.register(SlowQuerySamples(
+    "db_slow_query_sample_seconds", "最近的慢查询样本及其耗时（秒）", settings.DB_SLOW_QUERY_SAMPLES))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        route, tenant_id = (stats.route, stats.tenant_id) if stats is not None else ("", "")
+        db_slow_queries_total.inc(route=route, tenant=tenant_id)
+        slow_query_samples.record(statement, elapsed, route, tenant_id)
+
+
+_instrumented_engines: List[Engine] = []
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    在引擎上注册语句计时事件，并在导出指标时采集其连接池状态
+
+    Args:
+        engine: 同步引擎（异步引擎传入 async_engine.sync_engine）
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _instrumented_engines.append(engine)
+
+
+def collect_pool_metrics() -> None:
+    """采集已注册引擎的连接池占用（引擎dispose后连接池会重建，因此每次从引擎上读取）"""
+    for engine in _instrumented_engines:
+        pool = engine.pool
+        label = getattr(pool, "metrics_label", type(pool).__name__)
+        if isinstance(pool, QueuePool):
+            pool_checked_out.set(pool.checkedout(), pool=label)
+            pool_overflow.set(max(0, pool.overflow()), pool=label)
+            pool_size.set(pool.size(), pool=label)
+
+
+registry.add_collector(collect_pool_metrics)
+
+
+class _WaitTimingMixin:
+    """记录获取连接的等待耗时（类属性 metrics_label 作为指标的 pool 标签，连接池重建后仍然有效）"""
+
+    metrics_label = ""
+
+    def _do_get(self):
+        pool_waiting.inc(pool=self.metrics_label)
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start, pool=self.metrics_label)
+            pool_waiting.dec(pool=self.metrics_label)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    """记录等待耗时的同步连接池"""
+
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """记录等待耗时的异步连接池"""
+
+    metrics_label = "async"
+
+
+class DBMetricsMiddleware:
+    """
+    请求级数据库指标中间件（纯ASGI，应作为最外层中间件以覆盖其它中间件中的数据库访问）
+
+    Args:
+        app: 下游ASGI应用
+        exempt_paths: 不统计的路径前缀（指标接口本身、文档等）
+    """
+
+    def __init__(self, app, exempt_paths: tuple = ("/metrics", "/docs", "/redoc", "/openapi.json")):
+        self.app = app
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDBStats(scope)
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            method, route, tenant_id = scope["method"], stats.route, stats.tenant_id
+            request_duration_seconds.observe(elapsed, method=method, route=route, tenant=tenant_id)
+            request_db_seconds.observe(stats.db_seconds, method=method, route=route, tenant=tenant_id)
+            request_db_queries.observe(stats.queries, method=method, route=route)
+            if stats.queries:
+                db_queries_total.inc(stats.queries, route=route, tenant=tenant_id)
+                db_rows_total.inc(stats.rows, route=route, tenant=tenant_id)
@@ -0,0 +1,96 @@
+"""
+延迟加载的路由
+
+不常用的路由模块（连同其服务、schema）启动时不导入：应用中只登记一个按路径前缀匹配的占位路由，
+第一个落在该前缀下的请求到达时才导入模块、把路由加入应用并移除占位路由，随后按正常流程重新分发
+这个请求。占位路由排在已加载路由之后，不影响其他路径的匹配。
+
+接口文档生成前先调用 load_lazy_routers 加载全部延迟路由，文档内容与启动时全部导入一致。
+"""
+import logging
+import time
+from importlib import import_module
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound, get_route_path
+from starlette.types import Receive, Scope, Send
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+lazy_router_load_seconds = registry.histogram(
+    "lazy_router_load_seconds", "延迟路由首次加载耗时（秒，含模块导入）", ["router"])
+
+
+class LazyRouter(BaseRoute):
+    """延迟加载路由的占位路由"""
+
+    def __init__(self, app: FastAPI, target: str, prefix: str, path_prefix: str):
+        """
+        Args:
+            app: 应用
+            target: 路由对象位置，格式为 "模块:属性"，如 "app.api.audit:audit_router"
+            prefix: include_router 使用的前缀
+            path_prefix: 该路由下所有路径的公共前缀（prefix 加路由自身的前缀），按此匹配请求
+        """
+        self.app = app
+        self.target = target
+        self.prefix = prefix
+        self.path_prefix = path_prefix.rstrip("/")
+        self.loaded = False
+
+    def matches(self, scope: Scope):
+        if scope["type"] in ("http", "websocket"):
+            path = get_route_path(scope)
+            if path == self.path_prefix or path.startswith(self.path_prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def load(self) -> None:
+        """导入路由模块并加入应用，同时移除占位路由（重复调用无副作用）"""
+        if self.loaded:
+            return
+        start = time.perf_counter()
+        module_name, attribute = self.target.split(":")
+        router = getattr(import_module(module_name), attribute)
+        self.app.include_router(router, prefix=self.prefix)
+        self.app.router.routes.remove(self)
+        self.app.openapi_schema = None
+        self.loaded = True
+        elapsed = time.perf_counter() - start
+        lazy_router_load_seconds.observe(elapsed, router=self.target)
+        logger.info(f"已加载延迟路由 {self.target}，耗时 {elapsed * 1000:.1f}ms")
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.load()
+        # 路由已替换占位路由，重新匹配本次请求
+        await self.app.router.app(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params):
+        # 未加载的路由不参与 url_for；需要反向解析时先调用 load
+        raise NoMatchFound(name, path_params)
+
+
+def include_lazy_router(app: FastAPI, target: str, prefix: str, path_prefix: str) -> LazyRouter:
+    """
+    登记延迟加载的路由
+
+    Args:
+        app: 应用
+        target: 路由对象位置（"模块:属性"）
+        prefix: include_router 使用的前缀
+        path_prefix: 该路由所有路径的公共前缀
+
+    Returns:
+        占位路由
+    """
+    route = LazyRouter(app, target, prefix, path_prefix)
+    app.router.routes.append(route)
+    return route
+
+
+def load_lazy_routers(app: FastAPI) -> None:
+    """加载应用中全部尚未加载的延迟路由"""
+    for route in [route for route in app.router.routes if isinstance(route, LazyRouter)]:
+        route.load()
@@ -0,0 +1,232 @@
+"""
+进程内指标注册表
+
+提供Counter、Gauge、Histogram三类指标，支持标签，线程安全。
+各模块在导入时向全局 registry 注册指标，通过 snapshot()（JSON）或 exposition()（Prometheus文本格式）导出；
+连接池占用等瞬时值可注册采集函数（add_collector），在导出前更新。
+"""
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    """指标基类"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        """按注册时的标签顺序生成取值键"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[dict]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[dict]:
+        with self._lock:
+            return [{"labels": self._labels(key), "value": value} for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[dict]:
+        with self._lock:
+            return [{"labels": self._labels(key), "value": value} for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """分桶直方图（记录各桶计数、总和与次数）"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每个标签组合: [各桶计数..., +Inf桶计数], 总和, 次数
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[dict]:
+        with self._lock:
+            result = []
+            for key, (bucket_counts, total, count) in self._values.items():
+                cumulative, buckets = 0, {}
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                    cumulative += bucket_count
+                    buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+                result.append({"labels": self._labels(key), "buckets": buckets, "sum": total, "count": count})
+            return result
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """指标注册表，同名指标只注册一次"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_cls(name, *args, **kwargs)
+            elif not isinstance(metric, metric_cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets or DEFAULT_BUCKETS)
+
+    def register(self, metric: _Metric) -> _Metric:
+        """注册自定义指标（需实现 samples()，type_name 为 counter / gauge）"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """注册采集函数，每次导出前调用，用于更新瞬时值类指标"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> None:
+        """调用全部采集函数"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector()
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, dict]:
+        """导出所有指标的当前值"""
+        self.collect()
+        return {
+            metric.name: {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "samples": metric.samples(),
+            }
+            for metric in self.metrics()
+        }
+
+    def exposition(self) -> str:
+        """导出所有指标的当前值（Prometheus文本格式 0.0.4）"""
+        self.collect()
+        lines = []
+        for metric in self.metrics():
+            help_text = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample in metric.samples():
+                labels = sample["labels"]
+                if metric.type_name != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                    continue
+                for bound, count in sample["buckets"].items():
+                    lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {sample['count']}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+# 全局指标注册表
+registry = MetricsRegistry()
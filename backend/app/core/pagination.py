@@ -0,0 +1,133 @@
+"""
+分页工具
+
+- 游标（keyset）分页：游标是排序键的不透明编码（base64url JSON），
+  翻页条件为 (排序键) > / < (游标值)，配合复合索引，任意深度翻页代价相同；
+- 总数模式：exact 精确count、estimated 取规划器估算行数、none 不计算。
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+# 翻页方向
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+# 总数模式
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATED = "estimated"
+TOTAL_NONE = "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATED, TOTAL_NONE)
+
+
+class PaginationParamError(ValueError):
+    """分页参数无效，field 为出错的请求参数名"""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+
+
+def encode_cursor(keys: List[Any], direction: str) -> str:
+    """
+    编码游标
+
+    Args:
+        keys: 排序键取值（datetime按ISO格式编码）
+        direction: 翻页方向 next / prev
+
+    Returns:
+        不透明的游标字符串
+    """
+    payload = {
+        "k": [key.isoformat() if isinstance(key, datetime) else key for key in keys],
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[List[Any], str]:
+    """
+    解码游标
+
+    Args:
+        cursor: 游标字符串
+
+    Returns:
+        (排序键取值, 翻页方向)
+
+    Raises:
+        PaginationParamError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        keys, direction = payload["k"], payload["d"]
+    except (ValueError, TypeError, KeyError):
+        raise PaginationParamError("cursor", "分页游标无效")
+    if direction not in (CURSOR_NEXT, CURSOR_PREV) or not isinstance(keys, list):
+        raise PaginationParamError("cursor", "分页游标无效")
+    return keys, direction
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <query>，绑定参数随原查询一起传递"""
+
+    inherit_cache = False
+
+    def __init__(self, query: Select):
+        self.query = query
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kw)
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """
+    根据规划器统计信息估算查询结果行数（不扫描数据）
+
+    Args:
+        db: 异步数据库会话
+        query: 查询语句
+
+    Returns:
+        估算行数
+    """
+    plan = (await db.execute(_Explain(query))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, query: Select, total_mode: str) -> Optional[int]:
+    """
+    按总数模式计算查询结果总数
+
+    Args:
+        db: 异步数据库会话
+        query: 查询语句（不含排序和分页）
+        total_mode: exact / estimated / none
+
+    Returns:
+        总数，none模式返回None
+
+    Raises:
+        PaginationParamError: 总数模式无效
+    """
+    if total_mode not in TOTAL_MODES:
+        raise PaginationParamError("total", f"总数模式必须是 {', '.join(TOTAL_MODES)} 之一")
+    if total_mode == TOTAL_NONE:
+        return None
+    if total_mode == TOTAL_ESTIMATED:
+        return await estimate_count(db, query)
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
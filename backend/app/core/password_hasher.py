@@ -0,0 +1,195 @@
+"""
+密码哈希服务
+
+密码哈希是刻意设计得很慢的CPU密集运算，直接在请求处理中调用会阻塞事件循环。
+这里把哈希与校验放到有界进程池中执行：
+- 算法与代价参数可配置（pbkdf2 / scrypt / argon2），见 settings.PASSWORD_HASH_*；
+- pbkdf2、scrypt 沿用 werkzeug 的哈希格式，已有哈希可直接校验；argon2 使用标准PHC格式，
+  依赖可选包 argon2-cffi；
+- 登录时若存储的哈希与当前配置的算法或代价不一致，校验通过后返回新哈希（透明重哈希）；
+- 代价参数可用 python -m app.commands.calibrate_password_hash 按目标耗时校准。
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ALGORITHMS = ("pbkdf2", "scrypt", "argon2")
+
+password_hash_seconds = registry.histogram(
+    "password_hash_seconds", "密码哈希/校验耗时（秒，含排队）", ["op"])
+password_rehash_total = registry.counter(
+    "password_rehash_total", "登录时按新参数重哈希的次数")
+
+
+def hash_params(algorithm: Optional[str] = None) -> Dict[str, Any]:
+    """
+    当前配置下指定算法的代价参数
+
+    Args:
+        algorithm: 算法名称，默认取 settings.PASSWORD_HASH_ALGORITHM
+
+    Returns:
+        包含algorithm及其代价参数的字典
+
+    Raises:
+        ValueError: 不支持的算法
+    """
+    algorithm = algorithm or settings.PASSWORD_HASH_ALGORITHM
+    if algorithm == "pbkdf2":
+        return {"algorithm": algorithm, "iterations": settings.PASSWORD_HASH_PBKDF2_ITERATIONS}
+    if algorithm == "scrypt":
+        return {"algorithm": algorithm, "n": settings.PASSWORD_HASH_SCRYPT_N,
+                "r": settings.PASSWORD_HASH_SCRYPT_R, "p": settings.PASSWORD_HASH_SCRYPT_P}
+    if algorithm == "argon2":
+        return {"algorithm": algorithm, "time_cost": settings.PASSWORD_HASH_ARGON2_TIME_COST,
+                "memory_cost": settings.PASSWORD_HASH_ARGON2_MEMORY_COST,
+                "parallelism": settings.PASSWORD_HASH_ARGON2_PARALLELISM}
+    raise ValueError(f"不支持的密码哈希算法: {algorithm}，可选 {', '.join(ALGORITHMS)}")
+
+
+def _argon2_hasher(params: Dict[str, Any]):
+    try:
+        from argon2 import PasswordHasher
+    except ImportError:
+        raise RuntimeError("使用argon2需要安装 argon2-cffi")
+    return PasswordHasher(time_cost=params["time_cost"], memory_cost=params["memory_cost"],
+                          parallelism=params["parallelism"])
+
+
+def _werkzeug_method(params: Dict[str, Any]) -> str:
+    if params["algorithm"] == "pbkdf2":
+        return f"pbkdf2:sha256:{params['iterations']}"
+    return f"scrypt:{params['n']}:{params['r']}:{params['p']}"
+
+
+def compute_hash(password: str, params: Dict[str, Any]) -> str:
+    """按给定参数计算密码哈希（在工作进程中执行）"""
+    if params["algorithm"] == "argon2":
+        return _argon2_hasher(params).hash(password)
+    # werkzeug 只在工作进程中计算哈希时用到，按需导入以免拖慢应用启动
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash(password, method=_werkzeug_method(params))
+
+
+def verify_hash(stored_hash: str, password: str) -> bool:
+    """校验密码（在工作进程中执行）"""
+    if stored_hash.startswith("$argon2"):
+        from argon2.exceptions import InvalidHashError, VerificationError
+        try:
+            return _argon2_hasher(hash_params("argon2")).verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    from werkzeug.security import check_password_hash
+    return check_password_hash(stored_hash, password)
+
+
+def needs_rehash(stored_hash: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    存储的哈希是否与当前配置的算法和代价参数不一致（只解析格式，不做哈希运算）
+
+    Args:
+        stored_hash: 存储的密码哈希
+        params: 目标参数，默认取当前配置
+
+    Returns:
+        是否需要重哈希
+    """
+    params = params or hash_params()
+    if params["algorithm"] == "argon2":
+        if not stored_hash.startswith("$argon2"):
+            return True
+        return _argon2_hasher(params).check_needs_rehash(stored_hash)
+    return stored_hash.split("$", 1)[0] != _werkzeug_method(params)
+
+
+class PasswordHasher:
+    """基于有界进程池的密码哈希服务"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # spawn：工作进程不继承父进程的事件循环和数据库连接
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._pool
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    async def _submit(self, op: str, fn, *args):
+        """提交到进程池；排队任务超过上限时在此等待，形成背压"""
+        start = time.perf_counter()
+        async with self._get_semaphore():
+            result = await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        password_hash_seconds.observe(time.perf_counter() - start, op=op)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """按当前配置计算密码哈希"""
+        return await self._submit("hash", compute_hash, password, hash_params())
+
+    async def verify(self, stored_hash: str, password: str) -> bool:
+        """校验密码"""
+        return await self._submit("verify", verify_hash, stored_hash, password)
+
+    async def verify_and_update(self, stored_hash: str, password: str) -> Tuple[bool, Optional[str]]:
+        """
+        校验密码，必要时按当前配置重新计算哈希（用于登录）
+
+        Args:
+            stored_hash: 存储的密码哈希
+            password: 用户输入的密码
+
+        Returns:
+            (是否校验通过, 新哈希；无需更新时为None)
+        """
+        if not await self.verify(stored_hash, password):
+            return False, None
+        if not needs_rehash(stored_hash):
+            return True, None
+        password_rehash_total.inc()
+        return True, await self.hash(password)
+
+    def hash_sync(self, password: str) -> str:
+        """同步计算密码哈希（供线程中运行的同步代码使用，不要在事件循环线程中调用）"""
+        start = time.perf_counter()
+        result = self._get_pool().submit(compute_hash, password, hash_params()).result()
+        password_hash_seconds.observe(time.perf_counter() - start, op="hash")
+        return result
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+        self._semaphores.clear()
+
+
+# 全局密码哈希服务，进程池在首次使用时创建，由应用lifespan关闭
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
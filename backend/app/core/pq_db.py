@@ -1,28 +1,129 @@
 """
 PostgreSQL数据库连接和会话管理
 """
+import threading
+from typing import Any, Callable, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import settings
+from app.core.db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+
+# 引擎在首次使用时创建：只导入模型或命令模块（alembic、运维命令等）时不加载数据库驱动、不建连接池
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    获取同步引擎（首次调用时创建）
+
+    Returns:
+        Engine: psycopg2 同步引擎
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    settings.DATABASE_URL,
+                    echo=settings.DEBUG,  # 在调试模式下显示SQL语句
+                    pool_pre_ping=True,   # 连接池预检查
+                    pool_recycle=3600,    # 连接回收时间（秒）
+                    poolclass=InstrumentedQueuePool,  # 记录获取连接的等待耗时
+                )
+                # 按请求统计语句数、数据库耗时和行数，记录慢查询（见 app.core.db_metrics）
+                instrument_engine(engine)
+                _engine = engine
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    获取异步引擎（首次调用时创建，asyncpg驱动，供API层使用，避免阻塞事件循环）
+
+    Returns:
+        AsyncEngine: asyncpg 异步引擎
+    """
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                engine = create_async_engine(
+                    settings.ASYNC_DATABASE_URL,
+                    echo=settings.DEBUG,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    poolclass=InstrumentedAsyncQueuePool,
+                )
+                instrument_engine(engine.sync_engine)
+                _async_engine = engine
+    return _async_engine
+
+
+async def dispose_engines() -> None:
+    """关闭已创建引擎的连接池（由应用lifespan在关闭时调用，之后再使用会重新建立连接）"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+
+class _LazyBindMixin:
+    """未指定bind时，创建会话前才创建并绑定默认引擎"""
+
+    def __init__(self, bind_factory: Callable[[], Any], **kw: Any):
+        super().__init__(**kw)
+        self._bind_factory = bind_factory
+
+    def __call__(self, **local_kw: Any):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._bind_factory())
+        return super().__call__(**local_kw)
+
+
+class LazySessionmaker(_LazyBindMixin, sessionmaker):
+    """首次创建会话时才创建引擎的 sessionmaker"""
+
+
+class LazyAsyncSessionmaker(_LazyBindMixin, async_sessionmaker):
+    """首次创建会话时才创建引擎的 async_sessionmaker"""
 
-# 创建 Engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,  # 在调试模式下显示SQL语句
-    pool_pre_ping=True,   # 连接池预检查
-    pool_recycle=3600,    # 连接回收时间（秒）
-)
 
 # 创建 SessionLocal
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+
+# 创建 AsyncSessionLocal
+# expire_on_commit=False: 提交后仍可访问对象属性，避免在异步上下文中触发隐式IO
+AsyncSessionLocal = LazyAsyncSessionmaker(
+    get_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # 创建 Base 类
 Base = declarative_base()
 
+
+def __getattr__(name: str) -> Any:
+    # 兼容 from app.core.pq_db import engine / async_engine（访问时创建引擎）
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db():
     """
     获取数据库会话
-    
+
     Yields:
         Session: 数据库会话对象
     """
@@ -30,4 +131,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    获取异步数据库会话
+
+    Yields:
+        AsyncSession: 异步数据库会话对象
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
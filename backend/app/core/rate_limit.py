@@ -0,0 +1,319 @@
+"""
+租户API限流与用量统计
+
+- TenantRateLimitMiddleware：纯ASGI中间件，按解析出的租户限流，超限返回429及Retry-After；
+  解析不到租户或租户不存在的请求（管理接口、健康检查等）不限流也不计数；
+- 令牌桶和用量计数按租户哈希分片，每个分片一把锁，互不阻塞；
+  令牌桶容量与补充速率由租户套餐决定（TENANT_RATE_LIMITS，单位：次/分钟）；
+- UsageFlusher 定期把各分片累计的计数整批取出，用一条 INSERT ... SELECT unnest(...)
+  ON CONFLICT 语句累加到 public.tenant_api_usage，请求路径上不产生SQL；
+  ApiStats 直接读取该表，不需要扫描请求日志。
+"""
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+from app.core.tenant_context import get_tenant_plan_type
+from app.core.tenant_resolver import get_request_tenant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAN = "basic"
+
+rate_limit_requests_total = registry.counter(
+    "tenant_rate_limit_requests_total", "经限流中间件的租户请求数", ["plan_type", "result"])
+usage_flush_seconds = registry.histogram(
+    "tenant_usage_flush_seconds", "用量计数批量写入耗时（秒）")
+usage_flush_rows = registry.counter(
+    "tenant_usage_flush_rows_total", "批量写入的用量行数")
+
+# 用量计数键：(租户ID, 统计月份)
+UsageKey = Tuple[str, date]
+
+
+def rate_limit_for(plan_type: Optional[str]) -> int:
+    """套餐对应的每分钟请求上限"""
+    limits = settings.TENANT_RATE_LIMITS
+    return limits.get(plan_type or DEFAULT_PLAN, limits[DEFAULT_PLAN])
+
+
+def current_period(now: Optional[datetime] = None) -> date:
+    """用量统计月份（UTC当月1日）"""
+    return (now or datetime.now(timezone.utc)).date().replace(day=1)
+
+
+class _Bucket:
+    """单个租户的令牌桶"""
+
+    __slots__ = ("plan_type", "limit", "capacity", "rate", "tokens", "updated_at", "plan_checked_at")
+
+    def __init__(self, plan_type: Optional[str], now: float):
+        self.plan_checked_at = now
+        self.updated_at = now
+        self.set_plan(plan_type)
+        self.tokens = self.capacity
+
+    def set_plan(self, plan_type: Optional[str]) -> None:
+        self.plan_type = plan_type or DEFAULT_PLAN
+        self.limit = rate_limit_for(plan_type)
+        self.rate = self.limit / 60.0
+        # 允许的突发量：TENANT_RATE_LIMIT_BURST_SECONDS 秒的配额
+        self.capacity = max(1.0, self.rate * settings.TENANT_RATE_LIMIT_BURST_SECONDS)
+
+
+class _Shard:
+    """令牌桶与用量计数的一个分片"""
+
+    __slots__ = ("lock", "buckets", "usage")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, _Bucket] = {}
+        # 用量键 -> [请求数, 被限流数]
+        self.usage: Dict[UsageKey, List[int]] = {}
+
+
+class TenantRateLimiter:
+    """分片令牌桶限流器与用量计数"""
+
+    def __init__(self, shards: int = 16, plan_refresh_interval: float = 60.0):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.plan_refresh_interval = plan_refresh_interval
+
+    def _shard(self, tenant_id: str) -> _Shard:
+        return self._shards[hash(tenant_id) % len(self._shards)]
+
+    def needs_plan(self, tenant_id: str, now: float) -> bool:
+        """是否需要（重新）查询租户套餐"""
+        bucket = self._shard(tenant_id).buckets.get(tenant_id)
+        return bucket is None or now - bucket.plan_checked_at >= self.plan_refresh_interval
+
+    def hit(self, tenant_id: str, plan_type: Optional[str] = None, now: Optional[float] = None,
+            refresh_plan: bool = False) -> Tuple[bool, float, _Bucket]:
+        """
+        消耗一个令牌并计数
+
+        Args:
+            tenant_id: 租户ID
+            plan_type: 套餐类型（首次或刷新时传入）
+            now: 单调时钟时间
+            refresh_plan: 是否用plan_type更新已有令牌桶的套餐
+
+        Returns:
+            (是否放行, 需要等待的秒数, 令牌桶)
+        """
+        now = time.monotonic() if now is None else now
+        shard = self._shard(tenant_id)
+        key = (tenant_id, current_period())
+        with shard.lock:
+            bucket = shard.buckets.get(tenant_id)
+            if bucket is None:
+                bucket = shard.buckets[tenant_id] = _Bucket(plan_type, now)
+            elif refresh_plan:
+                bucket.plan_checked_at = now
+                if (plan_type or DEFAULT_PLAN) != bucket.plan_type:
+                    bucket.set_plan(plan_type)
+
+            bucket.tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated_at) * bucket.rate)
+            bucket.updated_at = now
+            counts = shard.usage.get(key)
+            if counts is None:
+                counts = shard.usage[key] = [0, 0]
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                counts[0] += 1
+                return True, 0.0, bucket
+            counts[1] += 1
+            return False, (1.0 - bucket.tokens) / bucket.rate, bucket
+
+    def drain_usage(self) -> Dict[UsageKey, List[int]]:
+        """逐个分片取出并清空累计的用量计数"""
+        drained: Dict[UsageKey, List[int]] = {}
+        for shard in self._shards:
+            with shard.lock:
+                usage, shard.usage = shard.usage, {}
+            for key, counts in usage.items():
+                total = drained.setdefault(key, [0, 0])
+                total[0] += counts[0]
+                total[1] += counts[1]
+        return drained
+
+    def restore_usage(self, usage: Dict[UsageKey, List[int]]) -> None:
+        """写入失败时把计数放回，下次一并写入"""
+        for (tenant_id, period), counts in usage.items():
+            shard = self._shard(tenant_id)
+            with shard.lock:
+                total = shard.usage.setdefault((tenant_id, period), [0, 0])
+                total[0] += counts[0]
+                total[1] += counts[1]
+
+    def evict_idle(self, idle_seconds: float, now: Optional[float] = None) -> int:
+        """删除长时间没有请求（令牌已补满）的令牌桶，避免租户数增长后常驻内存"""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                idle = [tenant_id for tenant_id, bucket in shard.buckets.items()
+                        if now - bucket.updated_at >= idle_seconds]
+                for tenant_id in idle:
+                    del shard.buckets[tenant_id]
+                evicted += len(idle)
+        return evicted
+
+
+UPSERT_USAGE_SQL = text("""
+INSERT INTO public.tenant_api_usage (tenant_id, period, request_count, throttled_count, updated_at)
+SELECT u.tenant_id, u.period, u.request_count, u.throttled_count, now()
+FROM unnest(CAST(:tenant_ids AS varchar[]), CAST(:periods AS date[]),
+            CAST(:request_counts AS bigint[]), CAST(:throttled_counts AS bigint[]))
+     AS u(tenant_id, period, request_count, throttled_count)
+ON CONFLICT (tenant_id, period) DO UPDATE SET
+    request_count = tenant_api_usage.request_count + EXCLUDED.request_count,
+    throttled_count = tenant_api_usage.throttled_count + EXCLUDED.throttled_count,
+    updated_at = now()
+""")
+
+
+class UsageFlusher:
+    """定期把用量计数批量写入 public.tenant_api_usage"""
+
+    def __init__(self, limiter: TenantRateLimiter, interval: Optional[float] = None):
+        self.limiter = limiter
+        self.interval = interval or settings.TENANT_USAGE_FLUSH_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动定期写入任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="tenant-usage-flusher")
+
+    async def stop(self) -> None:
+        """停止定期写入任务，并写入剩余计数"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        写入累计的用量计数
+
+        Returns:
+            写入的行数
+        """
+        usage = self.limiter.drain_usage()
+        if not usage:
+            return 0
+        start = time.perf_counter()
+        keys = list(usage)
+        try:
+            async with get_async_engine().begin() as conn:
+                await conn.execute(UPSERT_USAGE_SQL, {
+                    "tenant_ids": [tenant_id for tenant_id, _ in keys],
+                    "periods": [period for _, period in keys],
+                    "request_counts": [usage[key][0] for key in keys],
+                    "throttled_counts": [usage[key][1] for key in keys],
+                })
+        except Exception:
+            self.limiter.restore_usage(usage)
+            raise
+        usage_flush_seconds.observe(time.perf_counter() - start)
+        usage_flush_rows.inc(len(keys))
+        return len(keys)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+                self.limiter.evict_idle(settings.TENANT_RATE_LIMIT_BURST_SECONDS * 10)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"写入租户API用量失败，稍后重试: {str(e)}")
+
+
+class TenantRateLimitMiddleware:
+    """
+    租户API限流中间件（纯ASGI）
+
+    Args:
+        app: 下游ASGI应用
+        limiter: 限流器，默认使用全局 tenant_rate_limiter
+        resolve_tenant: 从ASGI scope解析租户ID的函数，默认 get_request_tenant（读取 TenantResolverMiddleware 的结果）
+        exempt_paths: 不限流的路径前缀
+    """
+
+    def __init__(self, app, limiter: Optional[TenantRateLimiter] = None,
+                 resolve_tenant: Optional[Callable[[dict], Optional[str]]] = None,
+                 exempt_paths: Tuple[str, ...] = ("/health", "/docs", "/redoc", "/openapi.json")):
+        self.app = app
+        self.limiter = limiter or tenant_rate_limiter
+        self.resolve_tenant = resolve_tenant or get_request_tenant
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id = self.resolve_tenant(scope)
+        if not tenant_id:
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic()
+        plan_type = None
+        refresh_plan = self.limiter.needs_plan(tenant_id, now)
+        if refresh_plan:
+            plan_type = await get_tenant_plan_type(tenant_id)
+            if plan_type is None:
+                # 租户不存在：不限流也不计数（由下游返回相应错误）
+                await self.app(scope, receive, send)
+                return
+
+        allowed, retry_after, bucket = self.limiter.hit(tenant_id, plan_type, now, refresh_plan)
+        rate_limit_requests_total.inc(plan_type=bucket.plan_type, result="allowed" if allowed else "throttled")
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({
+            "detail": {
+                "code": 429,
+                "message": "请求过于频繁，请稍后重试",
+                "errors": [{"field": "tenant_id", "message": f"租户 {tenant_id} 超出每分钟 {bucket.limit} 次的请求限制"}]
+            }
+        }, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                (b"x-ratelimit-limit", str(bucket.limit).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# 全局限流器及用量写入任务，写入任务由应用lifespan启动和停止
+tenant_rate_limiter = TenantRateLimiter(shards=settings.TENANT_RATE_LIMIT_SHARDS)
+usage_flusher = UsageFlusher(tenant_rate_limiter)
@@ -0,0 +1,76 @@
+"""
+JSON响应快速路径
+
+接口返回普通对象时，接口先把ORM对象转成字典（日期转字符串）并构造响应模型，FastAPI 再按
+response_model 校验一遍返回值后序列化。model_response 改为用响应模型的 TypeAdapter 校验一次
+（from_attributes，ORM对象可直接放入），再由 pydantic-core 直接序列化为JSON字节，
+返回的 Response 不再经过 FastAPI 的校验和序列化；路由上的 response_model 仍用于生成接口文档。
+
+from_attributes 逐个经SQLAlchemy属性描述符取值，开销大于校验本身；row_values 在所需列均已加载时
+直接交出实例字典。
+"""
+from functools import lru_cache
+from typing import Any, FrozenSet, Optional, Type
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def response_adapter(model: Type) -> TypeAdapter:
+    """响应模型的 TypeAdapter（每个模型只构建一次）"""
+    return TypeAdapter(model)
+
+
+@lru_cache(maxsize=None)
+def _model_fields(model: Type) -> FrozenSet[str]:
+    return frozenset(model.model_fields)
+
+
+def row_values(row: Any, model: Type) -> Any:
+    """
+    ORM对象按数据模型校验时的输入
+
+    Args:
+        row: ORM对象
+        model: 该对象对应的数据模型（如 TenantData）
+
+    Returns:
+        模型所需的列都已加载时返回实例字典（多余的键在校验时忽略），
+        否则返回对象本身，由 from_attributes 取值并触发加载
+    """
+    values = row.__dict__
+    return values if _model_fields(model) <= values.keys() else row
+
+
+def render_model(model: Type, content: Any) -> bytes:
+    """
+    按响应模型校验并序列化为JSON
+
+    Args:
+        model: 响应模型
+        content: 响应内容，嵌套字段可以是字典、模型实例或ORM对象
+
+    Returns:
+        UTF-8编码的JSON
+    """
+    adapter = response_adapter(model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def model_response(model: Type, content: Any, status_code: int = status.HTTP_200_OK,
+                   headers: Optional[dict] = None) -> Response:
+    """
+    按响应模型直接序列化的JSON响应
+
+    Args:
+        model: 响应模型（与路由的 response_model 一致）
+        content: 响应内容
+        status_code: HTTP状态码
+        headers: 额外的响应头
+
+    Returns:
+        application/json 响应
+    """
+    return Response(render_model(model, content), status_code=status_code, headers=headers,
+                    media_type="application/json")
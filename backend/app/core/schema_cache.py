@@ -0,0 +1,184 @@
+"""
+租户schema集合进程内缓存
+
+维护当前库中全部租户schema（tenant_前缀）的名称集合，schema存在性检查和列表不再查询目录：
+- 监听任务建立 LISTEN 后从 pg_namespace 全量加载一次，之后按事件触发器发送的通知
+  （迁移 c6e1d84a2f73：CREATE / ALTER / DROP SCHEMA）增量加入、移除；
+- 每隔 TENANT_SCHEMA_CACHE_RESYNC_INTERVAL 秒全量校正一次，兜底漏掉的通知
+  （如没有超级用户权限、未创建事件触发器，或schema被改名为非租户名称）；
+- 监听连接断开期间缓存标记为不可用，调用方直接查询 pg_namespace；
+- 集合中没有的名称不代表不存在（新建schema的通知可能尚未到达），由调用方回查 pg_namespace。
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+
+logger = logging.getLogger(__name__)
+
+# 租户schema变更通知频道（与迁移中的事件触发器一致）
+TENANT_SCHEMA_CHANGED_CHANNEL = "tenant_schema_changed"
+
+TENANT_SCHEMA_PREFIX = "tenant_"
+
+# 全部租户schema名称（pg_namespace 按名称有唯一索引，前缀匹配走索引范围扫描）
+LIST_TENANT_SCHEMAS_SQL = text(
+    "SELECT nspname FROM pg_namespace WHERE nspname LIKE 'tenant\\_%' ORDER BY nspname"
+)
+SCHEMA_EXISTS_SQL = text("SELECT 1 FROM pg_namespace WHERE nspname = :schema_name")
+
+schema_cache_size = registry.gauge("tenant_schema_cache_size", "租户schema集合缓存中的schema数量")
+schema_cache_events_total = registry.counter(
+    "tenant_schema_cache_events_total", "租户schema集合缓存的更新次数", ["kind"])
+schema_cache_lookups_total = registry.counter(
+    "tenant_schema_cache_lookups_total", "租户schema存在性检查次数（hit 命中缓存，catalog 回查目录）", ["result"])
+
+
+class TenantSchemaCache:
+    """租户schema名称集合（线程安全）"""
+
+    def __init__(self):
+        self._names: set = set()
+        # 排序后的名称快照，集合变化时失效
+        self._sorted: Optional[List[str]] = None
+        self._lock = threading.Lock()
+        self._live = False
+
+    @property
+    def live(self) -> bool:
+        """是否已全量加载且正在接收变更通知"""
+        return self._live
+
+    def __contains__(self, schema_name: str) -> bool:
+        return schema_name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def names(self) -> List[str]:
+        """按名称排序的全部租户schema"""
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._names)
+            return list(self._sorted)
+
+    def add(self, schema_name: str) -> None:
+        if not schema_name.startswith(TENANT_SCHEMA_PREFIX):
+            return
+        with self._lock:
+            if schema_name not in self._names:
+                self._names.add(schema_name)
+                self._sorted = None
+        schema_cache_size.set(len(self._names))
+
+    def discard(self, schema_name: str) -> None:
+        with self._lock:
+            if schema_name in self._names:
+                self._names.discard(schema_name)
+                self._sorted = None
+        schema_cache_size.set(len(self._names))
+
+    def replace(self, names: Iterable[str], live: bool = True) -> None:
+        """全量替换集合"""
+        names = set(names)
+        with self._lock:
+            self._names = names
+            self._sorted = None
+            self._live = live
+        schema_cache_size.set(len(names))
+
+    def mark_stale(self) -> None:
+        """停止使用缓存（监听断开期间可能漏掉变更）"""
+        self._live = False
+
+
+class TenantSchemaCacheListener:
+    """监听租户schema变更通知，增量维护本进程的schema集合"""
+
+    def __init__(self, cache: TenantSchemaCache, resync_interval: Optional[float] = None,
+                 health_interval: float = 30.0):
+        self.cache = cache
+        self.resync_interval = resync_interval or settings.TENANT_SCHEMA_CACHE_RESYNC_INTERVAL
+        self.health_interval = min(health_interval, self.resync_interval)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动监听任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="tenant-schema-cache-listener")
+
+    async def stop(self) -> None:
+        """停止监听任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.cache.mark_stale()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            op, schema_name = json.loads(payload)
+        except ValueError:
+            logger.warning(f"无法解析租户schema变更通知，停用缓存直到下次全量同步: {payload}")
+            self.cache.mark_stale()
+            return
+        if op == "drop":
+            self.cache.discard(schema_name)
+        else:
+            self.cache.add(schema_name)
+        schema_cache_events_total.inc(kind=op)
+
+    async def _resync(self, driver_connection) -> None:
+        start = time.perf_counter()
+        rows = await driver_connection.fetch(LIST_TENANT_SCHEMAS_SQL.text)
+        self.cache.replace(row[0] for row in rows)
+        schema_cache_events_total.inc(kind="resync")
+        logger.info(f"租户schema集合已全量同步: {len(rows)} 个，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with get_async_engine().connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver_connection = raw.driver_connection
+                    await driver_connection.add_listener(TENANT_SCHEMA_CHANGED_CHANNEL, self._on_notify)
+                    try:
+                        # 先监听再全量加载，加载期间的变更由通知补上
+                        await self._resync(driver_connection)
+                        resync_at = time.monotonic() + self.resync_interval
+                        # 直接在驱动连接上执行：不能开启事务，事务中的连接收不到通知
+                        while True:
+                            await asyncio.sleep(self.health_interval)
+                            if time.monotonic() >= resync_at:
+                                await self._resync(driver_connection)
+                                resync_at = time.monotonic() + self.resync_interval
+                            else:
+                                await driver_connection.execute("SELECT 1")
+                    finally:
+                        self.cache.mark_stale()
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(TENANT_SCHEMA_CHANGED_CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"租户schema变更监听中断，稍后重连: {str(e)}")
+                self.cache.mark_stale()
+                await asyncio.sleep(1)
+
+
+# 全局租户schema集合及其监听任务，由应用lifespan启动和停止
+tenant_schema_cache = TenantSchemaCache()
+tenant_schema_cache_listener = TenantSchemaCacheListener(tenant_schema_cache)
@@ -1,11 +1,18 @@
 """
 PostgreSQL Schema管理工具
+
+存在性检查和列表直接查询 pg_namespace（information_schema.schemata 是带权限判断的视图，
+schema数量多时每次都要扫描全部schema），监听任务在线时优先使用进程内的租户schema集合。
 """
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import Optional
 import logging
 
+from app.core.schema_cache import (
+    LIST_TENANT_SCHEMAS_SQL, SCHEMA_EXISTS_SQL, schema_cache_lookups_total, tenant_schema_cache,
+)
+from app.core.tenant_routing import tenant_schema_name
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +25,7 @@ class SchemaManager:
     def create_tenant_schema(self, tenant_id: str) -> bool:
         """为租户创建独立的schema"""
         try:
-            schema_name = f"tenant_{tenant_id}"
+            schema_name = tenant_schema_name(tenant_id)
             
             # 创建schema
             self.db_session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
@@ -31,6 +38,7 @@ class SchemaManager:
             self.db_session.execute(text(f"GRANT ALL PRIVILEGES ON SCHEMA {schema_name} TO CURRENT_USER"))
             
             self.db_session.commit()
+            tenant_schema_cache.add(schema_name)
             logger.info(f"成功创建租户schema: {schema_name}")
             return True
             
@@ -42,12 +50,13 @@ class SchemaManager:
     def drop_tenant_schema(self, tenant_id: str) -> bool:
         """删除租户schema"""
         try:
-            schema_name = f"tenant_{tenant_id}"
+            schema_name = tenant_schema_name(tenant_id)
             
             # 删除schema（CASCADE会删除schema中的所有对象）
             self.db_session.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
             
             self.db_session.commit()
+            tenant_schema_cache.discard(schema_name)
             logger.info(f"成功删除租户schema: {schema_name}")
             return True
             
@@ -57,63 +66,38 @@ class SchemaManager:
             return False
     
     def schema_exists(self, tenant_id: str) -> bool:
-        """检查租户schema是否存在"""
+        """
+        检查租户schema是否存在
+
+        缓存在线且命中时不访问数据库；未命中可能是新建schema的通知尚未到达，回查 pg_namespace，
+        存在则补入缓存。
+        """
         try:
-            schema_name = f"tenant_{tenant_id}"
-            result = self.db_session.execute(
-                text("SELECT schema_name FROM information_schema.schemata WHERE schema_name = :schema_name"),
-                {"schema_name": schema_name}
-            )
-            return result.fetchone() is not None
+            schema_name = tenant_schema_name(tenant_id)
+            if tenant_schema_cache.live and schema_name in tenant_schema_cache:
+                schema_cache_lookups_total.inc(result="hit")
+                return True
+            schema_cache_lookups_total.inc(result="catalog")
+            exists = self.db_session.execute(SCHEMA_EXISTS_SQL, {"schema_name": schema_name}).first() is not None
+            if exists:
+                tenant_schema_cache.add(schema_name)
+            return exists
             
         except Exception as e:
             logger.error(f"检查schema存在性失败: {e}")
             return False
     
     def list_tenant_schemas(self) -> list:
-        """列出所有租户schema"""
+        """列出所有租户schema（按名称排序）"""
         try:
-            result = self.db_session.execute(
-                text("SELECT schema_name FROM information_schema.schemata WHERE schema_name LIKE 'tenant_%'")
-            )
+            if tenant_schema_cache.live:
+                return tenant_schema_cache.names()
+            result = self.db_session.execute(LIST_TENANT_SCHEMAS_SQL)
             return [row[0] for row in result.fetchall()]
             
         except Exception as e:
             logger.error(f"列出租户schema失败: {e}")
             return []
-    
-    def set_search_path(self, tenant_id: Optional[str] = None):
-        """设置数据库搜索路径"""
-        try:
-            if tenant_id:
-                schema_name = f"tenant_{tenant_id}"
-                self.db_session.execute(text(f"SET search_path TO {schema_name}, public"))
-                logger.debug(f"设置搜索路径到: {schema_name}")
-            else:
-                # 重置为默认路径
-                self.db_session.execute(text("SET search_path TO public"))
-                logger.debug("重置搜索路径到: public")
-                
-        except Exception as e:
-            logger.error(f"设置搜索路径失败: {e}")
-    
-    def create_tenant_tables(self, tenant_id: str, base_metadata) -> bool:
-        """在租户schema中创建所有表"""
-        try:
-            schema_name = f"tenant_{tenant_id}"
-            
-            # 设置schema
-            self.set_search_path(tenant_id)
-            
-            # 创建表（这里需要根据具体的模型来创建）
-            # 注意：需要为每个表设置正确的schema
-            logger.info(f"在schema {schema_name} 中创建表")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"创建租户表失败: {e}")
-            return False
 
 
 def get_schema_manager(db: Session) -> SchemaManager:
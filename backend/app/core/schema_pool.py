@@ -0,0 +1,218 @@
+"""
+租户schema预置池
+
+后台预置器按套餐维持一定数量基于模板克隆好的空schema（pool_<随机串>），
+注册租户时在同一事务中原子认领一个并重命名为 tenant_<id>，
+认领后异步补充，注册请求不再承担建schema、建表的目录锁开销。
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, Optional
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import AsyncSessionLocal, get_async_engine
+from app.core.tenant_template import TEMPLATE_VERSION, TenantTemplateManager
+from app.models.tenant_schema_pool import TenantSchemaPool
+
+logger = logging.getLogger(__name__)
+
+POOL_SCHEMA_PREFIX = "pool_"
+
+pool_depth = registry.gauge(
+    "tenant_schema_pool_depth", "预置池中可认领的schema数量", ["plan_type"])
+pool_claim_seconds = registry.histogram(
+    "tenant_schema_pool_claim_seconds", "认领预置schema耗时（秒）", ["plan_type", "result"])
+pool_refilled_total = registry.counter(
+    "tenant_schema_pool_refilled_total", "预置池累计补充的schema数量", ["plan_type"])
+pool_refill_seconds = registry.histogram(
+    "tenant_schema_pool_refill_seconds", "开通单个预置schema耗时（秒）", ["plan_type"])
+pool_refill_rate = registry.gauge(
+    "tenant_schema_pool_refill_rate", "最近一轮补充的速率（schema/秒）", ["plan_type"])
+
+
+def _plan_value(plan_type) -> str:
+    """兼容PlanType枚举与字符串"""
+    return getattr(plan_type, "value", plan_type)
+
+
+class SchemaPool:
+    """租户schema预置池（认领在调用方会话的事务中执行）"""
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def claim(self, plan_type: str, schema_name: str) -> bool:
+        """
+        从预置池认领一个schema并重命名为目标schema
+
+        事务回滚时认领和重命名一并回滚，预置schema回到池中。
+
+        Args:
+            plan_type: 套餐类型
+            schema_name: 目标schema名称
+
+        Returns:
+            是否认领成功（池为空或该套餐未启用预置时返回False）
+        """
+        plan_type = _plan_value(plan_type)
+        if settings.TENANT_POOL_SIZES.get(plan_type, 0) <= 0:
+            return False
+
+        start = time.perf_counter()
+        claimed = self.db_session.execute(
+            text("SELECT public.claim_pooled_schema(:plan_type, :template_version, :target)"),
+            {"plan_type": plan_type, "template_version": TEMPLATE_VERSION, "target": schema_name}
+        ).scalar()
+        pool_claim_seconds.observe(time.perf_counter() - start,
+                                   plan_type=plan_type, result="hit" if claimed else "miss")
+
+        if claimed:
+            pool_depth.dec(plan_type=plan_type)
+            logger.info(f"从预置池认领schema: {schema_name} ({plan_type})")
+        schema_pool_provisioner.request_refill()
+        return bool(claimed)
+
+
+class SchemaPoolProvisioner:
+    """预置池后台补充任务"""
+
+    def __init__(self, pool_sizes: Optional[Dict[str, int]] = None,
+                 refill_interval: Optional[float] = None):
+        self.pool_sizes = pool_sizes if pool_sizes is not None else settings.TENANT_POOL_SIZES
+        self.refill_interval = refill_interval or settings.TENANT_POOL_REFILL_INTERVAL
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动后台补充任务"""
+        if self._task or not any(size > 0 for size in self.pool_sizes.values()):
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="schema-pool-provisioner")
+        logger.info(f"预置池后台任务已启动: {self.pool_sizes}")
+
+    async def stop(self) -> None:
+        """停止后台补充任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+
+    def request_refill(self) -> None:
+        """请求尽快补充（可在任意线程调用）"""
+        if self._loop and self._wakeup:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"补充预置池失败: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def refill(self) -> Dict[str, int]:
+        """
+        清理旧模板版本的预置schema，并把各套餐补充到目标数量
+
+        多个worker通过advisory lock互斥，同一时刻只有一个在补充，避免超量开通。
+
+        Returns:
+            各套餐补充后的池深度（未拿到锁时返回空字典）
+        """
+        async with get_async_engine().connect() as lock_conn:
+            locked = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(hashtext('tenant_schema_pool'))"))
+            if not locked:
+                return {}
+            try:
+                return await self._refill_locked()
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext('tenant_schema_pool'))"))
+
+    async def _refill_locked(self) -> Dict[str, int]:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(self._purge_stale)
+            rows = await db.execute(
+                select(TenantSchemaPool.plan_type, func.count())
+                .where(TenantSchemaPool.template_version == TEMPLATE_VERSION)
+                .group_by(TenantSchemaPool.plan_type)
+            )
+            depths = dict(rows.all())
+
+        for plan_type, target in self.pool_sizes.items():
+            depth = depths.get(plan_type, 0)
+            pool_depth.set(depth, plan_type=plan_type)
+            missing = target - depth
+            if missing <= 0:
+                continue
+
+            started = time.perf_counter()
+            for _ in range(missing):
+                await self._provision_one(plan_type)
+                depth += 1
+                pool_depth.set(depth, plan_type=plan_type)
+            pool_refill_rate.set(missing / (time.perf_counter() - started), plan_type=plan_type)
+            depths[plan_type] = depth
+
+        return depths
+
+    async def _provision_one(self, plan_type: str) -> str:
+        """基于模板开通一个预置schema并登记到池中"""
+        schema_name = f"{POOL_SCHEMA_PREFIX}{uuid.uuid4().hex[:12]}"
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(lambda session: TenantTemplateManager(session).clone_into(schema_name))
+            db.add(TenantSchemaPool(
+                schema_name=schema_name,
+                plan_type=plan_type,
+                template_version=TEMPLATE_VERSION
+            ))
+            await db.commit()
+
+        pool_refill_seconds.observe(time.perf_counter() - start, plan_type=plan_type)
+        pool_refilled_total.inc(plan_type=plan_type)
+        logger.debug(f"预置schema已就绪: {schema_name} ({plan_type})")
+        return schema_name
+
+    @staticmethod
+    def _purge_stale(db: Session) -> None:
+        """删除基于旧模板版本开通的预置schema"""
+        stale_schemas = db.execute(
+            text("DELETE FROM public.tenant_schema_pool WHERE template_version <> :template_version "
+                 "RETURNING schema_name"),
+            {"template_version": TEMPLATE_VERSION}
+        ).scalars().all()
+        for schema_name in stale_schemas:
+            db.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+        db.commit()
+        if stale_schemas:
+            logger.info(f"清理旧模板版本的预置schema: {len(stale_schemas)} 个")
+
+
+# 全局预置器实例，由应用lifespan启动和停止
+schema_pool_provisioner = SchemaPoolProvisioner()
+
+
+def get_schema_pool(db: Session) -> SchemaPool:
+    """获取SchemaPool实例"""
+    return SchemaPool(db)
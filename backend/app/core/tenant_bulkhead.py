@@ -0,0 +1,226 @@
+"""
+租户级并发隔离（舱壁）与公平调度
+
+所有租户共享 app/core/pq_db.py 中的同一个连接池，单个租户的大量请求可能占满全部连接。
+这里在取用数据库会话之前做准入控制：
+- 全局容量：同时进行的租户数据库工作不超过 settings.TENANT_DB_CAPACITY（小于连接池上限，
+  为公共schema上的管理请求保留余量）；
+- 租户上限：每个租户同时进行的数据库工作不超过其套餐对应的上限（TENANT_DB_CONCURRENCY_LIMITS）；
+- 公平调度：容量释放时，在有排队请求且未达上限的租户之间按套餐权重
+  （TENANT_DB_SCHEDULER_WEIGHTS）做平滑加权轮询，同一租户内按先来先服务；
+- 排队超过 TENANT_DB_QUEUE_TIMEOUT 秒时抛出 TenantThrottledError。
+
+指标：所有请求的等待时间按套餐汇总；只有实际排队过的租户才按租户记录等待次数和累计等待时间，
+标签基数只与被限流的租户数量有关。
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from app.config import settings
+from app.core.metrics import registry
+
+DEFAULT_PLAN = "basic"
+
+tenant_db_wait_seconds = registry.histogram(
+    "tenant_db_wait_seconds", "租户数据库准入等待时间（秒）", ["plan_type"])
+tenant_db_throttled_total = registry.counter(
+    "tenant_db_throttled_total", "租户数据库请求需要排队的次数", ["tenant"])
+tenant_db_throttled_seconds_total = registry.counter(
+    "tenant_db_throttled_seconds_total", "租户数据库请求累计排队时间（秒）", ["tenant"])
+tenant_db_rejected_total = registry.counter(
+    "tenant_db_rejected_total", "租户数据库请求排队超时被拒绝的次数", ["tenant"])
+tenant_db_inflight = registry.gauge(
+    "tenant_db_inflight", "正在进行的租户数据库工作数量")
+tenant_db_waiting = registry.gauge(
+    "tenant_db_waiting", "排队等待准入的租户数据库工作数量")
+
+
+class TenantThrottledError(Exception):
+    """租户数据库请求排队超时"""
+
+    def __init__(self, tenant_id: str, waited: float):
+        super().__init__(f"租户 {tenant_id} 的数据库请求排队 {waited:.1f} 秒仍未获得连接")
+        self.tenant_id = tenant_id
+        self.waited = waited
+
+
+class _TenantState:
+    """单个租户的准入状态"""
+
+    __slots__ = ("plan_type", "inflight", "waiters", "current_weight")
+
+    def __init__(self, plan_type: str):
+        self.plan_type = plan_type
+        self.inflight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # 平滑加权轮询的当前权重
+        self.current_weight = 0
+
+
+class TenantBulkhead:
+    """租户数据库准入控制（在单个事件循环中使用）"""
+
+    def __init__(self, capacity: int, limits: Dict[str, int], weights: Dict[str, int],
+                 queue_timeout: Optional[float] = None):
+        self.capacity = capacity
+        self.limits = limits
+        self.weights = weights
+        self.queue_timeout = queue_timeout
+        self._tenants: Dict[str, _TenantState] = {}
+        self._inflight = 0
+        self._waiting = 0
+
+    def limit_for(self, plan_type: str) -> int:
+        """套餐对应的租户并发上限"""
+        return self.limits.get(plan_type, self.limits.get(DEFAULT_PLAN, 1))
+
+    def weight_for(self, plan_type: str) -> int:
+        """套餐对应的调度权重"""
+        return self.weights.get(plan_type, self.weights.get(DEFAULT_PLAN, 1))
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str, plan_type: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        占用一个数据库工作名额，退出时释放
+
+        Args:
+            tenant_id: 租户ID
+            plan_type: 套餐类型，决定并发上限和调度权重
+
+        Raises:
+            TenantThrottledError: 排队超时
+        """
+        await self.acquire(tenant_id, plan_type)
+        try:
+            yield
+        finally:
+            self.release(tenant_id)
+
+    async def acquire(self, tenant_id: str, plan_type: Optional[str] = None) -> float:
+        """
+        获取准入名额
+
+        Args:
+            tenant_id: 租户ID
+            plan_type: 套餐类型
+
+        Returns:
+            排队等待的秒数
+
+        Raises:
+            TenantThrottledError: 排队超时
+        """
+        plan_type = plan_type or DEFAULT_PLAN
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = self._tenants[tenant_id] = _TenantState(plan_type)
+        state.plan_type = plan_type
+
+        # 每次调度后要么全局已满、要么没有可调度的排队者，因此这里无需检查其它租户的队列
+        if self._inflight < self.capacity and state.inflight < self.limit_for(plan_type) and not state.waiters:
+            self._grant(state)
+            tenant_db_wait_seconds.observe(0.0, plan_type=plan_type)
+            return 0.0
+
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        self._set_waiting(1)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # 已获得名额但调用方被取消，归还名额
+                self.release(tenant_id)
+            else:
+                self._remove_waiter(tenant_id, state, future)
+            if isinstance(e, asyncio.TimeoutError):
+                tenant_db_rejected_total.inc(tenant=tenant_id)
+                raise TenantThrottledError(tenant_id, time.perf_counter() - start) from None
+            raise
+
+        waited = time.perf_counter() - start
+        tenant_db_wait_seconds.observe(waited, plan_type=plan_type)
+        tenant_db_throttled_total.inc(tenant=tenant_id)
+        tenant_db_throttled_seconds_total.inc(waited, tenant=tenant_id)
+        return waited
+
+    def release(self, tenant_id: str) -> None:
+        """归还名额并调度排队的请求"""
+        state = self._tenants[tenant_id]
+        state.inflight -= 1
+        self._inflight -= 1
+        tenant_db_inflight.set(self._inflight)
+        self._dispatch()
+        self._forget_if_idle(tenant_id, state)
+
+    def stats(self) -> Dict[str, object]:
+        """当前准入状态：总占用、排队数以及有排队的租户"""
+        return {
+            "capacity": self.capacity,
+            "inflight": self._inflight,
+            "waiting": self._waiting,
+            "tenants": {
+                tenant_id: {"plan_type": state.plan_type, "inflight": state.inflight, "waiting": len(state.waiters)}
+                for tenant_id, state in self._tenants.items() if state.waiters
+            },
+        }
+
+    def _grant(self, state: _TenantState) -> None:
+        state.inflight += 1
+        self._inflight += 1
+        tenant_db_inflight.set(self._inflight)
+
+    def _set_waiting(self, delta: int) -> None:
+        self._waiting += delta
+        tenant_db_waiting.set(self._waiting)
+
+    def _dispatch(self) -> None:
+        """全局有空闲名额时，按平滑加权轮询选择租户并唤醒其最早的排队请求"""
+        while self._inflight < self.capacity:
+            eligible = [
+                state for state in self._tenants.values()
+                if state.waiters and state.inflight < self.limit_for(state.plan_type)
+            ]
+            if not eligible:
+                return
+            total_weight = 0
+            chosen = None
+            for state in eligible:
+                weight = self.weight_for(state.plan_type)
+                state.current_weight += weight
+                total_weight += weight
+                if chosen is None or state.current_weight > chosen.current_weight:
+                    chosen = state
+            chosen.current_weight -= total_weight
+
+            future = chosen.waiters.popleft()
+            self._set_waiting(-1)
+            if future.done():
+                continue
+            self._grant(chosen)
+            future.set_result(None)
+
+    def _remove_waiter(self, tenant_id: str, state: _TenantState, future: asyncio.Future) -> None:
+        try:
+            state.waiters.remove(future)
+            self._set_waiting(-1)
+        except ValueError:
+            pass
+        self._forget_if_idle(tenant_id, state)
+
+    def _forget_if_idle(self, tenant_id: str, state: _TenantState) -> None:
+        if state.inflight == 0 and not state.waiters and self._tenants.get(tenant_id) is state:
+            del self._tenants[tenant_id]
+
+
+# 全局租户准入控制
+tenant_bulkhead = TenantBulkhead(
+    capacity=settings.TENANT_DB_CAPACITY,
+    limits=settings.TENANT_DB_CONCURRENCY_LIMITS,
+    weights=settings.TENANT_DB_SCHEDULER_WEIGHTS,
+    queue_timeout=settings.TENANT_DB_QUEUE_TIMEOUT,
+)
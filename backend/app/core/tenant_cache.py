@@ -0,0 +1,215 @@
+"""
+租户注册表进程内缓存
+
+按 tenant_id、domain、schema_name 三种键缓存 public.tenants 中的租户记录：
+- TTL过期 + 容量上限的LRU淘汰；
+- 负缓存：查不到的键在较短的TTL内直接返回None，避免无效域名反复打到数据库；
+- public.tenants 上的触发器在增删改后发送 NOTIFY，每个worker的监听任务收到后
+  失效对应键（含旧值），监听连接断开重连时清空整个缓存，避免漏掉通知。
+
+缓存中保存的是列值快照，命中时构造新的Tenant对象并以 merge(load=False) 挂到
+调用方会话上，不产生SQL；调用方修改返回的对象不会影响缓存。
+"""
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+from app.models.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+# 租户变更通知频道（与迁移中的触发器一致）
+TENANT_CHANGED_CHANNEL = "tenant_changed"
+
+# 支持的缓存键字段
+LOOKUP_FIELDS = ("tenant_id", "domain", "schema_name")
+
+cache_requests_total = registry.counter(
+    "tenant_cache_requests_total", "租户缓存查询次数", ["lookup", "result"])
+cache_evictions_total = registry.counter(
+    "tenant_cache_evictions_total", "租户缓存淘汰条目数", ["reason"])
+cache_entries = registry.gauge(
+    "tenant_cache_entries", "租户缓存当前条目数")
+
+# 缓存未命中的标记（区别于负缓存命中返回的None）
+MISS = object()
+
+CacheKey = Tuple[str, str]
+
+
+class TenantCache:
+    """租户记录的LRU + TTL缓存（线程安全）"""
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # 键 -> (过期时间, 列值快照；None表示负缓存)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次失效递增；查库前记录，写入时若已变化说明期间有变更，放弃写入避免缓存旧值
+        self.generation = 0
+
+    def get(self, field: str, value: str):
+        """
+        查询缓存
+
+        Args:
+            field: 键字段（tenant_id / domain / schema_name）
+            value: 键值
+
+        Returns:
+            列值快照；负缓存命中返回None；未命中返回MISS
+        """
+        key = (field, value)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                cache_evictions_total.inc(reason="ttl")
+                entry = None
+            if entry is None:
+                cache_requests_total.inc(lookup=field, result="miss")
+                return MISS
+            self._entries.move_to_end(key)
+
+        values = entry[1]
+        cache_requests_total.inc(lookup=field, result="hit" if values is not None else "negative_hit")
+        return values
+
+    def put(self, tenant: Tenant, generation: int) -> None:
+        """
+        按三种键缓存租户记录
+
+        Args:
+            tenant: 租户对象
+            generation: 查库前读取的 generation
+        """
+        values = {attr.key: getattr(tenant, attr.key) for attr in Tenant.__mapper__.column_attrs}
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation != self.generation:
+                return
+            for field in LOOKUP_FIELDS:
+                if values.get(field):
+                    self._set((field, values[field]), (expires_at, values))
+
+    def put_missing(self, field: str, value: str, generation: int) -> None:
+        """负缓存：记录该键不存在"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._set((field, value), (time.monotonic() + self.negative_ttl, None))
+
+    def invalidate(self, keys: Iterable[CacheKey]) -> None:
+        """失效指定键"""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    cache_evictions_total.inc(reason="invalidate")
+            cache_entries.set(len(self._entries))
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self.generation += 1
+            if self._entries:
+                cache_evictions_total.inc(len(self._entries), reason="invalidate")
+            self._entries.clear()
+            cache_entries.set(0)
+
+    def _set(self, key: CacheKey, entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            cache_evictions_total.inc(reason="size")
+        cache_entries.set(len(self._entries))
+
+
+def build_tenant(values: Dict[str, Any]) -> Tenant:
+    """由列值快照构造处于detached状态的Tenant对象"""
+    tenant = Tenant(**copy.deepcopy(values))
+    make_transient_to_detached(tenant)
+    return tenant
+
+
+class TenantCacheListener:
+    """监听租户变更通知并失效本进程缓存"""
+
+    def __init__(self, cache: TenantCache, health_interval: float = 30.0):
+        self.cache = cache
+        self.health_interval = health_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动监听任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="tenant-cache-listener")
+
+    async def stop(self) -> None:
+        """停止监听任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            keys = json.loads(payload)
+        except ValueError:
+            logger.warning(f"无法解析租户变更通知，清空缓存: {payload}")
+            self.cache.clear()
+            return
+        self.cache.invalidate((field, value) for field, value in keys if value)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with get_async_engine().connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver_connection = raw.driver_connection
+                    await driver_connection.add_listener(TENANT_CHANGED_CHANNEL, self._on_notify)
+                    # 监听建立之前的变更可能已错过
+                    self.cache.clear()
+                    logger.info("租户缓存失效监听已启动")
+                    try:
+                        # 直接在驱动连接上探活：不能开启事务，事务中的连接收不到通知
+                        while True:
+                            await asyncio.sleep(self.health_interval)
+                            await driver_connection.execute("SELECT 1")
+                    finally:
+                        if not driver_connection.is_closed():
+                            await driver_connection.remove_listener(TENANT_CHANGED_CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"租户缓存失效监听中断，稍后重连: {str(e)}")
+                self.cache.clear()
+                await asyncio.sleep(1)
+
+
+# 全局租户缓存及其失效监听，由应用lifespan启动和停止
+tenant_cache = TenantCache(
+    maxsize=settings.TENANT_CACHE_SIZE,
+    ttl=settings.TENANT_CACHE_TTL,
+    negative_ttl=settings.TENANT_CACHE_NEGATIVE_TTL,
+)
+tenant_cache_listener = TenantCacheListener(tenant_cache)
@@ -1,11 +1,18 @@
 """
 租户上下文管理器
 """
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
-from typing import Optional
-from fastapi import Request, Depends
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, Request, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from .db_metrics import tag_request_tenant
 from .schema_manager import get_schema_manager, SchemaManager
+from .tenant_bulkhead import TenantThrottledError, tenant_bulkhead
+from .tenant_storage import tenant_storage_accountant
+from .tenant_resolver import get_request_tenant
+from .tenant_routing import async_tenant_session, tenant_schema_name
 
 # 租户上下文变量
 tenant_context: ContextVar[Optional[str]] = ContextVar("tenant_id", default=None)
@@ -16,7 +23,7 @@ class TenantContext:
     
     def __init__(self, tenant_id: str):
         self.tenant_id = tenant_id
-        self.schema_name = f"tenant_{tenant_id}"
+        self.schema_name = tenant_schema_name(tenant_id)
     
     def __enter__(self):
         # 设置租户上下文
@@ -37,50 +44,32 @@ def get_current_schema() -> Optional[str]:
     """获取当前租户schema名称"""
     tenant_id = get_current_tenant()
     if tenant_id:
-        return f"tenant_id"
+        return tenant_schema_name(tenant_id)
     return None
 
 
 def extract_tenant_from_request(request: Request) -> Optional[str]:
-    """从请求中提取租户信息"""
-    # 方法1: 从子域名提取
-    host = request.headers.get("host", "")
-    if "." in host:
-        subdomain = host.split(".")[0]
-        if subdomain and subdomain != "tenant_id":
-            return subdomain
-    
-    # 方法2: 从路径提取
-    path = request.url.path
-    if path.startswith("/tenant/"):
-        tenant_part = path.split("/")[2]
-        if tenant_part:
-            return tenant_part
-    
-    # 方法3: 从查询参数提取
-    tenant_id = request.query_params.get("tenant_id")
-    if tenant_id:
-        return tenant_id
-    
-    # 方法4: 从请求头提取
-    tenant_id = request.headers.get("x-tenant_id")
-    if tenant_id:
-        return tenant_id
-    
-    return None
+    """
+    从请求中提取租户信息
 
+    返回 TenantResolverMiddleware 在路由前解析的结果（Host、路径、查询参数、请求头，
+    见 app.core.tenant_resolver）；未经过该中间件时只从路径、查询参数、请求头解析。
+    """
+    return get_request_tenant(request.scope)
 
-def set_tenant_context(tenant_id: str, db: Session):
-    """设置租户上下文并切换数据库schema"""
-    schema_manager = get_schema_manager(db)
-    schema_manager.set_search_path(tenant_id)
+
+def set_tenant_context(tenant_id: str):
+    """
+    设置租户上下文
+
+    只记录当前租户，不修改数据库会话状态；
+    数据库访问通过 get_tenant_db 获取已路由到租户schema的会话。
+    """
     tenant_context.set(tenant_id)
 
 
-def clear_tenant_context(db: Session):
-    """清除租户上下文并重置数据库schema"""
-    schema_manager = get_schema_manager(db)
-    schema_manager.set_search_path(None)
+def clear_tenant_context():
+    """清除租户上下文"""
     tenant_context.set(None)
 
 
@@ -95,23 +84,119 @@ def require_tenant_context(tenant_id: str, db: Session):
         raise ValueError(f"租户 {tenant_id} 不存在")
     
     # 设置租户上下文
-    set_tenant_id
+    set_tenant_context(tenant_id)
     return tenant_id
 
 
 # FastAPI依赖函数
-def get_tenant_dependency(request: Request, db: Session = Depends()) -> str:
+def get_tenant_dependency(request: Request) -> str:
     """获取租户ID的依赖函数"""
     tenant_id = extract_tenant_from_request(request)
     if not tenant_id:
         raise ValueError("无法从请求中提取租户信息")
     
-    # 设置租户上下文
-    set_tenant_context(tenant_id, db)
+    # 租户上下文通常已由 TenantResolverMiddleware 设置
+    if tenant_context.get() != tenant_id:
+        set_tenant_context(tenant_id)
     
     return tenant_id
 
 
 def get_tenant_schema_dependency(tenant_id: str = Depends(get_tenant_dependency)) -> str:
     """获取租户schema名称的依赖函数"""
-    return f"tenant_{tenant_id}"
+    return tenant_schema_name(tenant_id)
+
+
+async def get_tenant_plan_type(tenant_id: str) -> Optional[str]:
+    """查询租户套餐类型（经租户缓存，通常不产生SQL），租户不存在时返回None"""
+    from app.core.pq_db import AsyncSessionLocal
+    from app.repos.tenant import AsyncTenantRepo
+
+    async with AsyncSessionLocal() as db:
+        tenant = await AsyncTenantRepo(db).get_by_id(tenant_id)
+        return tenant.plan_type if tenant else None
+
+
+# 不写入数据的请求方法，不受存储配额限制
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+async def require_tenant_plan_type(tenant_id: str) -> str:
+    """
+    确认租户存在并返回其套餐类型
+
+    租户ID来自客户端，先确认租户存在，未知租户不占用准入名额、不路由到不存在的schema。
+
+    Raises:
+        HTTPException: 租户不存在（404）
+    """
+    plan_type = await get_tenant_plan_type(tenant_id)
+    if plan_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": 404,
+                "message": "租户不存在",
+                "errors": [{"field": "tenant_id", "message": f"租户 {tenant_id} 不存在"}]
+            }
+        )
+    return plan_type
+
+
+@asynccontextmanager
+async def tenant_db_session(tenant_id: str, plan_type: str) -> AsyncIterator[AsyncSession]:
+    """
+    占用一个租户数据库准入名额并打开路由到租户schema的异步会话，退出时关闭会话、释放名额
+
+    请求级依赖在响应发送前清理时，流式响应需在生成器内自行使用本函数（见审计日志导出）。
+
+    Args:
+        tenant_id: 租户ID
+        plan_type: 套餐类型
+
+    Raises:
+        HTTPException: 排队超时（503）
+    """
+    try:
+        await tenant_bulkhead.acquire(tenant_id, plan_type)
+    except TenantThrottledError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "code": 503,
+                "message": "租户请求过多，请稍后重试",
+                "errors": [{"field": "tenant_id", "message": str(e)}]
+            },
+            headers={"Retry-After": "1"}
+        )
+    try:
+        async with async_tenant_session(tenant_schema_name(tenant_id)) as db:
+            yield db
+    finally:
+        tenant_bulkhead.release(tenant_id)
+
+
+async def get_tenant_db(request: Request, tenant_id: str = Depends(get_tenant_dependency)):
+    """
+    获取路由到当前租户schema的异步数据库会话
+
+    会话存续期间占用一个租户数据库准入名额（见 app.core.tenant_bulkhead），
+    单个租户的并发数据库工作受其套餐上限约束，排队超时返回503；
+    存储用量超出配额的租户（见 app.core.tenant_storage）的写请求返回507，租户不存在返回404。
+
+    Yields:
+        AsyncSession: 租户业务表（schema=None的模型）均映射到当前租户schema
+    """
+    plan_type = await require_tenant_plan_type(tenant_id)
+    tag_request_tenant(tenant_id)
+    if request.method not in READ_ONLY_METHODS and tenant_storage_accountant.is_over_quota(tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail={
+                "code": 507,
+                "message": "存储空间已超出配额",
+                "errors": [{"field": "tenant_id", "message": f"租户 {tenant_id} 的存储用量已超出配额，仅允许读取"}]
+            }
+        )
+    async with tenant_db_session(tenant_id, plan_type) as db:
+        yield db
@@ -0,0 +1,246 @@
+"""
+跨租户并发查询（fan-out）
+
+对每个租户schema执行同一条参数化查询，结果按完成顺序流式返回，可选合并为一个汇总结果：
+- 查询可以是带 {schema} 占位符的SQL字符串（只替换该占位符，其余花括号原样保留），
+  也可以是使用租户业务表模型（schema=None）的SQLAlchemy语句，后者通过 schema_translate_map 路由到各租户schema；
+- 使用独立连接池（连接数 = 并发数），不占用应用连接池；固定数量的worker从队列中取schema，
+  2万个租户也只有 concurrency 个任务和连接；
+- 连接只读（default_transaction_read_only）并带 statement_timeout；单个schema出错或超时只记入该schema的结果，
+  不影响其它schema。
+"""
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.sql import Executable
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.tenant_routing import tenant_execution_options
+
+logger = logging.getLogger(__name__)
+
+# 单个schema的执行结果状态
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+# statement_timeout 触发的取消（query_canceled）
+QUERY_CANCELED_SQLSTATE = "57014"
+
+fanout_schema_seconds = registry.histogram(
+    "tenant_fanout_schema_seconds", "跨租户查询中单个schema的执行耗时（秒）")
+fanout_results_total = registry.counter(
+    "tenant_fanout_results_total", "跨租户查询的schema执行结果数", ["status"])
+
+FanOutQueryType = Union[str, Executable]
+
+
+class SchemaResult:
+    """单个租户schema的查询结果"""
+
+    __slots__ = ("tenant_id", "schema_name", "status", "rows", "error", "elapsed_ms")
+
+    def __init__(self, tenant_id: Optional[str], schema_name: str, status: str,
+                 rows: Optional[List[Dict[str, Any]]] = None, error: Optional[str] = None,
+                 elapsed_ms: float = 0.0):
+        self.tenant_id = tenant_id
+        self.schema_name = schema_name
+        self.status = status
+        self.rows = rows or []
+        self.error = error
+        self.elapsed_ms = elapsed_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tenant_id": self.tenant_id,
+            "schema_name": self.schema_name,
+            "status": self.status,
+            "rows": self.rows,
+            "error": self.error,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+def merge_sum(results: Iterable[SchemaResult]) -> Dict[str, Any]:
+    """把所有成功schema的各行按列名求和（只累加数值列）"""
+    totals: Dict[str, Any] = {}
+    for result in results:
+        for row in result.rows:
+            for column, value in row.items():
+                if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+                    totals[column] = totals.get(column, 0) + value
+    return totals
+
+
+def merge_rows(results: Iterable[SchemaResult]) -> List[Dict[str, Any]]:
+    """把所有成功schema的行拼接为一个列表，每行附带 tenant_id"""
+    return [{"tenant_id": result.tenant_id, **row} for result in results for row in result.rows]
+
+
+# 命令行可用的合并方式
+MERGERS: Dict[str, Callable[[Iterable[SchemaResult]], Any]] = {"sum": merge_sum, "rows": merge_rows}
+
+
+class TenantFanOut:
+    """跨租户并发查询执行器"""
+
+    def __init__(self, concurrency: Optional[int] = None, statement_timeout_ms: Optional[int] = None):
+        self.concurrency = concurrency or settings.TENANT_FANOUT_CONCURRENCY
+        self.statement_timeout_ms = (settings.TENANT_FANOUT_STATEMENT_TIMEOUT_MS
+                                     if statement_timeout_ms is None else statement_timeout_ms)
+        # 独立引擎：连接数与并发数一致，不占用应用连接池；
+        # 只读和语句超时作为连接参数在建连时设置，自动提交，每个schema只有查询本身一次往返
+        self.engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL, pool_size=self.concurrency, max_overflow=0,
+            isolation_level="AUTOCOMMIT",
+            connect_args={"server_settings": {
+                "default_transaction_read_only": "on",
+                "statement_timeout": str(int(self.statement_timeout_ms)),
+            }},
+        )
+
+    async def dispose(self) -> None:
+        """关闭执行器的连接池"""
+        await self.engine.dispose()
+
+    async def discover_schemas(self, schemas: Optional[Iterable[str]] = None) -> List[Tuple[Optional[str], str]]:
+        """
+        列出需要查询的租户schema（只包含实际存在的schema）
+
+        Args:
+            schemas: 指定schema列表，默认取 public.tenants 中登记的全部租户
+
+        Returns:
+            按schema名称排序的 (tenant_id, schema_name) 列表
+        """
+        async with self.engine.connect() as conn:
+            if schemas is not None:
+                rows = await conn.execute(text(
+                    "SELECT t.tenant_id, n.nspname FROM pg_namespace n "
+                    "LEFT JOIN public.tenants t ON t.schema_name = n.nspname "
+                    "WHERE n.nspname = ANY(CAST(:schemas AS text[])) ORDER BY n.nspname"
+                ), {"schemas": list(schemas)})
+            else:
+                rows = await conn.execute(text(
+                    "SELECT t.tenant_id, t.schema_name FROM public.tenants t "
+                    "JOIN pg_namespace n ON n.nspname = t.schema_name ORDER BY t.schema_name"
+                ))
+            return [(tenant_id, schema_name) for tenant_id, schema_name in rows.all()]
+
+    async def stream(self, query: FanOutQueryType, params: Optional[Dict[str, Any]] = None,
+                     schemas: Optional[Iterable[str]] = None) -> AsyncIterator[SchemaResult]:
+        """
+        对每个租户schema执行查询，按完成顺序逐个返回结果
+
+        提前结束迭代时应使用 contextlib.aclosing 关闭生成器，执行中的查询结束后连接才会归还。
+
+        Args:
+            query: 带 {schema} 占位符的SQL字符串，或使用租户业务表模型的SQLAlchemy语句
+            params: 查询参数（各schema相同）
+            schemas: 指定schema列表，默认全部租户
+
+        Yields:
+            SchemaResult: 单个schema的结果（含失败和超时的schema）
+        """
+        targets = await self.discover_schemas(schemas)
+        pending = iter(targets)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        done = object()
+        stopping = asyncio.Event()
+
+        async def worker() -> None:
+            try:
+                for tenant_id, schema_name in pending:
+                    if stopping.is_set():
+                        break
+                    await results.put(await self._execute(query, params, tenant_id, schema_name))
+            finally:
+                await results.put(done)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(targets)))]
+        remaining = len(workers)
+        try:
+            while remaining:
+                result = await results.get()
+                if result is done:
+                    remaining -= 1
+                    continue
+                yield result
+        finally:
+            # 调用方提前结束时不再开始新的schema，等待执行中的查询（受statement_timeout约束）结束，
+            # 不取消任务，避免中途断开连接
+            stopping.set()
+            while remaining:
+                if await results.get() is done:
+                    remaining -= 1
+
+    async def run(self, query: FanOutQueryType, params: Optional[Dict[str, Any]] = None,
+                  schemas: Optional[Iterable[str]] = None,
+                  merge: Optional[Callable[[Sequence[SchemaResult]], Any]] = None) -> Dict[str, Any]:
+        """
+        对每个租户schema执行查询并汇总
+
+        Args:
+            query: 同 stream
+            params: 查询参数
+            schemas: 指定schema列表，默认全部租户
+            merge: 合并函数，接收全部成功的schema结果（如 merge_sum / merge_rows），
+                   为空时返回每个schema的结果
+
+        Returns:
+            {"schemas", "ok", "failed", "timed_out", "elapsed_s", "errors": [失败/超时的schema结果],
+             "merged" 或 "results"}
+        """
+        start = time.perf_counter()
+        succeeded: List[SchemaResult] = []
+        failures: List[SchemaResult] = []
+        async for result in self.stream(query, params, schemas):
+            (succeeded if result.status == STATUS_OK else failures).append(result)
+
+        summary: Dict[str, Any] = {
+            "schemas": len(succeeded) + len(failures),
+            "ok": len(succeeded),
+            "failed": sum(1 for result in failures if result.status == STATUS_ERROR),
+            "timed_out": sum(1 for result in failures if result.status == STATUS_TIMEOUT),
+            "elapsed_s": round(time.perf_counter() - start, 3),
+            "errors": [result.to_dict() for result in failures],
+        }
+        if merge is not None:
+            summary["merged"] = merge(succeeded)
+        else:
+            summary["results"] = [result.to_dict() for result in succeeded]
+        return summary
+
+    async def _execute(self, query: FanOutQueryType, params: Optional[Dict[str, Any]],
+                       tenant_id: Optional[str], schema_name: str) -> SchemaResult:
+        """对单个schema执行查询（连接只读、带语句超时），错误和超时记入结果"""
+        start = time.perf_counter()
+        status, rows, error = STATUS_OK, None, None
+        try:
+            async with self.engine.connect() as conn:
+                if isinstance(query, str):
+                    result = await conn.execute(text(query.replace("{schema}", schema_name)), params or {})
+                else:
+                    routed = await conn.execution_options(**tenant_execution_options(schema_name))
+                    result = await routed.execute(query, params or {})
+                rows = [dict(row) for row in result.mappings().all()] if result.returns_rows else []
+        except DBAPIError as e:
+            cause = e.orig.__cause__ or e.orig if e.orig is not None else e
+            status = STATUS_TIMEOUT if getattr(e.orig, "sqlstate", None) == QUERY_CANCELED_SQLSTATE else STATUS_ERROR
+            error = f"{type(cause).__name__}: {cause}"
+        except Exception as e:
+            status, error = STATUS_ERROR, str(e)
+
+        elapsed = time.perf_counter() - start
+        fanout_schema_seconds.observe(elapsed)
+        fanout_results_total.inc(status=status)
+        if status != STATUS_OK:
+            logger.warning(f"跨租户查询 {schema_name} {status}: {error}")
+        return SchemaResult(tenant_id, schema_name, status, rows, error, elapsed * 1000)
@@ -0,0 +1,398 @@
+"""
+租户schema迁移
+
+Alembic 只迁移 public schema；每个 tenant_<id> schema 中的业务表由这里的迁移管理：
+- 迁移脚本放在 app/tenant_migrations/versions 下，每个模块定义 revision、down_revision
+  和 upgrade(conn, schema)，按 down_revision 串成一条线性版本链；
+- 每个租户schema中的 tenant_schema_version 表记录该schema的当前版本，
+  与迁移DDL在同一事务中提交，中断后重跑只会处理未完成的schema；
+- 租户模板构建时执行全部迁移并写入最新版本，新开通的租户schema天然处于最新版本；
+- TenantMigrationRunner 用有界线程池并发迁移所有租户schema，支持 dry-run、
+  金丝雀批次、断点续跑（public.tenant_migration_checkpoints）和进度报告。
+"""
+import importlib
+import logging
+import pkgutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_PACKAGE = "app.tenant_migrations.versions"
+
+# 租户schema中的版本表
+VERSION_TABLE = "tenant_schema_version"
+VERSION_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS {schema}.tenant_schema_version (
+    version_num VARCHAR(32) PRIMARY KEY
+)
+"""
+
+# 迁移结果状态
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+class TenantRevision:
+    """单个租户迁移版本"""
+
+    def __init__(self, revision: str, down_revision: Optional[str],
+                 upgrade: Callable[[Connection, str], None], doc: str = ""):
+        self.revision = revision
+        self.down_revision = down_revision
+        self.upgrade = upgrade
+        self.doc = doc
+
+    def __repr__(self) -> str:
+        return f"<TenantRevision {self.revision} <- {self.down_revision}>"
+
+
+def load_revisions(package: str = VERSIONS_PACKAGE) -> List[TenantRevision]:
+    """
+    加载迁移脚本并按版本链排序
+
+    Args:
+        package: 迁移脚本所在包
+
+    Returns:
+        从最早到最新排序的版本列表
+
+    Raises:
+        RuntimeError: 版本链不是单一线性链（有分叉、断链或重复）
+    """
+    module = importlib.import_module(package)
+    by_down: Dict[Optional[str], TenantRevision] = {}
+    for info in pkgutil.iter_modules(module.__path__):
+        script = importlib.import_module(f"{package}.{info.name}")
+        revision = TenantRevision(script.revision, script.down_revision, script.upgrade,
+                                  (script.__doc__ or "").strip().splitlines()[0] if script.__doc__ else "")
+        if revision.down_revision in by_down:
+            raise RuntimeError(f"租户迁移版本链分叉: {revision.down_revision}")
+        by_down[revision.down_revision] = revision
+
+    ordered: List[TenantRevision] = []
+    current = by_down.pop(None, None)
+    while current is not None:
+        ordered.append(current)
+        current = by_down.pop(current.revision, None)
+    if by_down:
+        raise RuntimeError(f"租户迁移版本链断开: {sorted(r.revision for r in by_down.values())}")
+    return ordered
+
+
+REVISIONS: List[TenantRevision] = load_revisions()
+HEAD_REVISION: Optional[str] = REVISIONS[-1].revision if REVISIONS else None
+
+
+def pending_revisions(current: Optional[str], revisions: Sequence[TenantRevision] = REVISIONS,
+                      target: Optional[str] = None) -> List[TenantRevision]:
+    """
+    从当前版本升级到目标版本需要执行的迁移
+
+    Args:
+        current: 当前版本，None 表示尚未执行任何迁移
+        revisions: 有序版本列表
+        target: 目标版本，默认最新版本
+
+    Returns:
+        需要依次执行的迁移
+
+    Raises:
+        ValueError: 当前版本或目标版本不在版本链中，或目标版本早于当前版本
+    """
+    ids = [revision.revision for revision in revisions]
+    start = 0
+    if current is not None:
+        if current not in ids:
+            raise ValueError(f"未知的租户schema版本: {current}")
+        start = ids.index(current) + 1
+    end = len(ids)
+    if target is not None:
+        if target not in ids:
+            raise ValueError(f"未知的目标版本: {target}")
+        end = ids.index(target) + 1
+    if end < start:
+        raise ValueError(f"目标版本 {target} 早于当前版本 {current}，不支持降级")
+    return list(revisions[start:end])
+
+
+def get_schema_version(conn: Connection, schema_name: str) -> Optional[str]:
+    """读取单个租户schema的当前版本（没有版本表时返回None）"""
+    exists = conn.execute(
+        text("SELECT to_regclass(:table)"), {"table": f"{schema_name}.{VERSION_TABLE}"}
+    ).scalar()
+    if exists is None:
+        return None
+    return conn.execute(text(f"SELECT version_num FROM {schema_name}.{VERSION_TABLE}")).scalar()
+
+
+def upgrade_schema(conn: Connection, schema_name: str, revisions: Sequence[TenantRevision] = REVISIONS,
+                   target: Optional[str] = None) -> Optional[str]:
+    """
+    在调用方事务中把租户schema升级到目标版本
+
+    Args:
+        conn: 数据库连接（调用方负责事务）
+        schema_name: 租户schema名称
+        revisions: 有序版本列表
+        target: 目标版本，默认最新版本
+
+    Returns:
+        升级前的版本
+    """
+    current = get_schema_version(conn, schema_name)
+    pending = pending_revisions(current, revisions, target)
+    if not pending:
+        return current
+
+    conn.execute(text(VERSION_TABLE_DDL.format(schema=schema_name)))
+    for revision in pending:
+        revision.upgrade(conn, schema_name)
+    conn.execute(text(f"DELETE FROM {schema_name}.{VERSION_TABLE}"))
+    conn.execute(
+        text(f"INSERT INTO {schema_name}.{VERSION_TABLE} (version_num) VALUES (:version)"),
+        {"version": pending[-1].revision}
+    )
+    return current
+
+
+class TenantMigrationRunner:
+    """并发迁移所有租户schema"""
+
+    def __init__(self, workers: Optional[int] = None, target: Optional[str] = None,
+                 revisions: Optional[Sequence[TenantRevision]] = None,
+                 lock_timeout_ms: Optional[int] = None, progress_interval: float = 5.0,
+                 db_engine: Optional[Engine] = None):
+        self.workers = workers or settings.TENANT_MIGRATION_WORKERS
+        self.revisions = list(revisions) if revisions is not None else REVISIONS
+        self.target = target or (self.revisions[-1].revision if self.revisions else None)
+        self.lock_timeout_ms = lock_timeout_ms if lock_timeout_ms is not None else settings.TENANT_MIGRATION_LOCK_TIMEOUT_MS
+        self.progress_interval = progress_interval
+        # 独立引擎：连接数与工作线程数一致，不占用应用连接池
+        self.engine = db_engine or create_engine(
+            settings.DATABASE_URL, pool_size=self.workers, max_overflow=0, pool_pre_ping=True
+        )
+
+    def discover_schemas(self, schemas: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        列出需要迁移的租户schema（只包含实际存在的schema）
+
+        Args:
+            schemas: 指定schema列表，默认取 public.tenants 中登记的全部租户
+
+        Returns:
+            按名称排序的schema列表
+        """
+        with self.engine.connect() as conn:
+            if schemas is not None:
+                rows = conn.execute(
+                    text("SELECT nspname FROM pg_namespace WHERE nspname = ANY(CAST(:schemas AS text[]))"),
+                    {"schemas": list(schemas)}
+                )
+            else:
+                rows = conn.execute(text(
+                    "SELECT t.schema_name FROM public.tenants t "
+                    "JOIN pg_namespace n ON n.nspname = t.schema_name"
+                ))
+            return sorted(rows.scalars().all())
+
+    def scan_versions(self, schemas: Sequence[str], batch_size: int = 1000) -> Dict[str, Optional[str]]:
+        """
+        批量读取schema当前版本
+
+        先从系统目录一次查出带版本表的schema，再按批用 UNION ALL 读取版本号，
+        不必逐个schema往返。
+
+        Args:
+            schemas: schema列表
+            batch_size: 每条 UNION ALL 查询包含的schema数量
+
+        Returns:
+            schema名称 -> 当前版本（没有版本表的schema为None）
+        """
+        versions: Dict[str, Optional[str]] = {schema: None for schema in schemas}
+        with self.engine.connect() as conn:
+            versioned = conn.execute(
+                text("SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                     "WHERE c.relname = :table AND c.relkind = 'r' AND n.nspname = ANY(CAST(:schemas AS text[]))"),
+                {"table": VERSION_TABLE, "schemas": list(schemas)}
+            ).scalars().all()
+            for i in range(0, len(versioned), batch_size):
+                batch = versioned[i:i + batch_size]
+                union = " UNION ALL ".join(
+                    f"SELECT :s{j} AS schema_name, version_num FROM {schema}.{VERSION_TABLE}"
+                    for j, schema in enumerate(batch)
+                )
+                rows = conn.execute(text(union), {f"s{j}": schema for j, schema in enumerate(batch)})
+                versions.update(dict(rows.all()))
+        return versions
+
+    def plan(self, schemas: Optional[Iterable[str]] = None,
+             run_id: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        生成迁移计划：落后于目标版本、且未在指定批次中完成的schema
+
+        Args:
+            schemas: 指定schema列表，默认全部租户
+            run_id: 续跑的批次ID，跳过该批次中已完成的schema
+
+        Returns:
+            待迁移schema -> 当前版本（保持名称顺序）
+        """
+        candidates = self.discover_schemas(schemas)
+        if run_id:
+            with self.engine.connect() as conn:
+                done = set(conn.execute(
+                    text("SELECT schema_name FROM public.tenant_migration_checkpoints "
+                         "WHERE run_id = :run_id AND status = :status"),
+                    {"run_id": run_id, "status": STATUS_DONE}
+                ).scalars().all())
+            candidates = [schema for schema in candidates if schema not in done]
+
+        versions = self.scan_versions(candidates)
+        plan: Dict[str, Optional[str]] = {}
+        for schema in candidates:
+            current = versions.get(schema)
+            if pending_revisions(current, self.revisions, self.target):
+                plan[schema] = current
+        return plan
+
+    def migrate_one(self, run_id: str, schema_name: str) -> str:
+        """
+        在独立事务中迁移单个schema，成功时同一事务写入断点
+
+        Returns:
+            done / skipped（已被其它进程迁移或正被迁移）
+        """
+        start = time.perf_counter()
+        with self.engine.begin() as conn:
+            if self.lock_timeout_ms:
+                conn.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+            locked = conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext('tenant_migration'), hashtext(:schema))"),
+                {"schema": schema_name}
+            ).scalar()
+            if not locked:
+                return STATUS_SKIPPED
+            from_version = upgrade_schema(conn, schema_name, self.revisions, self.target)
+            self._checkpoint(conn, run_id, schema_name, STATUS_DONE, from_version,
+                             duration_ms=int((time.perf_counter() - start) * 1000))
+        return STATUS_DONE
+
+    def run(self, schemas: Optional[Iterable[str]] = None, run_id: Optional[str] = None,
+            dry_run: bool = False, canary: int = 0, canary_only: bool = False) -> Dict[str, object]:
+        """
+        迁移全部（或指定）租户schema
+
+        Args:
+            schemas: 指定schema列表，默认全部租户
+            run_id: 批次ID；传入已有批次ID即续跑，跳过其中已完成的schema
+            dry_run: 只输出计划，不执行
+            canary: 先迁移的金丝雀schema数量，金丝雀有失败则中止
+            canary_only: 只迁移金丝雀批次
+
+        Returns:
+            运行摘要
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        plan = self.plan(schemas, run_id)
+        summary: Dict[str, object] = {
+            "run_id": run_id, "target": self.target, "planned": len(plan),
+            "from_versions": self._count_by_version(plan),
+        }
+        if dry_run or not plan:
+            summary.update(done=0, failed=0, skipped=0)
+            return summary
+
+        logger.info(f"租户迁移 {run_id}: {len(plan)} 个schema待升级到 {self.target}，并发 {self.workers}")
+        pending = list(plan)
+        batches = [pending[:canary], pending[canary:]] if canary else [pending]
+        totals = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_SKIPPED: 0}
+        started = time.perf_counter()
+        for index, batch in enumerate(batches):
+            if not batch:
+                continue
+            counts = self._run_batch(run_id, batch, plan)
+            for status, count in counts.items():
+                totals[status] += count
+            if canary and index == 0:
+                if counts[STATUS_FAILED]:
+                    logger.error(f"租户迁移 {run_id}: 金丝雀批次有 {counts[STATUS_FAILED]} 个失败，中止")
+                    summary["aborted"] = True
+                    break
+                if canary_only:
+                    break
+
+        summary.update(done=totals[STATUS_DONE], failed=totals[STATUS_FAILED],
+                       skipped=totals[STATUS_SKIPPED], elapsed_s=round(time.perf_counter() - started, 2))
+        return summary
+
+    def _run_batch(self, run_id: str, schemas: List[str], plan: Dict[str, Optional[str]]) -> Dict[str, int]:
+        counts = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_SKIPPED: 0}
+        started = last_report = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tenant-migrate") as pool:
+            futures = {pool.submit(self.migrate_one, run_id, schema): schema for schema in schemas}
+            for future in as_completed(futures):
+                schema = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    status = STATUS_FAILED
+                    logger.error(f"租户schema {schema} 迁移失败: {str(e)}")
+                    self._record_failure(run_id, schema, plan.get(schema), str(e))
+                counts[status] += 1
+                now = time.perf_counter()
+                if now - last_report >= self.progress_interval or sum(counts.values()) == len(schemas):
+                    last_report = now
+                    self._report_progress(run_id, counts, len(schemas), now - started)
+        return counts
+
+    def _report_progress(self, run_id: str, counts: Dict[str, int], total: int, elapsed: float) -> None:
+        finished = sum(counts.values())
+        rate = finished / elapsed if elapsed else 0.0
+        eta = (total - finished) / rate if rate else 0.0
+        logger.info(
+            f"租户迁移 {run_id}: {finished}/{total} 完成 {counts[STATUS_DONE]} 失败 {counts[STATUS_FAILED]} "
+            f"跳过 {counts[STATUS_SKIPPED]}，{rate:.1f} schema/秒，预计剩余 {eta:.0f} 秒"
+        )
+
+    def _record_failure(self, run_id: str, schema_name: str, from_version: Optional[str], error: str) -> None:
+        try:
+            with self.engine.begin() as conn:
+                self._checkpoint(conn, run_id, schema_name, STATUS_FAILED, from_version, error=error[:1000])
+        except Exception as e:
+            logger.error(f"记录租户迁移失败断点出错: {str(e)}")
+
+    def _checkpoint(self, conn: Connection, run_id: str, schema_name: str, status: str,
+                    from_version: Optional[str], duration_ms: Optional[int] = None,
+                    error: Optional[str] = None) -> None:
+        conn.execute(
+            text("""
+            INSERT INTO public.tenant_migration_checkpoints
+                (run_id, schema_name, status, from_version, to_version, error, duration_ms)
+            VALUES (:run_id, :schema_name, :status, :from_version, :to_version, :error, :duration_ms)
+            ON CONFLICT (run_id, schema_name) DO UPDATE SET
+                status = EXCLUDED.status, from_version = EXCLUDED.from_version,
+                to_version = EXCLUDED.to_version, error = EXCLUDED.error,
+                duration_ms = EXCLUDED.duration_ms, updated_at = now()
+            """),
+            {"run_id": run_id, "schema_name": schema_name, "status": status, "from_version": from_version,
+             "to_version": self.target, "error": error, "duration_ms": duration_ms}
+        )
+
+    @staticmethod
+    def _count_by_version(plan: Dict[str, Optional[str]]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for version in plan.values():
+            key = version or "base"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
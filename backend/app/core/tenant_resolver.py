@@ -0,0 +1,264 @@
+"""
+请求租户解析
+
+TenantResolverMiddleware 在路由之前为每个请求解析一次租户，结果写入租户上下文变量和
+scope["state"]["tenant_id"]，下游的限流中间件和 get_tenant_dependency 直接读取，不再重复解析。
+
+解析顺序：
+1. Host：先按租户自定义域名（Tenant.domain）精确匹配，再按平台子域名
+   <tenant_id>.<TENANT_BASE_DOMAINS 之一> 匹配；IP地址和不带点的主机名不查询；
+2. 路径 /tenant/<tenant_id>/...；
+3. 查询参数 tenant_id；
+4. 请求头 X-Tenant-ID（x-tenant_id）。
+
+Host 的解析结果（含未知Host的负结果）缓存在进程内 LRU 中，底层经 AsyncTenantRepo 查询
+（通常命中租户缓存，不产生SQL）；租户缓存收到变更通知后 generation 递增，
+此前缓存的条目在下次命中时重新解析。查询数据库失败时记录日志、不缓存，继续按后几种方式解析；
+TENANT_HOST_RESOLVE_SKIP_PATHS 中的路径（健康检查、指标、接口文档等）不按Host解析。
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.tenant_cache import tenant_cache
+
+logger = logging.getLogger(__name__)
+
+# 租户解析结果在 scope["state"] 中的键
+TENANT_STATE_KEY = "tenant_id"
+
+TENANT_HEADER = b"x-tenant_id"
+
+# 未命中的标记（区别于负缓存命中返回的None）
+MISS = object()
+
+_TENANT_PATH = re.compile(r"^/tenant/([^/]+)")
+_IPV4_HOST = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}$")
+
+resolver_requests_total = registry.counter(
+    "tenant_resolver_requests_total", "按来源统计的请求租户解析次数", ["source"])
+host_cache_requests_total = registry.counter(
+    "tenant_host_cache_requests_total", "按Host解析租户的缓存查询次数", ["result"])
+host_lookup_errors_total = registry.counter(
+    "tenant_host_lookup_errors_total", "按Host解析租户时查询数据库失败的次数")
+
+
+class HostTenantCache:
+    """Host -> tenant_id 的 LRU + TTL 缓存（线程安全，负结果缓存为None）"""
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # Host -> (过期时间, 写入时的租户缓存generation, tenant_id或None)
+        self._entries: "OrderedDict[str, Tuple[float, int, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host: str):
+        """
+        查询缓存
+
+        Returns:
+            tenant_id；负缓存命中返回None；未命中、过期或租户数据已变更返回MISS
+        """
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != tenant_cache.generation:
+                host_cache_requests_total.inc(result="miss")
+                return MISS
+            self._entries.move_to_end(host)
+        host_cache_requests_total.inc(result="hit" if entry[2] is not None else "negative_hit")
+        return entry[2]
+
+    def put(self, host: str, tenant_id: Optional[str], generation: int) -> None:
+        """
+        写入解析结果
+
+        Args:
+            host: 规范化后的Host
+            tenant_id: 解析出的租户ID，None表示未知Host
+            generation: 解析前读取的租户缓存generation
+        """
+        ttl = self.ttl if tenant_id is not None else self.negative_ttl
+        with self._lock:
+            self._entries[host] = (time.monotonic() + ttl, generation, tenant_id)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TenantResolver:
+    """
+    预编译的请求租户解析器
+
+    Args:
+        base_domains: 平台子域名所属的基础域名
+        cache: Host解析结果缓存
+        skip_host_paths: 不按Host解析租户的路径（精确匹配）
+    """
+
+    def __init__(self, base_domains: Iterable[str], cache: HostTenantCache, skip_host_paths: Iterable[str] = ()):
+        self.cache = cache
+        self.skip_host_paths = frozenset(skip_host_paths)
+        domains = [domain.lower().strip(".") for domain in base_domains if domain]
+        self._subdomain = re.compile(
+            r"^([a-z0-9_-]+)\.(?:" + "|".join(re.escape(domain) for domain in domains) + r")$"
+        ) if domains else None
+
+    @staticmethod
+    def normalize_host(raw_host: bytes) -> Optional[str]:
+        """去掉端口和末尾的点并转为小写；IP地址、不带点的主机名返回None"""
+        host = raw_host.decode("latin-1").strip().lower()
+        if not host or host.startswith("["):
+            return None
+        host = host.rsplit(":", 1)[0].rstrip(".")
+        if "." not in host or _IPV4_HOST.match(host):
+            return None
+        return host
+
+    async def resolve_host(self, host: str) -> Optional[str]:
+        """
+        按Host解析租户ID（自定义域名优先，其次平台子域名），结果写入缓存
+
+        查询数据库失败时返回None且不写入缓存，由调用方继续按路径、查询参数、请求头解析。
+        """
+        tenant_id = self.cache.get(host)
+        if tenant_id is not MISS:
+            return tenant_id
+
+        from app.core.pq_db import AsyncSessionLocal
+        from app.repos.tenant import AsyncTenantRepo
+
+        generation = tenant_cache.generation
+        try:
+            async with AsyncSessionLocal() as db:
+                repo = AsyncTenantRepo(db)
+                tenant = await repo.get_by_domain(host)
+                if tenant is None and self._subdomain is not None:
+                    match = self._subdomain.match(host)
+                    if match:
+                        tenant = await repo.get_by_id(match.group(1))
+                tenant_id = tenant.tenant_id if tenant else None
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            host_lookup_errors_total.inc()
+            logger.warning(f"按Host解析租户失败，跳过Host解析: {host}: {str(e)}")
+            return None
+        self.cache.put(host, tenant_id, generation)
+        return tenant_id
+
+    @staticmethod
+    def resolve_explicit(scope, tenant_header: Optional[bytes] = None) -> Tuple[Optional[str], str]:
+        """
+        从路径、查询参数、请求头解析租户ID（不查询数据库）
+
+        Args:
+            scope: ASGI scope
+            tenant_header: 已取出的 X-Tenant-ID 请求头（未携带时为b""），None时从scope中查找
+
+        Returns:
+            (tenant_id, 来源)，未解析到时为 (None, "none")
+        """
+        match = _TENANT_PATH.match(scope["path"])
+        if match:
+            return match.group(1), "path"
+
+        query_string = scope.get("query_string", b"")
+        if b"tenant_id=" in query_string:
+            for key, value in parse_qsl(query_string.decode("latin-1")):
+                if key == "tenant_id" and value:
+                    return value, "query"
+
+        if tenant_header is None:
+            tenant_header = next((value for key, value in scope["headers"] if key == TENANT_HEADER), None)
+        if tenant_header:
+            return tenant_header.decode("latin-1"), "header"
+        return None, "none"
+
+    async def resolve(self, scope) -> Optional[str]:
+        """按 Host、路径、查询参数、请求头的顺序解析请求的租户ID"""
+        raw_host = tenant_header = None
+        for key, value in scope["headers"]:
+            if key == b"host":
+                raw_host = value
+            elif key == TENANT_HEADER:
+                tenant_header = value
+
+        if raw_host and scope["path"] not in self.skip_host_paths:
+            host = self.normalize_host(raw_host)
+            if host is not None:
+                tenant_id = await self.resolve_host(host)
+                if tenant_id is not None:
+                    resolver_requests_total.inc(source="host")
+                    return tenant_id
+
+        tenant_id, source = self.resolve_explicit(scope, tenant_header or b"")
+        resolver_requests_total.inc(source=source)
+        return tenant_id
+
+
+def get_request_tenant(scope) -> Optional[str]:
+    """
+    当前请求的租户ID
+
+    已经过 TenantResolverMiddleware 时直接返回其结果，否则只从路径、查询参数、请求头解析。
+    """
+    state = scope.get("state")
+    if state is not None and TENANT_STATE_KEY in state:
+        return state[TENANT_STATE_KEY]
+    return TenantResolver.resolve_explicit(scope)[0]
+
+
+class TenantResolverMiddleware:
+    """
+    请求租户解析中间件（纯ASGI，需位于限流中间件外层）
+
+    Args:
+        app: 下游ASGI应用
+        resolver: 租户解析器，默认使用全局 tenant_resolver
+    """
+
+    def __init__(self, app, resolver: Optional[TenantResolver] = None):
+        # tenant_context 依赖本模块，在构造时导入以避免循环导入
+        from app.core.tenant_context import tenant_context
+
+        self.app = app
+        self.resolver = resolver or tenant_resolver
+        self.tenant_context = tenant_context
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tenant_id = await self.resolver.resolve(scope)
+        scope.setdefault("state", {})[TENANT_STATE_KEY] = tenant_id
+        token = self.tenant_context.set(tenant_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tenant_context.reset(token)
+
+
+# 全局租户解析器
+tenant_resolver = TenantResolver(
+    settings.TENANT_BASE_DOMAINS,
+    HostTenantCache(
+        maxsize=settings.TENANT_HOST_CACHE_SIZE,
+        ttl=settings.TENANT_HOST_CACHE_TTL,
+        negative_ttl=settings.TENANT_HOST_CACHE_NEGATIVE_TTL,
+    ),
+    skip_host_paths=settings.TENANT_HOST_RESOLVE_SKIP_PATHS,
+)
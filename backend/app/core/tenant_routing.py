@@ -0,0 +1,66 @@
+"""
+租户路由
+
+租户业务表模型（User、Role、UserRole、TenantInvitation、AuditLog）均声明为 schema=None，
+通过SQLAlchemy执行选项 schema_translate_map 在执行时把它们映射到目标租户schema，
+不再在会话上执行 SET search_path：
+- 不增加额外的数据库往返；
+- 路由信息只存在于本次会话/语句的执行选项中，不会残留在连接池的连接上串到下一个请求；
+- 编译缓存中的SQL只包含schema占位符，执行时才替换为实际schema名，
+  因此所有租户共享同一份编译结果，缓存大小与租户数量无关。
+"""
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.pq_db import AsyncSessionLocal, SessionLocal, get_async_engine, get_engine
+
+
+def tenant_schema_name(tenant_id: str) -> str:
+    """租户ID对应的schema名称"""
+    return f"tenant_{tenant_id}"
+
+
+def tenant_execution_options(schema_name: str) -> Dict[str, Any]:
+    """
+    将租户业务表路由到指定schema的执行选项
+
+    可直接用于 Session.execute(..., execution_options=...)。
+
+    Args:
+        schema_name: 租户schema名称
+
+    Returns:
+        执行选项字典
+    """
+    return {"schema_translate_map": {None: schema_name}}
+
+
+def tenant_session(schema_name: str) -> Session:
+    """
+    创建路由到指定租户schema的同步会话
+
+    会话绑定到带有 schema_translate_map 的引擎副本，与默认引擎共享连接池。
+
+    Args:
+        schema_name: 租户schema名称
+
+    Returns:
+        数据库会话，由调用方负责关闭
+    """
+    return SessionLocal(bind=get_engine().execution_options(**tenant_execution_options(schema_name)))
+
+
+def async_tenant_session(schema_name: str) -> AsyncSession:
+    """
+    创建路由到指定租户schema的异步会话
+
+    Args:
+        schema_name: 租户schema名称
+
+    Returns:
+        异步数据库会话，可配合 async with 使用
+    """
+    return AsyncSessionLocal(bind=get_async_engine().execution_options(**tenant_execution_options(schema_name)))
+
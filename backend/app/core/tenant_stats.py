@@ -0,0 +1,159 @@
+"""
+租户统计汇总
+
+public.tenant_stats 每个租户一行，读取统计时只按主键取一行，与租户用户数无关：
+- 增量：租户schema中 users / audit_logs 上的语句级触发器（租户迁移 c8e2f4a7b391）
+  把每条写语句带来的变化累加到汇总行，批量写入只触发一次；
+- 校正：TenantStatsRefresher 定期挑选没有汇总、从未校正、跨月或超过 TENANT_STATS_MAX_AGE
+  未校正的租户，每轮 TENANT_STATS_REFRESH_BATCH 个，用一条 UNION ALL 查询重新计数并覆盖汇总，
+  修正触发器之外的写入（手工SQL、迁移前已有的数据）和月份切换。
+
+校正时先锁住汇总行再计数：并发事务的触发器会等待校正提交后再累加，
+其写入在校正的快照中不可见，因此不会重复或遗漏。
+"""
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+from app.core.rate_limit import current_period
+
+logger = logging.getLogger(__name__)
+
+stats_refresh_seconds = registry.histogram(
+    "tenant_stats_refresh_seconds", "一轮租户统计校正耗时（秒）")
+stats_refreshed_total = registry.counter(
+    "tenant_stats_refreshed_total", "累计校正的租户统计数量")
+
+
+def _month_start(period: date) -> datetime:
+    return datetime(period.year, period.month, 1, tzinfo=timezone.utc)
+
+
+async def refresh_tenant_stats(conn: AsyncConnection, tenants: Sequence[Tuple[str, str]]) -> int:
+    """
+    重新计数并覆盖租户统计汇总（在调用方事务中执行，不提交）
+
+    Args:
+        conn: 数据库连接
+        tenants: (租户ID, schema名称) 列表，schema须已存在
+
+    Returns:
+        校正的租户数量
+    """
+    if not tenants:
+        return 0
+    tenant_ids = [tenant_id for tenant_id, _ in tenants]
+    period = current_period()
+
+    # 先补齐并锁住汇总行，阻塞并发触发器的累加直到本事务提交
+    await conn.execute(text(
+        "INSERT INTO public.tenant_stats (tenant_id, total_users, active_users, new_users_count) "
+        "SELECT unnest(CAST(:tenant_ids AS varchar[])), 0, 0, 0 ON CONFLICT (tenant_id) DO NOTHING"
+    ), {"tenant_ids": tenant_ids})
+    await conn.execute(text(
+        "SELECT 1 FROM public.tenant_stats WHERE tenant_id = ANY(CAST(:tenant_ids AS varchar[])) "
+        "ORDER BY tenant_id FOR UPDATE"
+    ), {"tenant_ids": tenant_ids})
+
+    params = {"since": _month_start(period), "period": period}
+    selects = []
+    for i, (tenant_id, schema_name) in enumerate(tenants):
+        params[f"t{i}"] = tenant_id
+        selects.append(
+            f"SELECT CAST(:t{i} AS varchar) AS tenant_id, count(*) AS total_users, "
+            f"count(*) FILTER (WHERE status = 'active') AS active_users, "
+            f"count(*) FILTER (WHERE created_at >= :since) AS new_users_count "
+            f"FROM {schema_name}.users"
+        )
+    await conn.execute(text(f"""
+        UPDATE public.tenant_stats s SET
+            total_users = c.total_users,
+            active_users = c.active_users,
+            new_users_period = :period,
+            new_users_count = c.new_users_count,
+            refreshed_at = now(),
+            updated_at = now()
+        FROM ({" UNION ALL ".join(selects)}) c
+        WHERE s.tenant_id = c.tenant_id
+    """), params)
+    return len(tenants)
+
+
+class TenantStatsRefresher:
+    """定期校正租户统计汇总"""
+
+    def __init__(self, interval: Optional[float] = None, batch_size: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        self.interval = interval or settings.TENANT_STATS_REFRESH_INTERVAL
+        self.batch_size = batch_size or settings.TENANT_STATS_REFRESH_BATCH
+        self.max_age = max_age or settings.TENANT_STATS_MAX_AGE
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动定期校正任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="tenant-stats-refresher")
+
+    async def stop(self) -> None:
+        """停止定期校正任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def stale_tenants(self, conn: AsyncConnection) -> List[Tuple[str, str]]:
+        """挑选需要校正的租户，从未校正的优先，其次按校正时间从旧到新"""
+        rows = await conn.execute(text("""
+            SELECT t.tenant_id, t.schema_name
+            FROM public.tenants t
+            JOIN pg_namespace n ON n.nspname = t.schema_name
+            LEFT JOIN public.tenant_stats s ON s.tenant_id = t.tenant_id
+            WHERE s.refreshed_at IS NULL
+               OR s.refreshed_at < now() - make_interval(secs => :max_age)
+               OR s.new_users_period IS DISTINCT FROM :period
+            ORDER BY s.refreshed_at NULLS FIRST
+            LIMIT :limit
+        """), {"max_age": self.max_age, "period": current_period(), "limit": self.batch_size})
+        return [(row.tenant_id, row.schema_name) for row in rows]
+
+    async def refresh_once(self) -> int:
+        """
+        校正一批租户
+
+        Returns:
+            校正的租户数量
+        """
+        start = time.perf_counter()
+        async with get_async_engine().begin() as conn:
+            refreshed = await refresh_tenant_stats(conn, await self.stale_tenants(conn))
+        if refreshed:
+            stats_refresh_seconds.observe(time.perf_counter() - start)
+            stats_refreshed_total.inc(refreshed)
+        return refreshed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"校正租户统计失败，稍后重试: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+# 全局统计校正任务，由应用lifespan启动和停止
+tenant_stats_refresher = TenantStatsRefresher()
@@ -0,0 +1,149 @@
+"""
+租户存储用量统计与配额检查
+
+- 统计：一条 INSERT ... SELECT 语句按 pg_namespace 聚合 pg_class 中各租户schema的表、索引、
+  物化视图及其TOAST表的页数（relpages × block_size），整体覆盖 public.tenant_storage_usage。
+  只读系统目录，不像逐表调用 pg_total_relation_size 那样打开每个关系文件、
+  对每张表加锁，2万个租户也只是一次目录扫描；
+  relpages 由 VACUUM / ANALYZE（含autovacuum）维护，统计结果相应有一定滞后。
+- 配额：每轮统计后把超出 Tenant.max_storage 的租户加载到内存集合，
+  写请求只做一次集合查找（见 app.core.tenant_context.get_tenant_db）。
+
+多个worker同时运行时，通过advisory lock保证同一时刻只有一个在统计，其余只重新加载超额租户。
+"""
+import asyncio
+import logging
+import time
+from typing import Optional, Set
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.metrics import registry
+from app.core.pq_db import get_async_engine
+
+logger = logging.getLogger(__name__)
+
+storage_measure_seconds = registry.histogram(
+    "tenant_storage_measure_seconds", "一轮租户存储统计耗时（秒）")
+storage_over_quota = registry.gauge(
+    "tenant_storage_over_quota", "超出存储配额的租户数量")
+
+MEASURE_STORAGE_SQL = text("""
+INSERT INTO public.tenant_storage_usage (tenant_id, table_bytes, index_bytes, used_bytes, measured_at)
+SELECT s.tenant_id, s.table_bytes, s.index_bytes, s.table_bytes + s.index_bytes, now()
+FROM (
+    SELECT t.tenant_id,
+           COALESCE(sum(GREATEST(c.relpages, 0) + COALESCE(tc.relpages, 0))
+                    FILTER (WHERE c.relkind IN ('r', 'm')), 0) * current_setting('block_size')::bigint AS table_bytes,
+           COALESCE(sum(GREATEST(c.relpages, 0))
+                    FILTER (WHERE c.relkind = 'i'), 0) * current_setting('block_size')::bigint AS index_bytes
+    FROM public.tenants t
+    JOIN pg_namespace n ON n.nspname = t.schema_name
+    LEFT JOIN pg_class c ON c.relnamespace = n.oid AND c.relkind IN ('r', 'm', 'i')
+    LEFT JOIN pg_class tc ON tc.oid = c.reltoastrelid
+    GROUP BY t.tenant_id
+) s
+ON CONFLICT (tenant_id) DO UPDATE SET
+    table_bytes = EXCLUDED.table_bytes,
+    index_bytes = EXCLUDED.index_bytes,
+    used_bytes = EXCLUDED.used_bytes,
+    measured_at = EXCLUDED.measured_at
+""")
+
+OVER_QUOTA_SQL = text("""
+SELECT u.tenant_id
+FROM public.tenant_storage_usage u
+JOIN public.tenants t ON t.tenant_id = u.tenant_id
+WHERE t.max_storage IS NOT NULL AND u.used_bytes > t.max_storage
+""")
+
+
+class StorageQuotaExceededError(Exception):
+    """租户存储用量超出配额"""
+
+    def __init__(self, tenant_id: str):
+        super().__init__(f"租户 {tenant_id} 的存储用量已超出配额")
+        self.tenant_id = tenant_id
+
+
+class TenantStorageAccountant:
+    """定期统计租户存储用量并维护超额租户集合"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.TENANT_STORAGE_REFRESH_INTERVAL
+        self._over_quota: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在当前事件循环中启动定期统计任务"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(), name="tenant-storage-accountant")
+
+    async def stop(self) -> None:
+        """停止定期统计任务"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def is_over_quota(self, tenant_id: str) -> bool:
+        """租户是否超出存储配额（只查内存集合）"""
+        return tenant_id in self._over_quota
+
+    def check_quota(self, tenant_id: str) -> None:
+        """
+        检查租户存储配额
+
+        Raises:
+            StorageQuotaExceededError: 存储用量超出配额
+        """
+        if tenant_id in self._over_quota:
+            raise StorageQuotaExceededError(tenant_id)
+
+    async def measure(self) -> int:
+        """
+        统计全部租户的存储用量（另一个worker正在统计时跳过）
+
+        Returns:
+            更新的租户数量，跳过时返回-1
+        """
+        start = time.perf_counter()
+        async with get_async_engine().begin() as conn:
+            locked = await conn.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext('tenant_storage'))"))
+            if not locked:
+                return -1
+            measured = (await conn.execute(MEASURE_STORAGE_SQL)).rowcount
+        storage_measure_seconds.observe(time.perf_counter() - start)
+        return measured
+
+    async def load_over_quota(self) -> Set[str]:
+        """重新加载超出配额的租户集合"""
+        async with get_async_engine().connect() as conn:
+            self._over_quota = set((await conn.execute(OVER_QUOTA_SQL)).scalars().all())
+        storage_over_quota.set(len(self._over_quota))
+        return self._over_quota
+
+    async def refresh(self) -> None:
+        """统计一轮并重新加载超额租户"""
+        await self.measure()
+        await self.load_over_quota()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"统计租户存储用量失败，稍后重试: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+# 全局存储统计任务，由应用lifespan启动和停止
+tenant_storage_accountant = TenantStorageAccountant()
@@ -0,0 +1,315 @@
+"""
+租户模板Schema管理
+
+租户业务表的结构和初始数据只在模板schema中构建一次，
+新租户通过服务端函数 public.clone_tenant_schema 一次性克隆表结构和种子数据。
+模板按表定义的内容哈希做版本管理，表定义变化后自动重建新版本模板。
+模板构建时还会执行全部租户迁移（见 app.core.tenant_migrations），
+克隆出的schema带有版本表且处于最新版本。
+"""
+import hashlib
+import json
+import logging
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.audit_partitions import ensure_partitions
+from app.core.tenant_migrations import REVISIONS, upgrade_schema
+
+logger = logging.getLogger(__name__)
+
+# 租户schema中的业务表定义，{schema} 为目标schema占位符
+TENANT_TABLES_DDL: List[str] = [
+    # 用户表
+    """
+    CREATE TABLE {schema}.users (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id VARCHAR(50) UNIQUE NOT NULL,
+        username VARCHAR(50) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        hashed_password VARCHAR(255) NOT NULL,
+        full_name VARCHAR(100),
+        phone VARCHAR(20),
+        avatar_url VARCHAR(255),
+        status public.user_status DEFAULT 'active',
+        role public.user_role DEFAULT 'user',
+        last_login_at TIMESTAMP WITH TIME ZONE,
+        email_verified_at TIMESTAMP WITH TIME ZONE,
+        phone_verified_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    # 角色表
+    """
+    CREATE TABLE {schema}.roles (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        name VARCHAR(50) UNIQUE NOT NULL,
+        description TEXT,
+        permissions JSONB,
+        is_system BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    # 用户角色关联表
+    """
+    CREATE TABLE {schema}.user_roles (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        role_id INTEGER NOT NULL,
+        assigned_by INTEGER,
+        assigned_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        UNIQUE(user_id, role_id)
+    )
+    """,
+    # 邀请表
+    """
+    CREATE TABLE {schema}.tenant_invitations (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        email VARCHAR(255) NOT NULL,
+        role_id INTEGER,
+        token VARCHAR(255) UNIQUE NOT NULL,
+        status public.invitation_status DEFAULT 'pending',
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        invited_by INTEGER NOT NULL,
+        accepted_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+    # 审计日志表
+    """
+    CREATE TABLE {schema}.audit_logs (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id INTEGER,
+        action VARCHAR(100) NOT NULL,
+        resource_type VARCHAR(50),
+        resource_id VARCHAR(50),
+        details JSONB,
+        ip_address INET,
+        user_agent TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+    """,
+]
+
+# 默认角色（模板种子数据）
+DEFAULT_ROLES: List[dict] = [
+    {"name": "super_admin", "description": "超级管理员，拥有所有权限", "permissions": {"all": True}},
+    {"name": "admin", "description": "管理员，拥有大部分管理权限",
+     "permissions": {"user_management": True, "role_management": True}},
+    {"name": "user", "description": "普通用户，基础权限", "permissions": {"read": True}},
+]
+
+# 服务端克隆函数：建schema、按模板建表（含索引/约束/identity；分区表按相同分区键重建并复制各分区）、
+# 为 DEFAULT nextval 的列在目标schema中建独立序列（LIKE 复制的默认值仍指向模板的序列）、
+# 复制种子数据并校正序列，最后复制触发器（LIKE INCLUDING ALL 不包含触发器）。
+# 只使用 PostgreSQL 12 起可用的系统目录列
+CLONE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION public.clone_tenant_schema(source_schema text, target_schema text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    tbl record;
+    part record;
+    col record;
+    trg record;
+    seq text;
+    seq_name text;
+    copied bigint;
+BEGIN
+    EXECUTE format('CREATE SCHEMA %I', target_schema);
+
+    FOR tbl IN
+        SELECT c.oid, c.relname, c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = source_schema AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+        ORDER BY c.relname
+    LOOP
+        IF tbl.relkind = 'p' THEN
+            EXECUTE format('CREATE TABLE %I.%I (LIKE %I.%I INCLUDING ALL) PARTITION BY %s',
+                           target_schema, tbl.relname, source_schema, tbl.relname,
+                           pg_get_partkeydef(tbl.oid));
+            FOR part IN
+                SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = tbl.oid
+                ORDER BY c.relname
+            LOOP
+                EXECUTE format('CREATE TABLE %I.%I PARTITION OF %I.%I %s',
+                               target_schema, part.relname, target_schema, tbl.relname, part.bound);
+            END LOOP;
+        ELSE
+            EXECUTE format('CREATE TABLE %I.%I (LIKE %I.%I INCLUDING ALL)',
+                           target_schema, tbl.relname, source_schema, tbl.relname);
+        END IF;
+
+        FOR col IN
+            SELECT a.attname, pg_get_serial_sequence(format('%I.%I', source_schema, tbl.relname), a.attname) AS src_seq
+            FROM pg_attribute a
+            WHERE a.attrelid = tbl.oid AND a.attnum > 0 AND NOT a.attisdropped AND a.attidentity = ''
+        LOOP
+            CONTINUE WHEN col.src_seq IS NULL;
+            SELECT c.relname INTO seq_name FROM pg_class c WHERE c.oid = col.src_seq::regclass;
+            EXECUTE format('CREATE SEQUENCE %I.%I', target_schema, seq_name);
+            EXECUTE format('ALTER TABLE %I.%I ALTER COLUMN %I SET DEFAULT nextval(%L::regclass)',
+                           target_schema, tbl.relname, col.attname, format('%I.%I', target_schema, seq_name));
+            EXECUTE format('ALTER SEQUENCE %I.%I OWNED BY %I.%I.%I',
+                           target_schema, seq_name, target_schema, tbl.relname, col.attname);
+        END LOOP;
+        EXECUTE format('INSERT INTO %I.%I OVERRIDING SYSTEM VALUE SELECT * FROM %I.%I',
+                       target_schema, tbl.relname, source_schema, tbl.relname);
+        GET DIAGNOSTICS copied = ROW_COUNT;
+        CONTINUE WHEN copied = 0;
+
+        FOR col IN
+            SELECT a.attname
+            FROM pg_attribute a
+            WHERE a.attrelid = format('%I.%I', target_schema, tbl.relname)::regclass
+              AND a.attnum > 0 AND NOT a.attisdropped
+        LOOP
+            seq := pg_get_serial_sequence(format('%I.%I', target_schema, tbl.relname), col.attname);
+            CONTINUE WHEN seq IS NULL;
+            EXECUTE format('SELECT setval(%L, COALESCE(MAX(%I), 0) + 1, false) FROM %I.%I',
+                           seq, col.attname, target_schema, tbl.relname);
+        END LOOP;
+    END LOOP;
+
+    FOR trg IN
+        SELECT pg_get_triggerdef(t.oid) AS def, c.relname
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        -- 分区上的触发器由父表触发器克隆产生，只复制非分区表上的
+        WHERE n.nspname = source_schema AND NOT t.tgisinternal AND NOT c.relispartition
+        ORDER BY c.relname, t.tgname
+    LOOP
+        EXECUTE replace(trg.def,
+                        format(' ON %I.%I ', source_schema, trg.relname),
+                        format(' ON %I.%I ', target_schema, trg.relname));
+    END LOOP;
+END;
+$$
+"""
+
+TEMPLATE_SCHEMA_PREFIX = "template_tenant_"
+
+
+def _compute_template_version() -> str:
+    """根据表定义、种子数据、克隆函数和租户迁移版本计算模板版本号"""
+    digest = hashlib.sha1()
+    for ddl in TENANT_TABLES_DDL:
+        digest.update(" ".join(ddl.split()).encode("utf-8"))
+    digest.update(json.dumps(DEFAULT_ROLES, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    digest.update(" ".join(CLONE_FUNCTION_SQL.split()).encode("utf-8"))
+    for revision in REVISIONS:
+        digest.update(revision.revision.encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+TEMPLATE_VERSION = _compute_template_version()
+
+
+class TenantTemplateManager:
+    """租户模板Schema管理工具"""
+
+    # 本进程已确认存在的模板版本，避免每次注册都查询系统目录
+    _ready_version: Optional[str] = None
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    @property
+    def template_schema(self) -> str:
+        """当前版本的模板schema名称"""
+        return f"{TEMPLATE_SCHEMA_PREFIX}{TEMPLATE_VERSION}"
+
+    def ensure_template(self) -> str:
+        """
+        确保当前版本的模板schema已构建
+
+        模板在独立连接和事务中构建并提交，不影响调用方会话中的事务；
+        通过advisory lock保证多个worker并发启动时只构建一次。
+
+        Returns:
+            模板schema名称
+        """
+        if TenantTemplateManager._ready_version == TEMPLATE_VERSION:
+            return self.template_schema
+
+        with self.db_session.get_bind().begin() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('tenant_template'))"))
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_namespace WHERE nspname = :schema_name"),
+                {"schema_name": self.template_schema}
+            ).first()
+            if not exists:
+                self._build_template(conn)
+
+        TenantTemplateManager._ready_version = TEMPLATE_VERSION
+        return self.template_schema
+
+    def clone_into(self, schema_name: str) -> None:
+        """
+        基于模板克隆出新的租户schema（在调用方会话的事务中执行）
+
+        Args:
+            schema_name: 目标schema名称
+        """
+        template_schema = self.ensure_template()
+        self.db_session.execute(
+            text("SELECT public.clone_tenant_schema(:source, :target)"),
+            {"source": template_schema, "target": schema_name}
+        )
+        # 模板中的审计日志分区是构建时的月份，补建当前月份起的分区
+        ensure_partitions(self.db_session.connection(), schema_name)
+        logger.debug(f"基于模板 {template_schema} 克隆租户schema: {schema_name}")
+
+    def _build_template(self, conn: Connection) -> None:
+        """构建当前版本模板"""
+        template_schema = self.template_schema
+        logger.info(f"构建租户模板schema: {template_schema}")
+
+        conn.execute(text(CLONE_FUNCTION_SQL))
+        conn.execute(text(f"CREATE SCHEMA {template_schema}"))
+        for ddl in TENANT_TABLES_DDL:
+            conn.execute(text(ddl.format(schema=template_schema)))
+
+        insert_role_sql = text(
+            f"INSERT INTO {template_schema}.roles (name, description, permissions, is_system) "
+            f"VALUES (:name, :description, CAST(:permissions AS JSONB), true)"
+        )
+        conn.execute(insert_role_sql, [
+            {**role, "permissions": json.dumps(role["permissions"])} for role in DEFAULT_ROLES
+        ])
+        upgrade_schema(conn, template_schema)
+
+    def drop_stale_templates(self) -> List[str]:
+        """
+        删除旧版本的模板schema
+
+        滚动发布期间旧版本进程仍可能使用旧模板，因此不在构建时自动清理，
+        需在所有进程升级完成后显式调用。
+
+        Returns:
+            被删除的模板schema列表
+        """
+        stale_schemas = self.db_session.execute(
+            text("SELECT nspname FROM pg_namespace WHERE nspname LIKE :prefix AND nspname <> :current"),
+            {"prefix": TEMPLATE_SCHEMA_PREFIX.replace("_", r"\_") + "%", "current": self.template_schema}
+        ).scalars().all()
+        for stale_schema in stale_schemas:
+            self.db_session.execute(text(f"DROP SCHEMA {stale_schema} CASCADE"))
+            logger.info(f"删除旧版本租户模板schema: {stale_schema}")
+        self.db_session.commit()
+        return list(stale_schemas)
+
+def get_template_manager(db: Session) -> TenantTemplateManager:
+    """获取TenantTemplateManager实例"""
+    return TenantTemplateManager(db)
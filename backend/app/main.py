@@ -1,16 +1,68 @@
+"""
+应用入口
+
+create_app 是应用工厂，模块级的 app 供 uvicorn app.main:app 使用（也可 uvicorn --factory app.main:create_app）。
+启动时只导入常用路由，settings.LAZY_ROUTERS 中的路由在首次请求时加载（见 app.core.lazy_routes）；
+数据库引擎和连接池在首次使用时创建，由 lifespan 在关闭时释放。
+"""
+from contextlib import asynccontextmanager
+from importlib import import_module
+from typing import Iterable, Optional
+
 from fastapi import FastAPI
-from app.api.tenant import tenant_router
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.core.lazy_routes import include_lazy_router, load_lazy_routers
+from app.core.pq_db import dispose_engines
+from app.core.schema_pool import schema_pool_provisioner
+from app.core.tenant_cache import tenant_cache_listener
+from app.core.schema_cache import tenant_schema_cache_listener
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import TenantRateLimitMiddleware, usage_flusher
+from app.core.tenant_resolver import TenantResolverMiddleware
+from app.core.tenant_stats import tenant_stats_refresher
+from app.core.tenant_storage import tenant_storage_accountant
+from app.core.audit_log_writer import audit_log_writer
+from app.core.audit_partitions import audit_log_partition_manager
+from app.core.db_metrics import DBMetricsMiddleware
+from app.core.metrics import registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动租户schema预置池后台补充任务、租户缓存失效监听、租户schema集合监听、API用量定期写入、统计汇总定期校正、存储用量统计、
+    # 审计日志写入与分区维护
+    audit_log_writer.start()
+    schema_pool_provisioner.start()
+    tenant_cache_listener.start()
+    tenant_schema_cache_listener.start()
+    usage_flusher.start()
+    tenant_stats_refresher.start()
+    tenant_storage_accountant.start()
+    audit_log_partition_manager.start()
+    yield
+    await audit_log_partition_manager.stop()
+    await tenant_storage_accountant.stop()
+    await tenant_stats_refresher.stop()
+    await audit_log_writer.stop()
+    await usage_flusher.stop()
+    await tenant_schema_cache_listener.stop()
+    await tenant_cache_listener.stop()
+    await schema_pool_provisioner.stop()
+    password_hasher.shutdown()
+    await dispose_engines()
+
+
+API_PREFIX = "/api/v1"
 
-app = FastAPI(
-    title="多租户平台API",
-    description="基于PostgreSQL Schema隔离的多租户平台",
-    version="1.0.0"
-)
+# 业务路由：名称 -> (路由对象位置 "模块:属性", 路由自身的路径前缀)
+ROUTERS = {
+    "tenant": ("app.api.tenant:tenant_router", "/tenants"),
+    "system": ("app.api.system:system_router", "/system"),
+    "audit": ("app.api.audit:audit_router", "/audit-logs"),
+}
 
-# 注册路由
-app.include_router(tenant_router, prefix="/api/v1")
 
-@app.get("/")
 def read_root():
     return {
         "message": "多租户平台API服务",
@@ -19,6 +71,70 @@ def read_root():
         "redoc": "/redoc"
     }
 
-@app.get("/health")
+
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+def prometheus_metrics():
+    """Prometheus抓取接口（文本格式）"""
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def create_app(lazy_routers: Optional[Iterable[str]] = None) -> FastAPI:
+    """
+    创建应用
+
+    Args:
+        lazy_routers: 延迟加载的路由名称（ROUTERS 的键），默认取 settings.LAZY_ROUTERS
+
+    Returns:
+        FastAPI 应用
+
+    Raises:
+        ValueError: 未知的路由名称
+    """
+    lazy_routers = set(settings.LAZY_ROUTERS if lazy_routers is None else lazy_routers)
+    unknown = lazy_routers - set(ROUTERS)
+    if unknown:
+        raise ValueError(f"未知的路由: {', '.join(sorted(unknown))}，可选 {', '.join(ROUTERS)}")
+
+    app = FastAPI(
+        title="多租户平台API",
+        description="基于PostgreSQL Schema隔离的多租户平台",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # 按租户套餐限流并统计API用量
+    app.add_middleware(TenantRateLimitMiddleware)
+    # 路由前解析请求的租户（限流中间件和租户依赖读取其结果）
+    app.add_middleware(TenantResolverMiddleware)
+    # 按请求统计数据库访问（最外层，覆盖限流中间件中的查询）
+    app.add_middleware(DBMetricsMiddleware)
+
+    # 注册路由
+    for name, (target, path_prefix) in ROUTERS.items():
+        if name in lazy_routers:
+            include_lazy_router(app, target, API_PREFIX, API_PREFIX + path_prefix)
+        else:
+            module_name, attribute = target.split(":")
+            app.include_router(getattr(import_module(module_name), attribute), prefix=API_PREFIX)
+
+    app.get("/")(read_root)
+    app.get("/health")(health_check)
+    app.get("/metrics", include_in_schema=False)(prometheus_metrics)
+
+    if lazy_routers:
+        # 接口文档包含全部路由
+        generate_openapi = app.openapi
+
+        def openapi():
+            load_lazy_routers(app)
+            return generate_openapi()
+
+        app.openapi = openapi
+    return app
+
+
+app = create_app()
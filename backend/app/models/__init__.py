@@ -5,6 +5,11 @@ from .role import Role
 from .user_role import UserRole
 from .tenant_invitation import TenantInvitation
 from .audit_log import AuditLog
+from .tenant_schema_pool import TenantSchemaPool
+from .tenant_migration_checkpoint import TenantMigrationCheckpoint
+from .tenant_api_usage import TenantApiUsage
+from .tenant_stats import TenantStats
+from .tenant_storage_usage import TenantStorageUsage
 
 __all__ = [
     "User",
@@ -12,5 +17,10 @@ __all__ = [
     "Role",
     "UserRole",
     "TenantInvitation",
-    "AuditLog"
+    "AuditLog",
+    "TenantSchemaPool",
+    "TenantMigrationCheckpoint",
+    "TenantApiUsage",
+    "TenantStats",
+    "TenantStorageUsage"
 ]
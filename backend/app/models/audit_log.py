@@ -1,7 +1,9 @@
 """
 审计日志表，用于记录系统操作日志
+
+租户schema中按 created_at 月度范围分区（见 app.core.audit_partitions），主键包含分区键
 """
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB, INET
 from app.core.pq_db import Base
@@ -10,7 +12,7 @@ from app.core.pq_db import Base
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True)
     user_id = Column(Integer, index=True)  # 暂时不设置外键约束
     action = Column(String(100), nullable=False)
     resource_type = Column(String(50))
@@ -18,7 +20,7 @@ class AuditLog(Base):
     details = Column(JSONB)
     ip_address = Column(INET)
     user_agent = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
 
     # 约束
     __table_args__ = (
@@ -1,7 +1,7 @@
 """
 租户表，用于管理租户信息
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, BigInteger, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import ENUM, JSONB
 from app.core.pq_db import Base
@@ -9,7 +9,16 @@ from app.core.pq_db import Base
 
 class Tenant(Base):
     __tablename__ = "tenants"
-    __table_args__ = {'schema': 'public'}  # 租户表在公共schema中
+    __table_args__ = (
+        # 游标分页排序键
+        Index('ix_public_tenants_created_at_id', 'created_at', 'id'),
+        # 模糊搜索三元组索引（pg_trgm）
+        Index('ix_public_tenants_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_public_tenants_domain_trgm', 'domain', postgresql_using='gin', postgresql_ops={'domain': 'gin_trgm_ops'}),
+        Index('ix_public_tenants_tenant_id_trgm', 'tenant_id', postgresql_using='gin',
+              postgresql_ops={'tenant_id': 'gin_trgm_ops'}),
+        {'schema': 'public'}  # 租户表在公共schema中
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tenant_id = Column(String(50), unique=True, nullable=False, index=True)
@@ -0,0 +1,17 @@
+"""
+租户API用量表，按月累计每个租户的请求数（由限流中间件批量写入）
+"""
+from sqlalchemy import Column, String, Date, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.pq_db import Base
+
+
+class TenantApiUsage(Base):
+    __tablename__ = "tenant_api_usage"
+    __table_args__ = {'schema': 'public'}  # 用量统计在公共schema中
+
+    tenant_id = Column(String(50), primary_key=True)
+    period = Column(Date, primary_key=True)  # 统计月份（当月1日）
+    request_count = Column(BigInteger, nullable=False, default=0)
+    throttled_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
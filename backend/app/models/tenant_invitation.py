@@ -16,7 +16,7 @@ class TenantInvitation(Base):
     token = Column(String(255), unique=True, nullable=False, index=True)
     
     # 使用枚举类型
-    status = Column(ENUM('pending', 'accepted', 'expired', name='invitation_status'), 
+    status = Column(ENUM('pending', 'accepted', 'expired', name='invitation_status', schema='public'), 
                    default='pending', nullable=False)
     
     expires_at = Column(DateTime(timezone=True), nullable=False)
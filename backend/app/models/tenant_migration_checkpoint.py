@@ -0,0 +1,20 @@
+"""
+租户schema迁移断点表，记录每个迁移批次中各schema的迁移结果
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.core.pq_db import Base
+
+
+class TenantMigrationCheckpoint(Base):
+    __tablename__ = "tenant_migration_checkpoints"
+    __table_args__ = {'schema': 'public'}  # 迁移断点在公共schema中
+
+    run_id = Column(String(32), primary_key=True)
+    schema_name = Column(String(63), primary_key=True)
+    status = Column(String(20), nullable=False)
+    from_version = Column(String(32))
+    to_version = Column(String(32))
+    error = Column(Text)
+    duration_ms = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,17 @@
+"""
+租户schema预置池表，记录已预先开通、等待认领的空租户schema
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.pq_db import Base
+
+
+class TenantSchemaPool(Base):
+    __tablename__ = "tenant_schema_pool"
+    __table_args__ = {'schema': 'public'}  # 预置池在公共schema中
+
+    id = Column(Integer, primary_key=True, index=True)
+    schema_name = Column(String(63), unique=True, nullable=False)
+    plan_type = Column(String(20), nullable=False, index=True)
+    template_version = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,20 @@
+"""
+租户统计汇总表，每个租户一行，由租户schema中的触发器增量维护、后台任务定期校正
+"""
+from sqlalchemy import Column, String, Date, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.pq_db import Base
+
+
+class TenantStats(Base):
+    __tablename__ = "tenant_stats"
+    __table_args__ = {'schema': 'public'}  # 统计汇总在公共schema中
+
+    tenant_id = Column(String(50), primary_key=True)
+    total_users = Column(BigInteger, nullable=False, default=0)
+    active_users = Column(BigInteger, nullable=False, default=0)
+    new_users_period = Column(Date)  # new_users_count 对应的统计月份（当月1日）
+    new_users_count = Column(BigInteger, nullable=False, default=0)
+    last_activity_at = Column(DateTime(timezone=True))  # 最近一条审计日志时间
+    refreshed_at = Column(DateTime(timezone=True))  # 最近一次全量校正时间
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
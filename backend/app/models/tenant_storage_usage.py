@@ -0,0 +1,16 @@
+"""
+租户存储用量表，每个租户一行，由存储统计任务按系统目录定期汇总
+"""
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.core.pq_db import Base
+
+
+class TenantStorageUsage(Base):
+    __tablename__ = "tenant_storage_usage"
+    __table_args__ = {'schema': 'public'}  # 存储用量在公共schema中
+
+    tenant_id = Column(String(50), primary_key=True)
+    table_bytes = Column(BigInteger, nullable=False, default=0)  # 表及TOAST
+    index_bytes = Column(BigInteger, nullable=False, default=0)
+    used_bytes = Column(BigInteger, nullable=False, default=0)
+    measured_at = Column(DateTime(timezone=True), nullable=False)
@@ -21,9 +21,9 @@ class User(Base):
     avatar_url = Column(String(255))
     
     # 使用枚举类型
-    status = Column(ENUM('active', 'inactive', 'suspended', name='user_status'), 
+    status = Column(ENUM('active', 'inactive', 'suspended', name='user_status', schema='public'), 
                    default='active', nullable=False)
-    role = Column(ENUM('super_admin', 'admin', 'user', name='user_role'), 
+    role = Column(ENUM('super_admin', 'admin', 'user', name='user_role', schema='public'), 
                  default='user', nullable=False)
     
     last_login_at = Column(DateTime(timezone=True))
@@ -1,6 +1,10 @@
 # Repos package
 from .tenant.tenant_repo import TenantRepo
+from .tenant.async_tenant_repo import AsyncTenantRepo
+from .audit.audit_log_repo import AsyncAuditLogRepo
 
 __all__ = [
-    "TenantRepo"
+    "TenantRepo",
+    "AsyncTenantRepo",
+    "AsyncAuditLogRepo"
 ]
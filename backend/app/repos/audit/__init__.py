@@ -0,0 +1,6 @@
+# Audit repos package
+from .audit_log_repo import AsyncAuditLogRepo
+
+__all__ = [
+    "AsyncAuditLogRepo"
+]
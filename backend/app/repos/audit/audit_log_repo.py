@@ -0,0 +1,136 @@
+"""
+审计日志数据访问层（异步）
+
+会话需已路由到租户schema（见 app.core.tenant_context.get_tenant_db）。
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.core.pagination import CURSOR_NEXT, CURSOR_PREV, decode_cursor, encode_cursor
+from app.models.audit_log import AuditLog
+
+
+class AsyncAuditLogRepo:
+    """审计日志数据访问层"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _filtered_query(self, action: Optional[str] = None, resource_type: Optional[str] = None,
+                        resource_id: Optional[str] = None, user_id: Optional[int] = None,
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        details: Optional[Dict[str, Any]] = None) -> Select:
+        """
+        构建带过滤条件的查询
+
+        过滤条件与租户迁移 f1b7c3d9e264 中的索引对应；since / until 按分区裁剪，
+        details 为包含查询（details @> :details），使用 GIN(jsonb_path_ops) 索引。
+        """
+        query = select(AuditLog)
+        if action:
+            query = query.where(AuditLog.action == action)
+        if resource_type:
+            query = query.where(AuditLog.resource_type == resource_type)
+        if resource_id:
+            query = query.where(AuditLog.resource_id == resource_id)
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+        if since:
+            query = query.where(AuditLog.created_at >= since)
+        if until:
+            query = query.where(AuditLog.created_at < until)
+        if details:
+            query = query.where(AuditLog.details.contains(details))
+        return query
+
+    async def list_by_cursor(self, size: int = 50, cursor: Optional[str] = None,
+                             **filters) -> Dict[str, Any]:
+        """
+        获取审计日志（游标分页，按 (created_at, id) 从新到旧）
+
+        Args:
+            size: 每页数量
+            cursor: 上一次返回的 next_cursor（更早） / prev_cursor（更新），为空时返回最新一页
+            **filters: 过滤条件，见 _filtered_query
+
+        Returns:
+            包含审计日志列表和分页信息（含前后页游标）的字典
+
+        Raises:
+            ValueError: 游标无效
+        """
+        query = self._filtered_query(**filters)
+
+        sort_key = tuple_(AuditLog.created_at, AuditLog.id)
+        direction = CURSOR_NEXT
+        if cursor:
+            keys, direction = decode_cursor(cursor)
+            try:
+                created_at, row_id = datetime.fromisoformat(keys[0]), int(keys[1])
+            except (ValueError, TypeError, IndexError):
+                raise ValueError("分页游标无效")
+            if direction == CURSOR_NEXT:
+                query = query.where(sort_key < tuple_(created_at, row_id))
+            else:
+                query = query.where(sort_key > tuple_(created_at, row_id))
+
+        if direction == CURSOR_NEXT:
+            query = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+        else:
+            query = query.order_by(AuditLog.created_at, AuditLog.id)
+
+        # 多取一条判断该方向上是否还有数据
+        logs = list((await self.db.scalars(query.limit(size + 1))).all())
+        has_more = len(logs) > size
+        logs = logs[:size]
+        if direction == CURSOR_PREV:
+            logs.reverse()
+
+        if direction == CURSOR_NEXT:
+            has_next, has_prev = has_more, cursor is not None
+        else:
+            has_next, has_prev = True, has_more
+
+        def _cursor(log: AuditLog, cursor_direction: str) -> str:
+            return encode_cursor([log.created_at, log.id], cursor_direction)
+
+        return {
+            "audit_logs": logs,
+            "pagination": {
+                "page": None,
+                "size": size,
+                "total": None,
+                "pages": None,
+                "next_cursor": _cursor(logs[-1], CURSOR_NEXT) if logs and has_next else None,
+                "prev_cursor": _cursor(logs[0], CURSOR_PREV) if logs and has_prev else None
+            }
+        }
+
+    async def stream_batches(self, columns: Sequence[ColumnElement], batch_size: int = 1000,
+                             **filters) -> AsyncIterator[List[Row]]:
+        """
+        按 (created_at, id) 从旧到新分批读取审计日志（服务端游标，内存占用与结果集大小无关）
+
+        只查询给定的列表达式而不构建ORM对象，每批一次往返，适合导出大量数据。
+
+        Args:
+            columns: 查询的列或表达式
+            batch_size: 每批从服务端游标读取的行数
+            **filters: 过滤条件，见 _filtered_query
+
+        Yields:
+            List[Row]: 一批结果行
+        """
+        query = (
+            self._filtered_query(**filters)
+            .with_only_columns(*columns)
+            .order_by(AuditLog.created_at, AuditLog.id)
+        )
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for batch in result.partitions(batch_size):
+            yield batch
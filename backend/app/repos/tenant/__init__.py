@@ -1,6 +1,8 @@
 # Tenant repos package
 from .tenant_repo import TenantRepo
+from .async_tenant_repo import AsyncTenantRepo
 
 __all__ = [
-    "TenantRepo"
+    "TenantRepo",
+    "AsyncTenantRepo"
 ]
@@ -0,0 +1,437 @@
+"""
+租户数据访问层（异步）
+"""
+import logging
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Iterable, Set, Tuple
+from sqlalchemy import insert, or_, select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.tenant import Tenant
+from app.models.tenant_api_usage import TenantApiUsage
+from app.models.tenant_stats import TenantStats
+from app.models.tenant_storage_usage import TenantStorageUsage
+from app.repos.tenant.tenant_search import ranked_search, search_condition
+from app.core.tenant_cache import MISS, build_tenant, tenant_cache
+from app.core.pagination import (
+    CURSOR_NEXT, CURSOR_PREV, TOTAL_EXACT, TOTAL_NONE, PaginationParamError,
+    count_rows, decode_cursor, encode_cursor
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTenantRepo:
+    """
+    租户数据访问层（异步版本，接口与TenantRepo保持一致）
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, tenant: Tenant) -> Tenant:
+        """
+        创建租户
+
+        Args:
+            tenant: 租户对象
+
+        Returns:
+            创建的租户对象
+        """
+        try:
+            self.db.add(tenant)
+            await self.db.flush()  # 获取ID但不提交
+            return tenant
+        except Exception as e:
+            logger.error(f"创建租户失败: {str(e)}")
+            raise e
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Tenant]:
+        """
+        批量创建租户（单条多行INSERT，不提交）
+
+        Args:
+            rows: 租户列值字典列表
+
+        Returns:
+            创建的租户对象，顺序与rows一致
+        """
+        if not rows:
+            return []
+        result = await self.db.scalars(insert(Tenant).values(rows).returning(Tenant))
+        by_tenant_id = {tenant.tenant_id: tenant for tenant in result.all()}
+        return [by_tenant_id[row["tenant_id"]] for row in rows]
+
+    async def get_by_id(self, tenant_id: str) -> Optional[Tenant]:
+        """
+        根据租户ID获取租户
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self._cached_lookup("tenant_id", tenant_id, Tenant.tenant_id == tenant_id)
+
+    async def get_by_domain(self, domain: str) -> Optional[Tenant]:
+        """
+        根据域名获取租户
+
+        Args:
+            domain: 域名
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self._cached_lookup("domain", domain, Tenant.domain == domain)
+
+    async def get_by_name(self, name: str) -> Optional[Tenant]:
+        """
+        根据名称获取租户
+
+        Args:
+            name: 租户名称
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self._first(select(Tenant).where(Tenant.name == name))
+
+    async def get_by_schema_name(self, schema_name: str) -> Optional[Tenant]:
+        """
+        根据schema名称获取租户
+
+        Args:
+            schema_name: Schema名称
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self._cached_lookup("schema_name", schema_name, Tenant.schema_name == schema_name)
+
+    async def list_all(self, page: int = 1, size: int = 20,
+                       status: Optional[str] = None,
+                       plan_type: Optional[str] = None,
+                       search: Optional[str] = None,
+                       total_mode: str = TOTAL_EXACT) -> Dict[str, Any]:
+        """
+        获取租户列表（页码分页，有搜索关键词时按相关度排序）
+
+        Args:
+            page: 页码
+            size: 每页数量
+            status: 状态过滤
+            plan_type: 套餐类型过滤
+            search: 搜索关键词
+            total_mode: 总数模式 exact / estimated / none
+
+        Returns:
+            包含租户列表和分页信息的字典
+        """
+        query = self._filtered_query(status, plan_type, search)
+
+        # 计算总数
+        total = await count_rows(self.db, query, total_mode)
+
+        # 分页（有搜索关键词时按相关度排序）
+        if search:
+            query = ranked_search(query, search)
+        else:
+            query = query.order_by(Tenant.id)
+        result = await self.db.scalars(query.offset((page - 1) * size).limit(size))
+        tenants = list(result.all())
+
+        return {
+            "tenants": tenants,
+            "pagination": {
+                "page": page,
+                "size": size,
+                "total": total,
+                "pages": (total + size - 1) // size if total is not None else None
+            }
+        }
+
+    async def list_by_cursor(self, size: int = 20, cursor: Optional[str] = None,
+                             status: Optional[str] = None,
+                             plan_type: Optional[str] = None,
+                             search: Optional[str] = None,
+                             total_mode: str = TOTAL_NONE) -> Dict[str, Any]:
+        """
+        获取租户列表（游标分页，按 (created_at, id) 排序）
+
+        Args:
+            size: 每页数量
+            cursor: 上一次返回的 next_cursor / prev_cursor，为空时返回第一页
+            status: 状态过滤
+            plan_type: 套餐类型过滤
+            search: 搜索关键词
+            total_mode: 总数模式 exact / estimated / none
+
+        Returns:
+            包含租户列表和分页信息（含前后页游标）的字典
+
+        Raises:
+            PaginationParamError: 游标或总数模式无效
+        """
+        query = self._filtered_query(status, plan_type, search)
+        total = await count_rows(self.db, query, total_mode)
+
+        sort_key = tuple_(Tenant.created_at, Tenant.id)
+        direction = CURSOR_NEXT
+        page_query = query
+        if cursor:
+            keys, direction = decode_cursor(cursor)
+            try:
+                created_at, row_id = datetime.fromisoformat(keys[0]), int(keys[1])
+            except (ValueError, TypeError, IndexError):
+                raise PaginationParamError("cursor", "分页游标无效")
+            if direction == CURSOR_NEXT:
+                page_query = page_query.where(sort_key > tuple_(created_at, row_id))
+            else:
+                page_query = page_query.where(sort_key < tuple_(created_at, row_id))
+
+        if direction == CURSOR_NEXT:
+            page_query = page_query.order_by(Tenant.created_at, Tenant.id)
+        else:
+            page_query = page_query.order_by(Tenant.created_at.desc(), Tenant.id.desc())
+
+        # 多取一条判断该方向上是否还有数据
+        result = await self.db.scalars(page_query.limit(size + 1))
+        tenants = list(result.all())
+        has_more = len(tenants) > size
+        tenants = tenants[:size]
+        if direction == CURSOR_PREV:
+            tenants.reverse()
+
+        if direction == CURSOR_NEXT:
+            has_next, has_prev = has_more, cursor is not None
+        else:
+            has_next, has_prev = True, has_more
+
+        def _cursor(tenant: Tenant, cursor_direction: str) -> str:
+            return encode_cursor([tenant.created_at, tenant.id], cursor_direction)
+
+        return {
+            "tenants": tenants,
+            "pagination": {
+                "page": None,
+                "size": size,
+                "total": total,
+                "pages": (total + size - 1) // size if total is not None else None,
+                "next_cursor": _cursor(tenants[-1], CURSOR_NEXT) if tenants and has_next else None,
+                "prev_cursor": _cursor(tenants[0], CURSOR_PREV) if tenants and has_prev else None
+            }
+        }
+
+    async def update(self, tenant: Tenant) -> Tenant:
+        """
+        更新租户
+
+        Args:
+            tenant: 租户对象
+
+        Returns:
+            更新后的租户对象
+        """
+        try:
+            await self.db.flush()
+            return tenant
+        except Exception as e:
+            logger.error(f"更新租户失败: {str(e)}")
+            raise e
+
+    async def delete(self, tenant: Tenant) -> bool:
+        """
+        删除租户
+
+        Args:
+            tenant: 租户对象
+
+        Returns:
+            是否删除成功
+        """
+        try:
+            await self.db.delete(tenant)
+            return True
+        except Exception as e:
+            logger.error(f"删除租户失败: {str(e)}")
+            return False
+
+    async def exists_by_name(self, name: str, exclude_id: Optional[str] = None) -> bool:
+        """
+        检查租户名称是否存在
+
+        Args:
+            name: 租户名称
+            exclude_id: 排除的租户ID（用于更新时检查）
+
+        Returns:
+            是否存在
+        """
+        query = select(Tenant.id).where(Tenant.name == name)
+        if exclude_id:
+            query = query.where(Tenant.tenant_id != exclude_id)
+        return await self._exists(query)
+
+    async def exists_by_domain(self, domain: str, exclude_id: Optional[str] = None) -> bool:
+        """
+        检查域名是否存在
+
+        Args:
+            domain: 域名
+            exclude_id: 排除的租户ID（用于更新时检查）
+
+        Returns:
+            是否存在
+        """
+        query = select(Tenant.id).where(Tenant.domain == domain)
+        if exclude_id:
+            query = query.where(Tenant.tenant_id != exclude_id)
+        return await self._exists(query)
+
+    async def find_taken(self, names: Iterable[str], domains: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        一次查询找出已被占用的租户名称和域名
+
+        Args:
+            names: 待检查的名称
+            domains: 待检查的域名
+
+        Returns:
+            (已存在的名称集合, 已存在的域名集合)
+        """
+        names, domains = list(names), [domain for domain in domains if domain]
+        if not names and not domains:
+            return set(), set()
+        rows = await self.db.execute(
+            select(Tenant.name, Tenant.domain).where(or_(Tenant.name.in_(names), Tenant.domain.in_(domains)))
+        )
+        taken_names: Set[str] = set()
+        taken_domains: Set[str] = set()
+        for name, domain in rows.all():
+            taken_names.add(name)
+            if domain:
+                taken_domains.add(domain)
+        return taken_names & set(names), taken_domains & set(domains)
+
+    async def count_by_status(self, status: str) -> int:
+        """
+        统计指定状态的租户数量
+
+        Args:
+            status: 状态
+
+        Returns:
+            数量
+        """
+        return await self.db.scalar(
+            select(func.count()).select_from(Tenant).where(Tenant.status == status)
+        )
+
+    async def count_by_plan_type(self, plan_type: str) -> int:
+        """
+        统计指定套餐类型的租户数量
+
+        Args:
+            plan_type: 套餐类型
+
+        Returns:
+            数量
+        """
+        return await self.db.scalar(
+            select(func.count()).select_from(Tenant).where(Tenant.plan_type == plan_type)
+        )
+
+    async def get_api_usage(self, tenant_id: str, period: date) -> Tuple[int, int]:
+        """
+        获取租户API累计请求数和指定月份的请求数
+
+        Args:
+            tenant_id: 租户ID
+            period: 统计月份（当月1日）
+
+        Returns:
+            (累计请求数, 当月请求数)
+        """
+        row = (await self.db.execute(
+            select(
+                func.coalesce(func.sum(TenantApiUsage.request_count), 0),
+                func.coalesce(func.sum(TenantApiUsage.request_count).filter(TenantApiUsage.period == period), 0),
+            ).where(TenantApiUsage.tenant_id == tenant_id)
+        )).one()
+        return int(row[0]), int(row[1])
+
+    async def get_stats_rollup(self, tenant_id: str) -> Optional[TenantStats]:
+        """
+        获取租户统计汇总行
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            统计汇总对象，尚未生成时返回None
+        """
+        return await self.db.scalar(select(TenantStats).where(TenantStats.tenant_id == tenant_id))
+
+    async def get_storage_usage(self, tenant_id: str) -> Optional[TenantStorageUsage]:
+        """
+        获取租户最近一次统计的存储用量
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            存储用量对象，尚未统计时返回None
+        """
+        return await self.db.scalar(select(TenantStorageUsage).where(TenantStorageUsage.tenant_id == tenant_id))
+
+    async def get_active_tenants(self) -> List[Tenant]:
+        """
+        获取所有活跃的租户
+
+        Returns:
+            活跃租户列表
+        """
+        result = await self.db.scalars(select(Tenant).where(Tenant.status == 'active'))
+        return list(result.all())
+
+    async def _first(self, query) -> Optional[Tenant]:
+        """执行查询并返回第一条记录"""
+        result = await self.db.scalars(query.limit(1))
+        return result.first()
+
+    @staticmethod
+    def _filtered_query(status: Optional[str] = None,
+                        plan_type: Optional[str] = None,
+                        search: Optional[str] = None):
+        """构造带过滤条件的租户查询"""
+        query = select(Tenant)
+        if status:
+            query = query.where(Tenant.status == status)
+        if plan_type:
+            query = query.where(Tenant.plan_type == plan_type)
+        if search:
+            query = query.where(search_condition(search))
+        return query
+
+    async def _cached_lookup(self, field: str, value: str, condition) -> Optional[Tenant]:
+        """经租户缓存查询单个租户，未命中时查库并回填（含负缓存）"""
+        generation = tenant_cache.generation
+        values = tenant_cache.get(field, value)
+        if values is None:
+            return None
+        if values is not MISS:
+            return await self.db.merge(build_tenant(values), load=False)
+
+        tenant = await self._first(select(Tenant).where(condition))
+        if tenant is None:
+            tenant_cache.put_missing(field, value, generation)
+        else:
+            tenant_cache.put(tenant, generation)
+        return tenant
+
+    async def _exists(self, query) -> bool:
+        """检查查询是否有结果"""
+        result = await self.db.execute(query.limit(1))
+        return result.first() is not None
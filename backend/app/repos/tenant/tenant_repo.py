@@ -6,6 +6,8 @@ from typing import Optional, List, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from app.models.tenant import Tenant
+from app.repos.tenant.tenant_search import ranked_search, search_condition
+from app.core.tenant_cache import MISS, build_tenant, tenant_cache
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +48,7 @@ class TenantRepo:
         Returns:
             租户对象，如果不存在则返回None
         """
-        return self.db.query(Tenant).filter(Tenant.tenant_id == tenant_id).first()
+        return self._cached_lookup("tenant_id", tenant_id, Tenant.tenant_id == tenant_id)
 
     def get_by_domain(self, domain: str) -> Optional[Tenant]:
         """
@@ -58,7 +60,7 @@ class TenantRepo:
         Returns:
             租户对象，如果不存在则返回None
         """
-        return self.db.query(Tenant).filter(Tenant.domain == domain).first()
+        return self._cached_lookup("domain", domain, Tenant.domain == domain)
 
     def get_by_name(self, name: str) -> Optional[Tenant]:
         """
@@ -82,7 +84,7 @@ class TenantRepo:
         Returns:
             租户对象，如果不存在则返回None
         """
-        return self.db.query(Tenant).filter(Tenant.schema_name == schema_name).first()
+        return self._cached_lookup("schema_name", schema_name, Tenant.schema_name == schema_name)
 
     def list_all(self, page: int = 1, size: int = 20, 
                  status: Optional[str] = None, 
@@ -109,20 +111,17 @@ class TenantRepo:
         if plan_type:
             query = query.filter(Tenant.plan_type == plan_type)
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Tenant.name.ilike(search_term),
-                    Tenant.domain.ilike(search_term),
-                    Tenant.tenant_id.ilike(search_term)
-                )
-            )
+            query = query.filter(search_condition(search))
         
         # 计算总数
         total = query.count()
         
-        # 分页
-        tenants = query.offset((page - 1) * size).limit(size).all()
+        # 分页（有搜索关键词时按相关度排序）
+        if search:
+            ranked = ranked_search(query.statement, search)
+            tenants = self.db.scalars(ranked.offset((page - 1) * size).limit(size)).all()
+        else:
+            tenants = query.order_by(Tenant.id).offset((page - 1) * size).limit(size).all()
         
         return {
             "tenants": tenants,
@@ -266,3 +265,19 @@ class TenantRepo:
             暂停租户列表
         """
         return self.db.query(Tenant).filter(Tenant.status == 'suspended').all()
+
+    def _cached_lookup(self, field: str, value: str, condition) -> Optional[Tenant]:
+        """经租户缓存查询单个租户，未命中时查库并回填（含负缓存）"""
+        generation = tenant_cache.generation
+        values = tenant_cache.get(field, value)
+        if values is None:
+            return None
+        if values is not MISS:
+            return self.db.merge(build_tenant(values), load=False)
+
+        tenant = self.db.query(Tenant).filter(condition).first()
+        if tenant is None:
+            tenant_cache.put_missing(field, value, generation)
+        else:
+            tenant_cache.put(tenant, generation)
+        return tenant
@@ -0,0 +1,67 @@
+"""
+租户模糊搜索
+
+name、domain、tenant_id 上建有 pg_trgm 三元组GIN索引，ILIKE '%关键词%' 可走位图索引扫描；
+结果按 word_similarity 计算的相关度排序（关键词越接近某个字段中的完整单词，得分越高）。
+
+相关度取三个字段的最大值，无法由单个索引按序返回，因此对全部命中行计算相关度后排序
+（带 LIMIT 时为 top-N 堆排序）；每一页都来自同一个完整排序，总数即实际命中数。
+"""
+from sqlalchemy import func, or_
+from sqlalchemy.sql import Select
+
+from app.models.tenant import Tenant
+
+
+def escape_like(term: str) -> str:
+    """转义LIKE通配符，关键词按字面匹配（PostgreSQL默认以反斜杠为转义符）"""
+    return term.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+
+
+def search_condition(term: str):
+    """
+    租户搜索过滤条件（可由三元组索引加速）
+
+    Args:
+        term: 搜索关键词
+
+    Returns:
+        SQLAlchemy过滤表达式
+    """
+    pattern = f"%{escape_like(term)}%"
+    return or_(
+        Tenant.name.ilike(pattern),
+        Tenant.domain.ilike(pattern),
+        Tenant.tenant_id.ilike(pattern)
+    )
+
+
+def search_rank(term: str):
+    """
+    租户搜索相关度（0~1，取各字段的最大值）
+
+    Args:
+        term: 搜索关键词
+
+    Returns:
+        SQLAlchemy表达式
+    """
+    return func.greatest(
+        func.word_similarity(term, Tenant.name),
+        func.word_similarity(term, func.coalesce(Tenant.domain, "")),
+        func.word_similarity(term, Tenant.tenant_id)
+    )
+
+
+def ranked_search(query: Select, term: str) -> Select:
+    """
+    按相关度排序全部命中行
+
+    Args:
+        query: 已应用过滤条件（含搜索条件）的租户查询
+        term: 搜索关键词
+
+    Returns:
+        按相关度降序、id升序排列的租户查询（id保证同分时顺序稳定）
+    """
+    return query.order_by(search_rank(term).desc(), Tenant.id)
@@ -2,19 +2,27 @@
 from .tenant import (
     TenantCreateRequest,
     TenantCreateResponse,
+    TenantData,
     TenantResponse,
     TenantListResponse,
     TenantUpdateRequest,
     AdminUserRequest,
     AdminUserResponse
 )
+from .audit import (
+    AuditLogData,
+    AuditLogListResponse
+)
 
 __all__ = [
     "TenantCreateRequest",
     "TenantCreateResponse",
+    "TenantData",
     "TenantResponse",
     "TenantListResponse",
     "TenantUpdateRequest",
     "AdminUserResponse",
-    "AdminUserRequest"
+    "AdminUserRequest",
+    "AuditLogData",
+    "AuditLogListResponse"
 ]
@@ -0,0 +1,10 @@
+# Audit schemas package
+from .audit_schemas import (
+    AuditLogData,
+    AuditLogListResponse
+)
+
+__all__ = [
+    "AuditLogData",
+    "AuditLogListResponse"
+]
@@ -0,0 +1,38 @@
+"""
+审计日志相关的数据验证Schema
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, IPvAnyAddress
+
+from app.schemas.tenant.tenant_schemas import PaginationInfo
+
+
+class AuditLogData(BaseModel):
+    """审计日志数据模型"""
+    id: int
+    user_id: Optional[int]
+    action: str
+    resource_type: Optional[str]
+    resource_id: Optional[str]
+    details: Optional[Dict[str, Any]]
+    ip_address: Optional[IPvAnyAddress]
+    user_agent: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AuditLogListData(BaseModel):
+    """审计日志列表数据模型"""
+    audit_logs: List[AuditLogData]
+    pagination: PaginationInfo
+
+
+class AuditLogListResponse(BaseModel):
+    """审计日志列表响应模型"""
+    code: int
+    message: str
+    data: AuditLogListData
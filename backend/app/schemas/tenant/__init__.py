@@ -2,19 +2,23 @@
 from .tenant_schemas import (
     TenantCreateRequest,
     TenantCreateResponse,
+    TenantData,
     TenantResponse,
     TenantListResponse,
     TenantUpdateRequest,
     AdminUserRequest,
-    AdminUserResponse
+    AdminUserResponse,
+    TenantStatsResponse
 )
 
 __all__ = [
     "TenantCreateRequest",
     "TenantCreateResponse", 
+    "TenantData",
     "TenantResponse",
     "TenantListResponse",
     "TenantUpdateRequest",
     "AdminUserRequest",
-    "AdminUserResponse"
+    "AdminUserResponse",
+    "TenantStatsResponse"
 ]
@@ -1,8 +1,9 @@
 """
 租户相关的数据验证Schema
 """
+import re
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 from enum import Enum
 
@@ -22,6 +23,20 @@ class TenantStatus(str, Enum):
     INACTIVE = "inactive"
 
 
+# 注册相关字段的格式（模块加载时编译一次）
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_PATTERN = re.compile(r'^1[3-9]\d{9}$')
+DOMAIN_PATTERN = re.compile(
+    r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
+)
+
+
+def _validate_domain(v: Optional[str]) -> Optional[str]:
+    if v is not None and not DOMAIN_PATTERN.match(v):
+        raise ValueError('域名格式不正确')
+    return v
+
+
 class AdminUserRequest(BaseModel):
     """管理员用户请求模型"""
     full_name: str = Field(..., min_length=2, max_length=50, description="管理员姓名")
@@ -30,29 +45,24 @@ class AdminUserRequest(BaseModel):
     password: str = Field(..., min_length=8, max_length=50, description="管理员密码")
     avatar_url: Optional[str] = Field(None, description="头像URL")
 
-    @validator('email')
-    def validate_email(cls, v):
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, v):
+    @field_validator('email')
+    @classmethod
+    def validate_email(cls, v: str) -> str:
+        if not EMAIL_PATTERN.match(v):
             raise ValueError('邮箱格式不正确')
         return v
 
-    @validator('phone')
-    def validate_phone(cls, v):
-        if v is not None:
-            import re
-            if not re.match(r'^1[3-9]\d{9}$', v):
-                raise ValueError('手机号格式不正确')
+    @field_validator('phone')
+    @classmethod
+    def validate_phone(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and not PHONE_PATTERN.match(v):
+            raise ValueError('手机号格式不正确')
         return v
 
-    @validator('password')
-    def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('密码长度至少8位')
-        if len(v) > 50:
-            raise ValueError('密码长度不能超过50位')
-        # 检查密码复杂度
+    @field_validator('password')
+    @classmethod
+    def validate_password(cls, v: str) -> str:
+        # 长度由 Field 约束，这里只检查复杂度
         has_upper = any(c.isupper() for c in v)
         has_lower = any(c.islower() for c in v)
         has_digit = any(c.isdigit() for c in v)
@@ -76,7 +86,11 @@ class AdminUserResponse(BaseModel):
 
 
 class TenantCreateRequest(BaseModel):
-    """创建租户请求模型"""
+    """
+    创建租户请求模型
+
+    注册接口和批量导入唯一的校验入口，服务层直接使用校验后的模型，不再重复校验。
+    """
     name: str = Field(..., min_length=2, max_length=100, description="公司名称")
     domain: Optional[str] = Field(None, description="公司域名")
     admin_user: AdminUserRequest = Field(..., description="管理员用户信息")
@@ -86,22 +100,7 @@ class TenantCreateRequest(BaseModel):
     avatar_url: Optional[str] = Field(None, description="租户头像URL")
     settings: Optional[Dict[str, Any]] = Field(default_factory=dict, description="租户配置")
 
-    @validator('domain')
-    def validate_domain(cls, v):
-        if v is not None:
-            import re
-            pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
-            if not re.match(pattern, v):
-                raise ValueError('域名格式不正确')
-        return v
-
-    @validator('max_storage')
-    def validate_storage(cls, v):
-        if v < 1073741824:  # 1GB
-            raise ValueError('最小存储空间为1GB')
-        if v > 1099511627776:  # 1TB
-            raise ValueError('最大存储空间为1TB')
-        return v
+    validate_domain = field_validator('domain')(_validate_domain)
 
 
 class TenantUpdateRequest(BaseModel):
@@ -113,23 +112,7 @@ class TenantUpdateRequest(BaseModel):
     max_storage: Optional[int] = Field(None, ge=1073741824, le=1099511627776, description="最大存储空间(字节)")
     settings: Optional[Dict[str, Any]] = Field(None, description="租户配置")
 
-    @validator('domain')
-    def validate_domain(cls, v):
-        if v is not None:
-            import re
-            pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
-            if not re.match(pattern, v):
-                raise ValueError('域名格式不正确')
-        return v
-
-    @validator('max_storage')
-    def validate_storage(cls, v):
-        if v is not None:
-            if v < 1073741824:  # 1GB
-                raise ValueError('最小存储空间为1GB')
-            if v > 1099511627776:  # 1TB
-                raise ValueError('最大存储空间为1TB')
-        return v
+    validate_domain = field_validator('domain')(_validate_domain)
 
 
 class TenantData(BaseModel):
@@ -180,11 +163,13 @@ class TenantResponse(BaseModel):
 
 
 class PaginationInfo(BaseModel):
-    """分页信息模型"""
-    page: int
+    """分页信息模型（页码分页返回page；游标分页返回前后页游标；total按总数模式可能为估算值或为空）"""
+    page: Optional[int] = None
     size: int
-    total: int
-    pages: int
+    total: Optional[int] = None
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class TenantListData(BaseModel):
@@ -214,6 +199,7 @@ class StorageStats(BaseModel):
     total_storage: int
     used_storage: int
     storage_percentage: float
+    measured_at: Optional[datetime] = None
 
 
 class ApiStats(BaseModel):
@@ -237,6 +223,7 @@ class TenantStatsData(BaseModel):
     storage_stats: StorageStats
     api_stats: ApiStats
     billing_stats: BillingStats
+    last_activity_at: Optional[datetime] = None
 
 
 class TenantStatsResponse(BaseModel):
@@ -0,0 +1,8 @@
+# Audit services package
+from .audit_log_service import EXPORT_FORMATS, AuditLogService, parse_details_filter
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "AuditLogService",
+    "parse_details_filter"
+]
@@ -0,0 +1,129 @@
+"""
+审计日志查询与导出服务
+
+会话需已路由到租户schema（见 app.core.tenant_context.get_tenant_db）。
+"""
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Text, cast, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+from app.config import settings
+from app.models.audit_log import AuditLog
+from app.repos.audit import AsyncAuditLogRepo
+
+# 导出格式
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# 导出列（CSV列顺序）
+EXPORT_COLUMNS = (
+    "id", "created_at", "user_id", "action", "resource_type", "resource_id", "ip_address", "user_agent", "details"
+)
+
+
+def parse_details_filter(raw: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    解析 details 过滤条件（JSON对象，按包含关系匹配）
+
+    Raises:
+        ValueError: 不是合法的JSON对象
+    """
+    if not raw:
+        return None
+    try:
+        details = json.loads(raw)
+    except ValueError:
+        raise ValueError("details 必须是JSON对象")
+    if not isinstance(details, dict):
+        raise ValueError("details 必须是JSON对象")
+    return details
+
+
+def _export_columns(fmt: str) -> List[ColumnElement]:
+    """
+    导出查询的列表达式
+
+    JSON编码和 inet / jsonb 的文本转换在数据库中完成：NDJSON每行是一个 json_build_object 文本，
+    CSV各列为文本或原生类型，应用侧只做拼接，不再逐行解码再编码 details。
+    """
+    columns = {column: getattr(AuditLog, column) for column in EXPORT_COLUMNS}
+    if fmt == "ndjson":
+        pairs = []
+        for column in EXPORT_COLUMNS:
+            pairs.extend([literal(column), columns[column]])
+        return [cast(func.json_build_object(*pairs), Text)]
+    columns["ip_address"] = func.host(columns["ip_address"])
+    columns["details"] = cast(columns["details"], Text)
+    return [columns[column] for column in EXPORT_COLUMNS]
+
+
+class AuditLogService:
+    """审计日志查询与导出服务"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.audit_log_repo = AsyncAuditLogRepo(db)
+
+    async def list_audit_logs(self, size: int = 50, cursor: Optional[str] = None,
+                              **filters) -> Dict[str, Any]:
+        """
+        获取审计日志（游标分页，从新到旧）
+
+        Args:
+            size: 每页数量
+            cursor: 翻页游标
+            **filters: action / resource_type / resource_id / user_id / since / until / details
+
+        Returns:
+            包含审计日志列表和分页信息的字典
+
+        Raises:
+            ValueError: 游标无效
+        """
+        return await self.audit_log_repo.list_by_cursor(size, cursor, **filters)
+
+    async def export(self, fmt: str, **filters) -> AsyncIterator[str]:
+        """
+        按时间从旧到新导出审计日志
+
+        通过服务端游标分批读取，每批编码为一个输出块，内存占用与导出范围无关；
+        行的编码在数据库中完成（见 _export_columns）。
+
+        Args:
+            fmt: 导出格式 csv / ndjson
+            **filters: 过滤条件，同 list_audit_logs
+
+        Yields:
+            str: CSV（首块含列名）或NDJSON文本块
+
+        Raises:
+            ValueError: 导出格式无效
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"导出格式必须是 {', '.join(EXPORT_FORMATS)} 之一")
+        columns = _export_columns(fmt)
+        batches = self.audit_log_repo.stream_batches(columns, settings.AUDIT_EXPORT_BATCH_SIZE, **filters)
+        if fmt == "ndjson":
+            async for batch in batches:
+                yield "".join(line + "\n" for line, in batch)
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        async for batch in batches:
+            writer.writerows(batch)
+            yield self._drain(buffer)
+        if buffer.tell():
+            yield self._drain(buffer)
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
@@ -0,0 +1,6 @@
+# Auth services package
+from .auth_service import AsyncAuthService
+
+__all__ = [
+    "AsyncAuthService"
+]
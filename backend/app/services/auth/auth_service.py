@@ -0,0 +1,68 @@
+"""
+认证服务层
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit_log_writer import audit_log_writer
+from app.core.password_hasher import password_hasher
+from app.core.tenant_context import get_current_tenant
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthService:
+    """
+    认证服务层（异步）
+
+    会话需已路由到租户schema（见 app.core.tenant_context.get_tenant_db）。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
+        """
+        校验租户用户的邮箱和密码
+
+        校验通过时更新最后登录时间；若存储的哈希与当前配置的算法或代价不一致，
+        同时写入按当前配置重新计算的哈希。登录成功和失败都记录审计日志（异步写入）。
+
+        Args:
+            email: 用户邮箱
+            password: 密码
+
+        Returns:
+            校验通过的用户对象，失败返回None
+        """
+        user = await self.db.scalar(
+            select(User).where(User.email == email, User.status == 'active').limit(1)
+        )
+        if user is None:
+            self._audit("user.login_failed", details={"email": email, "reason": "unknown_user"})
+            return None
+
+        verified, new_hash = await password_hasher.verify_and_update(user.hashed_password, password)
+        if not verified:
+            self._audit("user.login_failed", user_id=user.id, details={"email": email, "reason": "bad_password"})
+            return None
+
+        if new_hash:
+            user.hashed_password = new_hash
+            logger.info(f"用户 {user.user_id} 密码哈希已按新参数更新")
+        user.last_login_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        self._audit("user.login", user_id=user.id)
+        return user
+
+    @staticmethod
+    def _audit(action: str, **fields) -> None:
+        """记录当前租户的认证审计事件"""
+        tenant_id = get_current_tenant()
+        if tenant_id:
+            audit_log_writer.log_nowait(tenant_id, action, resource_type="user", **fields)
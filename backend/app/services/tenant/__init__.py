@@ -1,6 +1,13 @@
 # Tenant services package
 from .tenane_service import TenantService
+from .async_tenant_service import AsyncTenantService
+from .tenant_import import IMPORT_FORMATS, TenantBulkImporter, parse_rows, read_chunks
 
 __all__ = [
-    "TenantService"
+    "TenantService",
+    "AsyncTenantService",
+    "IMPORT_FORMATS",
+    "TenantBulkImporter",
+    "parse_rows",
+    "read_chunks"
 ]
@@ -0,0 +1,204 @@
+"""
+租户服务层（异步）
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.audit_log_writer import audit_log_writer
+from app.core.pagination import TOTAL_EXACT, TOTAL_NONE, PaginationParamError
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import current_period, rate_limit_for
+from app.core.tenant_stats import refresh_tenant_stats
+from app.models.tenant import Tenant
+from app.repos.tenant import AsyncTenantRepo
+from app.schemas.tenant import TenantCreateRequest
+from .tenane_service import TenantService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTenantService:
+    """
+    租户服务层（异步版本）
+
+    查询类操作直接走AsyncTenantRepo；创建租户涉及schema DDL等多步流程，
+    通过 AsyncSession.run_sync 复用 TenantService 的同步实现，
+    数据库IO仍由异步驱动完成，不会阻塞事件循环。
+    """
+
+    _format_tenant_response = staticmethod(TenantService._format_tenant_response)
+    _format_user_response = staticmethod(TenantService._format_user_response)
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.tenant_repo = AsyncTenantRepo(db)
+
+    async def create_tenant(self, request: TenantCreateRequest) -> Dict[str, Any]:
+        """
+        创建新租户
+
+        Args:
+            request: 已校验的注册请求
+
+        Returns:
+            包含租户和管理员信息的字典
+
+        Raises:
+            ValueError: 租户名称或域名已存在
+            Exception: 创建租户过程中出现错误
+        """
+        # run_sync在事件循环线程中执行，CPU密集的密码哈希需提前在进程池中算好
+        hashed_password = await password_hasher.hash(request.admin_user.password)
+
+        result = await self.db.run_sync(
+            lambda session: TenantService(session).create_tenant(request, hashed_password)
+        )
+        tenant = result["tenant"]
+        audit_log_writer.log_nowait(
+            tenant["tenant_id"], "tenant.created", user_id=result["admin_user"]["id"],
+            resource_type="tenant", resource_id=tenant["tenant_id"], details={"plan_type": tenant["plan_type"]}
+        )
+        return result
+
+    async def get_tenant(self, tenant_id: str) -> Optional[Tenant]:
+        """
+        根据租户ID获取租户信息
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self.tenant_repo.get_by_id(tenant_id)
+
+    async def get_tenant_by_domain(self, domain: str) -> Optional[Tenant]:
+        """
+        根据域名获取租户信息
+
+        Args:
+            domain: 租户域名
+
+        Returns:
+            租户对象，如果不存在则返回None
+        """
+        return await self.tenant_repo.get_by_domain(domain)
+
+    async def list_tenants(self, page: int = 1, size: int = 20, status: Optional[str] = None,
+                           plan_type: Optional[str] = None, search: Optional[str] = None,
+                           cursor: Optional[str] = None, pagination: str = "page",
+                           total_mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取租户列表（分页）
+
+        Args:
+            page: 页码（页码分页）
+            size: 每页数量
+            status: 状态过滤
+            plan_type: 套餐类型过滤
+            search: 搜索关键词
+            cursor: 翻页游标（游标分页）
+            pagination: 分页方式 page / cursor，传入cursor时按游标分页
+            total_mode: 总数模式 exact / estimated / none，默认页码分页为exact、游标分页为none
+
+        Returns:
+            包含租户列表和分页信息的字典；tenants 为租户对象，由接口层按响应模型直接序列化
+
+        Raises:
+            PaginationParamError: 分页参数无效
+        """
+        if cursor or pagination == "cursor":
+            result = await self.tenant_repo.list_by_cursor(
+                size, cursor, status, plan_type, search, total_mode or TOTAL_NONE
+            )
+        elif pagination == "page":
+            result = await self.tenant_repo.list_all(
+                page, size, status, plan_type, search, total_mode or TOTAL_EXACT
+            )
+        else:
+            raise PaginationParamError("pagination", "分页方式必须是 page 或 cursor")
+
+        return {
+            "tenants": result["tenants"],
+            "pagination": result["pagination"]
+        }
+
+    async def get_api_stats(self, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取租户API统计信息（读取限流中间件写入的按月用量，最近一个写入周期内的请求尚未计入）
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            ApiStats字段字典，租户不存在时返回None
+        """
+        tenant = await self.tenant_repo.get_by_id(tenant_id)
+        if not tenant:
+            return None
+        return await self._api_stats(tenant)
+
+    async def get_tenant_stats(self, tenant_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取租户统计信息
+
+        用户数读取 public.tenant_stats 汇总行（触发器增量维护、后台定期校正），
+        存储用量读取 public.tenant_storage_usage（后台定期统计），不扫描租户的业务表；
+        汇总尚未校正过时（新开通或迁移前已有的租户）先校正一次。
+
+        Args:
+            tenant_id: 租户ID
+
+        Returns:
+            TenantStatsData字段字典，租户不存在时返回None
+        """
+        tenant = await self.tenant_repo.get_by_id(tenant_id)
+        if not tenant:
+            return None
+
+        rollup = await self.tenant_repo.get_stats_rollup(tenant_id)
+        if rollup is None or rollup.refreshed_at is None:
+            await refresh_tenant_stats(await self.db.connection(), [(tenant.tenant_id, tenant.schema_name)])
+            await self.db.commit()
+            rollup = await self.tenant_repo.get_stats_rollup(tenant_id)
+
+        period = current_period()
+        new_users = rollup.new_users_count if rollup.new_users_period == period else 0
+        storage = await self.tenant_repo.get_storage_usage(tenant_id)
+        total_storage = tenant.max_storage or 0
+        used_storage = storage.used_bytes if storage else 0
+        next_month = datetime(period.year + period.month // 12, period.month % 12 + 1, 1, tzinfo=timezone.utc)
+        return {
+            "tenant_id": tenant.tenant_id,
+            "user_stats": {
+                "total_users": rollup.total_users,
+                "active_users": rollup.active_users,
+                "inactive_users": rollup.total_users - rollup.active_users,
+                "new_users_this_month": new_users,
+            },
+            "storage_stats": {
+                "total_storage": total_storage,
+                "used_storage": used_storage,
+                "storage_percentage": round(used_storage * 100 / total_storage, 2) if total_storage else 0.0,
+                "measured_at": storage.measured_at if storage else None,
+            },
+            "api_stats": await self._api_stats(tenant),
+            "billing_stats": {
+                "current_plan": tenant.plan_type,
+                "monthly_cost": settings.TENANT_PLAN_MONTHLY_PRICES.get(tenant.plan_type, 0.0),
+                "next_billing_date": next_month,
+            },
+            "last_activity_at": rollup.last_activity_at,
+        }
+
+    async def _api_stats(self, tenant: Tenant) -> Dict[str, Any]:
+        """读取租户API用量"""
+        total_requests, requests_this_month = await self.tenant_repo.get_api_usage(tenant.tenant_id, current_period())
+        return {
+            "total_requests": total_requests,
+            "requests_this_month": requests_this_month,
+            "rate_limit": rate_limit_for(tenant.plan_type),
+        }
@@ -4,13 +4,19 @@
 import uuid
 import logging
 from typing import Optional, Dict, Any
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.models.tenant import Tenant
 from app.models.user import User
 from app.core.schema_manager import get_schema_manager
+from app.core.tenant_template import get_template_manager
+from app.core.schema_pool import get_schema_pool
+from app.core.password_hasher import password_hasher
+from app.core.tenant_routing import tenant_execution_options, tenant_schema_name
 from app.repos.tenant import TenantRepo
+from app.schemas.tenant import TenantCreateRequest
 
 logger = logging.getLogger(__name__)
 
@@ -23,54 +29,49 @@ class TenantService:
     def __init__(self, db: Session):
         self.db = db
         self.schema_manager = get_schema_manager(db)
+        self.template_manager = get_template_manager(db)
+        self.schema_pool = get_schema_pool(db)
         self.tenant_repo = TenantRepo(db)
 
-    def create_tenant(self, tenant_data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_tenant(self, request: TenantCreateRequest, hashed_password: Optional[str] = None) -> Dict[str, Any]:
         """
         创建新租户
         
         Args:
-            tenant_data: 租户数据，包含基本信息和管理员用户信息
+            request: 已校验的注册请求（格式、取值范围均由 TenantCreateRequest 校验，这里不再重复）
+            hashed_password: 预先计算的管理员密码哈希，为空时在当前线程计算
             
         Returns:
             包含租户和管理员信息的字典
             
         Raises:
-            ValueError: 参数验证失败
+            ValueError: 租户名称或域名已存在
             Exception: 创建租户过程中出现错误
         """
         try:
-            # 1. 验证租户数据
-            self._validate_tenant_data(tenant_data)
-            
-            # 2. 生成唯一的tenant_id和schema_name
+            # 1. 生成唯一的tenant_id和schema_name
             tenant_id = self._generate_tenant_id()
-            schema_name = f"tenant_{tenant_id}"
-            
-            # 3. 检查租户名称和域名是否已存在
-            self._check_tenant_uniqueness(tenant_data.get('name'), tenant_data.get('domain'))
-            
-            # 4. 创建租户记录
-            tenant = self._create_tenant_record(tenant_data, tenant_id, schema_name)
+            schema_name = tenant_schema_name(tenant_id)
             
-            # 5. 创建租户schema
-            if not self.schema_manager.create_tenant_schema(tenant_id):
-                raise Exception("创建租户schema失败")
+            # 2. 检查租户名称和域名是否已存在
+            self._check_tenant_uniqueness(request.name, request.domain)
             
-            # 6. 在租户schema中创建业务表
-            if not self._create_tenant_tables(tenant_id):
-                raise Exception("创建租户业务表失败")
+            # 3. 创建租户记录
+            tenant = self._create_tenant_record(request, tenant_id, schema_name)
             
-            # 7. 创建管理员用户账号
-            admin_user = self._create_admin_user(tenant_data.get('admin_user'), tenant_id)
+            # 4-6. 开通租户schema并创建管理员用户账号
+            admin_user_data = request.admin_user.model_dump()
+            if hashed_password:
+                admin_user_data['hashed_password'] = hashed_password
+            admin_user = self.provision_tenant(tenant_id, request.plan_type.value, admin_user_data)
             
-            # 8. 提交事务
+            # 7. 提交事务
             self.db.commit()
             
-            # 9. 记录成功日志
+            # 8. 记录成功日志
             logger.info(f"成功创建租户: {tenant.name} (ID: {tenant_id})")
             
-            # 10. 返回创建结果
+            # 9. 返回创建结果
             return {
                 "tenant": self._format_tenant_response(tenant),
                 "admin_user": self._format_user_response(admin_user),
@@ -87,6 +88,27 @@ class TenantService:
             logger.error(f"创建租户失败: {str(e)}")
             raise e
 
+    def provision_tenant(self, tenant_id: str, plan_type: str, admin_user_data: Dict[str, Any]) -> User:
+        """
+        开通租户schema并创建管理员用户（在调用方事务中执行，不提交）
+
+        优先认领预置schema，池为空时基于模板克隆。
+
+        Args:
+            tenant_id: 租户ID
+            plan_type: 套餐类型
+            admin_user_data: 管理员用户数据
+
+        Returns:
+            创建的管理员用户对象
+
+        Raises:
+            Exception: 创建租户schema及业务表失败
+        """
+        if not self._create_tenant_tables(tenant_id, plan_type):
+            raise Exception("创建租户schema及业务表失败")
+        return self._create_admin_user(admin_user_data, tenant_id)
+
     def get_tenant(self, tenant_id: str) -> Optional[Tenant]:
         """
         根据租户ID获取租户信息
@@ -133,116 +155,6 @@ class TenantService:
             "pagination": result["pagination"]
         }
 
-    def _validate_tenant_data(self, tenant_data: Dict[str, Any]) -> None:
-        """
-        验证租户数据
-        
-        Args:
-            tenant_data: 租户数据
-            
-        Raises:
-            ValueError: 验证失败
-        """
-        required_fields = ['name', 'admin_user']
-        
-        # 检查必填字段
-        for field in required_fields:
-            if field not in tenant_data or not tenant_data[field]:
-                raise ValueError(f"字段 {field} 是必填的")
-        
-        # 验证公司名称
-        name = tenant_data['name']
-        if not isinstance(name, str) or len(name) < 2 or len(name) > 100:
-            raise ValueError("公司名称长度必须在2-100字符之间")
-        
-        # 验证域名格式
-        domain = tenant_data.get('domain')
-        if domain and not self._is_valid_domain(domain):
-            raise ValueError("域名格式不正确")
-        
-        # 验证管理员用户信息
-        admin_user = tenant_data['admin_user']
-        self._validate_admin_user(admin_user)
-        
-        # 验证套餐类型
-        plan_type = tenant_data.get('plan_type', 'basic')
-        if plan_type not in ['basic', 'pro', 'enterprise']:
-            raise ValueError("套餐类型必须是 basic、pro 或 enterprise")
-        
-        # 验证用户数量限制
-        max_users = tenant_data.get('max_users', 10)
-        if not isinstance(max_users, int) or max_users < 10 or max_users > 10000:
-            raise ValueError("最大用户数必须在10-10000之间")
-        
-        # 验证存储空间限制
-        max_storage = tenant_data.get('max_storage', 1073741824)  # 1GB
-        if not isinstance(max_storage, int) or max_storage < 1073741824 or max_storage > 1099511627776:  # 1GB-1TB
-            raise ValueError("最大存储空间必须在1GB-1TB之间")
-
-    def _validate_admin_user(self, admin_user: Dict[str, Any]) -> None:
-        """
-        验证管理员用户信息
-        
-        Args:
-            admin_user: 管理员用户信息
-            
-        Raises:
-            ValueError: 验证失败
-        """
-        required_fields = ['full_name', 'email', 'password']
-        
-        # 检查必填字段
-        for field in required_fields:
-            if field not in admin_user or not admin_user[field]:
-                raise ValueError(f"字段 {field} 是必填的")
-        
-        # 验证姓名
-        full_name = admin_user['full_name']
-        if not isinstance(full_name, str) or len(full_name) < 2 or len(full_name) > 50:
-            raise ValueError("管理员姓名长度必须在2-50字符之间")
-        
-        # 验证邮箱格式
-        email = admin_user['email']
-        if not self._is_valid_email(email):
-            raise ValueError("管理员邮箱格式不正确")
-        
-        # 验证密码强度
-        password = admin_user['password']
-        if not self._is_valid_password(password):
-            raise ValueError("密码必须包含大小写字母和数字，长度8-50字符")
-        
-        # 验证手机号（可选）
-        phone = admin_user.get('phone')
-        if phone and not self._is_valid_phone(phone):
-            raise ValueError("手机号格式不正确")
-
-    def _is_valid_domain(self, domain: str) -> bool:
-        """验证域名格式"""
-        import re
-        pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?)*$'
-        return bool(re.match(pattern, domain))
-
-    def _is_valid_email(self, email: str) -> bool:
-        """验证邮箱格式"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
-
-    def _is_valid_password(self, password: str) -> bool:
-        """验证密码强度"""
-        if len(password) < 8 or len(password) > 50:
-            return False
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        return has_upper and has_lower and has_digit
-
-    def _is_valid_phone(self, phone: str) -> bool:
-        """验证手机号格式"""
-        import re
-        pattern = r'^1[3-9]\d{9}$'
-        return bool(re.match(pattern, phone))
-
     def _generate_tenant_id(self) -> str:
         """生成唯一的租户ID"""
         return f"tenant_{uuid.uuid4().hex[:8]}"
@@ -267,12 +179,12 @@ class TenantService:
             if self.tenant_repo.exists_by_domain(domain):
                 raise ValueError(f"域名 '{domain}' 已被使用")
 
-    def _create_tenant_record(self, tenant_data: Dict[str, Any], tenant_id: str, schema_name: str) -> Tenant:
+    def _create_tenant_record(self, request: TenantCreateRequest, tenant_id: str, schema_name: str) -> Tenant:
         """
         创建租户记录
         
         Args:
-            tenant_data: 租户数据
+            request: 已校验的注册请求
             tenant_id: 租户ID
             schema_name: Schema名称
             
@@ -281,162 +193,45 @@ class TenantService:
         """
         tenant = Tenant(
             tenant_id=tenant_id,
-            name=tenant_data['name'],
-            domain=tenant_data.get('domain'),
-            avatar_url=tenant_data.get('avatar_url'),
+            name=request.name,
+            domain=request.domain,
+            avatar_url=request.avatar_url,
             status='pending',  # 初始状态为待激活
-            plan_type=tenant_data.get('plan_type', 'basic'),
-            max_users=tenant_data.get('max_users', 10),
-            max_storage=tenant_data.get('max_storage', 1073741824),  # 1GB
-            settings=tenant_data.get('settings', {}),
+            plan_type=request.plan_type.value,
+            max_users=request.max_users,
+            max_storage=request.max_storage,
+            settings=request.settings or {},
             schema_name=schema_name
         )
         
         # 使用repo层创建租户记录
         return self.tenant_repo.create(tenant)
 
-    def _create_tenant_tables(self, tenant_id: str) -> bool:
+    def _create_tenant_tables(self, tenant_id: str, plan_type: str = 'basic') -> bool:
         """
-        在租户schema中创建业务表
-        
+        创建租户schema及业务表
+
+        优先从预置池认领已建好的schema并重命名；池为空时基于模板克隆，
+        建schema、建表和初始化默认角色由服务端函数一次完成。
+        两种方式都与租户记录处于同一事务中。
+
         Args:
             tenant_id: 租户ID
-            
+            plan_type: 套餐类型
+
         Returns:
             是否创建成功
         """
         try:
-            # 设置schema
-            self.schema_manager.set_search_path(tenant_id)
-            
-            # 创建用户表
-            create_users_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS tenant_{tenant_id}.users (
-                id SERIAL PRIMARY KEY,
-                user_id VARCHAR(50) UNIQUE NOT NULL,
-                username VARCHAR(50) NOT NULL,
-                email VARCHAR(255) NOT NULL,
-                hashed_password VARCHAR(255) NOT NULL,
-                full_name VARCHAR(100),
-                phone VARCHAR(20),
-                avatar_url VARCHAR(255),
-                status user_status DEFAULT 'active',
-                role user_role DEFAULT 'user',
-                last_login_at TIMESTAMP WITH TIME ZONE,
-                email_verified_at TIMESTAMP WITH TIME ZONE,
-                phone_verified_at TIMESTAMP WITH TIME ZONE,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-            """
-            
-            # 创建角色表
-            create_roles_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS tenant_{tenant_id}.roles (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(50) NOT NULL,
-                description TEXT,
-                permissions JSONB,
-                is_system BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-            """
-            
-            # 创建用户角色关联表
-            create_user_roles_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS tenant_{tenant_id}.user_roles (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER NOT NULL,
-                role_id INTEGER NOT NULL,
-                assigned_by INTEGER,
-                assigned_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                UNIQUE(user_id, role_id)
-            );
-            """
-            
-            # 创建邀请表
-            create_invitations_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS tenant_{tenant_id}.tenant_invitations (
-                id SERIAL PRIMARY KEY,
-                email VARCHAR(255) NOT NULL,
-                role_id INTEGER,
-                token VARCHAR(255) UNIQUE NOT NULL,
-                status invitation_status DEFAULT 'pending',
-                expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
-                invited_by INTEGER NOT NULL,
-                accepted_at TIMESTAMP WITH TIME ZONE,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-            """
-            
-            # 创建审计日志表
-            create_audit_logs_table_sql = f"""
-            CREATE TABLE IF NOT EXISTS tenant_{tenant_id}.audit_logs (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER,
-                action VARCHAR(100) NOT NULL,
-                resource_type VARCHAR(50),
-                resource_id VARCHAR(50),
-                details JSONB,
-                ip_address INET,
-                user_agent TEXT,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-            );
-            """
-            
-            # 执行创建表的SQL
-            from sqlalchemy import text
-            self.db.execute(text(create_users_table_sql))
-            self.db.execute(text(create_roles_table_sql))
-            self.db.execute(text(create_user_roles_table_sql))
-            self.db.execute(text(create_invitations_table_sql))
-            self.db.execute(text(create_audit_logs_table_sql))
-            
-            # 创建默认角色
-            self._create_default_roles(tenant_id)
-            
+            schema_name = tenant_schema_name(tenant_id)
+            if not self.schema_pool.claim(plan_type, schema_name):
+                self.template_manager.clone_into(schema_name)
             return True
-            
+
         except Exception as e:
             logger.error(f"创建租户业务表失败: {str(e)}")
             return False
 
-    def _create_default_roles(self, tenant_id: str) -> None:
-        """创建默认角色"""
-        try:
-            # 设置schema
-            self.schema_manager.set_search_path(tenant_id)
-            
-            # 创建超级管理员角色
-            create_super_admin_role_sql = f"""
-            INSERT INTO tenant_{tenant_id}.roles (name, description, permissions, is_system)
-            VALUES ('super_admin', '超级管理员，拥有所有权限', '{{"all": true}}', true)
-            ON CONFLICT (name) DO NOTHING;
-            """
-            
-            # 创建管理员角色
-            create_admin_role_sql = f"""
-            INSERT INTO tenant_{tenant_id}.roles (name, description, permissions, is_system)
-            VALUES ('admin', '管理员，拥有大部分管理权限', '{{"user_management": true, "role_management": true}}', true)
-            ON CONFLICT (name) DO NOTHING;
-            """
-            
-            # 创建普通用户角色
-            create_user_role_sql = f"""
-            INSERT INTO tenant_{tenant_id}.roles (name, description, permissions, is_system)
-            VALUES ('user', '普通用户，基础权限', '{{"read": true}}', true)
-            ON CONFLICT (name) DO NOTHING;
-            """
-            
-            from sqlalchemy import text
-            self.db.execute(text(create_super_admin_role_sql))
-            self.db.execute(text(create_admin_role_sql))
-            self.db.execute(text(create_user_role_sql))
-            
-        except Exception as e:
-            logger.error(f"创建默认角色失败: {str(e)}")
-
     def _create_admin_user(self, admin_user_data: Dict[str, Any], tenant_id: str) -> User:
         """
         创建管理员用户
@@ -448,7 +243,8 @@ class TenantService:
         Returns:
             创建的用户对象
         """
-        from werkzeug.security import generate_password_hash
+        # 密码哈希在进程池中计算；异步调用方会预先算好并通过hashed_password传入
+        hashed_password = admin_user_data.get('hashed_password') or password_hasher.hash_sync(admin_user_data['password'])
         
         # 生成用户ID
         user_id = f"user_{uuid.uuid4().hex[:8]}"
@@ -457,40 +253,44 @@ class TenantService:
         email = admin_user_data['email']
         username = email.split('@')[0]
         
-        # 创建用户记录
-        user = User(
-            user_id=user_id,
-            username=username,
-            email=email,
-            hashed_password=generate_password_hash(admin_user_data['password']),
-            full_name=admin_user_data['full_name'],
-            phone=admin_user_data.get('phone'),
-            avatar_url=admin_user_data.get('avatar_url'),
-            status='active',
-            role='super_admin'
-        )
-        
-        # 注意：这里需要在租户schema中创建用户，所以需要特殊处理
-        # 由于SQLAlchemy模型的限制，这里先创建用户记录，后续在租户schema中插入
+        # 在租户schema中插入用户记录（通过schema_translate_map路由，与租户记录处于同一事务）
+        user = self.db.scalars(
+            insert(User).values(
+                user_id=user_id,
+                username=username,
+                email=email,
+                hashed_password=hashed_password,
+                full_name=admin_user_data['full_name'],
+                phone=admin_user_data.get('phone'),
+                avatar_url=admin_user_data.get('avatar_url'),
+                status='active',
+                role='super_admin'
+            ).returning(User),
+            execution_options=tenant_execution_options(tenant_schema_name(tenant_id))
+        ).one()
         
         return user
 
-    def _format_tenant_response(self, tenant: Tenant) -> Dict[str, Any]:
+    @staticmethod
+    def _format_tenant_response(tenant: Tenant) -> Dict[str, Any]:
         """格式化租户响应数据"""
         return {
             "id": tenant.id,
             "tenant_id": tenant.tenant_id,
             "name": tenant.name,
             "domain": tenant.domain,
+            "avatar_url": tenant.avatar_url,
             "status": tenant.status,
             "plan_type": tenant.plan_type,
             "max_users": tenant.max_users,
             "max_storage": tenant.max_storage,
             "schema_name": tenant.schema_name,
-            "created_at": tenant.created_at.isoformat() if tenant.created_at else None
+            "created_at": tenant.created_at.isoformat() if tenant.created_at else None,
+            "updated_at": tenant.updated_at.isoformat() if tenant.updated_at else None
         }
 
-    def _format_user_response(self, user: User) -> Dict[str, Any]:
+    @staticmethod
+    def _format_user_response(user: User) -> Dict[str, Any]:
         """格式化用户响应数据"""
         return {
             "id": user.id,
@@ -0,0 +1,305 @@
+"""
+租户批量导入（异步）
+
+从 NDJSON / CSV 字节流中逐行读取租户，流式产出每行的处理结果，内存占用与输入大小无关：
+- 每行用 TenantCreateRequest 校验，与单个注册接口规则一致；
+- 按批处理：名称/域名唯一性一次查询、管理员密码在进程池中并发哈希；
+- 租户记录写入、schema开通和管理员账号创建以有界并发执行，每个租户一个事务，
+  开通失败或导入被取消时该租户整体回滚，不影响同批其它租户。
+
+CSV 首行为列名，管理员字段使用 admin_user.full_name 这样的点号列名，settings 列为JSON字符串。
+"""
+import asyncio
+import csv
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.core.audit_log_writer import audit_log_writer
+from app.core.password_hasher import password_hasher
+from app.core.pq_db import AsyncSessionLocal
+from app.core.tenant_routing import tenant_schema_name
+from app.repos.tenant import AsyncTenantRepo
+from app.schemas.tenant import TenantCreateRequest
+from .tenane_service import TenantService
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+CHUNK_SIZE = 64 * 1024
+
+# 行号从1开始（CSV不含表头行）；解析失败的行以异常代替行数据
+ParsedRow = Tuple[int, Any]
+
+
+async def read_chunks(stream: BinaryIO) -> AsyncIterator[bytes]:
+    """分块读取文件（在线程中读，不阻塞事件循环）"""
+    while True:
+        chunk = await asyncio.to_thread(stream.read, CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """把字节块流切分为文本行（兼容 \\r\\n，忽略UTF-8 BOM）"""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        if first and chunk:
+            chunk = chunk.removeprefix(b"\xef\xbb\xbf")
+            first = False
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8")
+
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """逐行解析NDJSON，跳过空行"""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("每行必须是JSON对象")
+            yield row_number, row
+        except ValueError as e:
+            yield row_number, ValueError(f"JSON解析失败: {str(e)}")
+
+
+def _csv_record_to_row(header: List[str], values: List[str]) -> Dict[str, Any]:
+    """CSV记录转为嵌套字典：空值视为未提供，点号列名展开为嵌套字段"""
+    if len(values) != len(header):
+        raise ValueError(f"列数 {len(values)} 与表头列数 {len(header)} 不一致")
+    row: Dict[str, Any] = {}
+    for column, value in zip(header, values):
+        if value == "":
+            continue
+        if column == "settings":
+            value = json.loads(value)
+        target = row
+        *parents, key = column.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[key] = value
+    return row
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """逐条解析CSV（支持引号内换行），跳过空行"""
+    header: Optional[List[str]] = None
+    row_number = 0
+    pending = ""
+    async for line in iter_lines(chunks):
+        pending = f"{pending}\n{line}" if pending else line
+        # 引号未闭合说明字段内含换行，继续拼接下一行
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        row_number += 1
+        try:
+            yield row_number, _csv_record_to_row(header, values)
+        except ValueError as e:
+            yield row_number, ValueError(f"CSV解析失败: {str(e)}")
+    if pending:
+        yield row_number + 1, ValueError("CSV解析失败: 引号未闭合")
+
+
+def parse_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[ParsedRow]:
+    """
+    按格式解析字节流
+
+    Args:
+        chunks: 字节块异步迭代器
+        fmt: ndjson / csv
+
+    Returns:
+        (行号, 行数据或解析异常) 的异步迭代器
+
+    Raises:
+        ValueError: 不支持的格式
+    """
+    if fmt == "ndjson":
+        return iter_ndjson_rows(chunks)
+    if fmt == "csv":
+        return iter_csv_rows(chunks)
+    raise ValueError(f"导入格式必须是 {', '.join(IMPORT_FORMATS)} 之一")
+
+
+def _error_result(row_number: int, errors: List[Dict[str, str]], name: Optional[str] = None) -> Dict[str, Any]:
+    return {"row": row_number, "status": "error", "name": name, "errors": errors}
+
+
+def _validation_errors(error: ValidationError) -> List[Dict[str, str]]:
+    return [
+        {"field": ".".join(str(part) for part in item["loc"]) or "general", "message": item["msg"]}
+        for item in error.errors()
+    ]
+
+
+class TenantBulkImporter:
+    """
+    租户批量导入
+
+    自行管理数据库会话：结果以流式响应返回时，请求级依赖注入的会话已经关闭。
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                 session_factory=AsyncSessionLocal):
+        self.batch_size = batch_size or settings.TENANT_IMPORT_BATCH_SIZE
+        self.concurrency = concurrency or settings.TENANT_IMPORT_CONCURRENCY
+        self.session_factory = session_factory
+        self.summary = {"total": 0, "created": 0, "failed": 0}
+
+    async def run(self, rows: AsyncIterator[ParsedRow]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        导入租户并逐行产出结果，最后产出一条汇总
+
+        Args:
+            rows: parse_rows() 产出的行
+
+        Yields:
+            每行结果 {"row", "status": created/error, ...}，最后为 {"summary": {...}}
+        """
+        started = time.perf_counter()
+        batch: List[Tuple[int, TenantCreateRequest]] = []
+        async for row_number, row in rows:
+            self.summary["total"] += 1
+            if isinstance(row, Exception):
+                yield self._failed(_error_result(row_number, [{"field": "general", "message": str(row)}]))
+                continue
+            try:
+                batch.append((row_number, TenantCreateRequest.model_validate(row)))
+            except ValidationError as e:
+                name = row.get("name") if isinstance(row, dict) else None
+                yield self._failed(_error_result(row_number, _validation_errors(e), name))
+                continue
+
+            if len(batch) >= self.batch_size:
+                async for result in self._process_batch(batch):
+                    yield result
+                batch = []
+
+        if batch:
+            async for result in self._process_batch(batch):
+                yield result
+        yield {"summary": {**self.summary, "elapsed_s": round(time.perf_counter() - started, 3)}}
+
+    def _failed(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        self.summary["failed"] += 1
+        return result
+
+    async def _process_batch(self, batch: List[Tuple[int, TenantCreateRequest]]) -> AsyncIterator[Dict[str, Any]]:
+        """批内唯一性检查、批量写入租户记录、并发开通schema"""
+        accepted: List[Tuple[int, TenantCreateRequest]] = []
+        async with self.session_factory() as db:
+            taken_names, taken_domains = await AsyncTenantRepo(db).find_taken(
+                (request.name for _, request in batch), (request.domain for _, request in batch)
+            )
+        for row_number, request in batch:
+            if request.name in taken_names:
+                yield self._failed(_error_result(
+                    row_number, [{"field": "name", "message": f"租户名称 '{request.name}' 已存在"}], request.name))
+                continue
+            if request.domain and request.domain in taken_domains:
+                yield self._failed(_error_result(
+                    row_number, [{"field": "domain", "message": f"域名 '{request.domain}' 已被使用"}], request.name))
+                continue
+            # 同一批内后出现的重复名称/域名视为已占用
+            taken_names.add(request.name)
+            if request.domain:
+                taken_domains.add(request.domain)
+            accepted.append((row_number, request))
+        if not accepted:
+            return
+
+        hashed_passwords = await asyncio.gather(
+            *(password_hasher.hash(request.admin_user.password) for _, request in accepted)
+        )
+
+        records = []
+        for _, request in accepted:
+            tenant_id = f"tenant_{uuid.uuid4().hex[:8]}"
+            records.append({
+                "tenant_id": tenant_id,
+                "name": request.name,
+                "domain": request.domain,
+                "avatar_url": request.avatar_url,
+                "status": "pending",
+                "plan_type": request.plan_type.value,
+                "max_users": request.max_users,
+                "max_storage": request.max_storage,
+                "settings": request.settings or {},
+                "schema_name": tenant_schema_name(tenant_id),
+            })
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._provision(semaphore, row_number, request, record, hashed_password))
+            for (row_number, request), record, hashed_password in zip(accepted, records, hashed_passwords)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                if result["status"] == "created":
+                    self.summary["created"] += 1
+                else:
+                    self.summary["failed"] += 1
+                yield result
+        finally:
+            # 导入被取消（客户端断开、命令行中断）时，等未完成的租户事务回滚后再返回；
+            # 用 wait 而不是 gather：等待本身再被取消时不会把取消传给正在回滚的任务
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+
+    async def _provision(self, semaphore: asyncio.Semaphore, row_number: int, request: TenantCreateRequest,
+                         record: Dict[str, Any], hashed_password: str) -> Dict[str, Any]:
+        """
+        在同一事务中写入租户记录、开通schema并创建管理员账号
+
+        失败或被取消时整个事务回滚，不会留下没有schema的租户记录。
+        """
+        admin_user_data = {**request.admin_user.model_dump(), "hashed_password": hashed_password}
+        async with semaphore:
+            try:
+                async with self.session_factory() as db:
+                    tenant = (await AsyncTenantRepo(db).create_many([record]))[0]
+                    admin_user = await db.run_sync(
+                        lambda session: TenantService(session).provision_tenant(
+                            tenant.tenant_id, request.plan_type.value, admin_user_data)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"开通租户 {record['tenant_id']} 失败: {str(e)}")
+                return _error_result(row_number, [{"field": "general", "message": f"创建租户失败: {str(e)}"}],
+                                     request.name)
+
+        audit_log_writer.log_nowait(
+            tenant.tenant_id, "tenant.created", user_id=admin_user.id, resource_type="tenant",
+            resource_id=tenant.tenant_id, details={"plan_type": tenant.plan_type, "source": "bulk_import"}
+        )
+        return {
+            "row": row_number,
+            "status": "created",
+            "tenant": TenantService._format_tenant_response(tenant),
+            "admin_user": TenantService._format_user_response(admin_user),
+        }
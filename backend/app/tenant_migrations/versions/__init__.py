@@ -0,0 +1 @@
+# Tenant schema revisions
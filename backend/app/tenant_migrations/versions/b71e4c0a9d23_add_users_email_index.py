@@ -0,0 +1,16 @@
+"""add_users_email_index
+
+租户用户按邮箱登录（AsyncAuthService.authenticate）需要 users.email 索引。
+
+Revision ID: b71e4c0a9d23
+Revises:
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 'b71e4c0a9d23'
+down_revision = None
+
+
+def upgrade(conn: Connection, schema: str) -> None:
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_email ON {schema}.users (email)"))
@@ -0,0 +1,34 @@
+"""add_tenant_stats_triggers
+
+users / audit_logs 的写入通过语句级触发器增量更新 public.tenant_stats
+（触发器函数由alembic迁移 d4f2a8c61e95 创建）。
+
+Revision ID: c8e2f4a7b391
+Revises: b71e4c0a9d23
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 'c8e2f4a7b391'
+down_revision = 'b71e4c0a9d23'
+
+# (触发器名, 表名, 事件, 转换表, 触发器函数)
+TRIGGERS = [
+    ("users_stats_insert", "users", "AFTER INSERT", "REFERENCING NEW TABLE AS new_rows",
+     "public.tenant_stats_users_changed()"),
+    ("users_stats_update", "users", "AFTER UPDATE", "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+     "public.tenant_stats_users_changed()"),
+    ("users_stats_delete", "users", "AFTER DELETE", "REFERENCING OLD TABLE AS old_rows",
+     "public.tenant_stats_users_changed()"),
+    ("audit_logs_stats_insert", "audit_logs", "AFTER INSERT", "REFERENCING NEW TABLE AS new_rows",
+     "public.tenant_stats_audit_logged()"),
+]
+
+
+def upgrade(conn: Connection, schema: str) -> None:
+    for name, table, event, referencing, function in TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {schema}.{table}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {name} {event} ON {schema}.{table} {referencing} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}"
+        ))
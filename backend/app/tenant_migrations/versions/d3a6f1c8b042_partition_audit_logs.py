@@ -0,0 +1,100 @@
+"""partition_audit_logs
+
+audit_logs 改为按 created_at 月度范围分区的分区表（分区 audit_logs_pYYYYMM），
+created_at 上建BRIN索引，主键改为 (id, created_at)。
+分区表上的identity列需要PostgreSQL 17+，id 改用schema内的序列（DEFAULT nextval），
+序列从原identity序列和已有最大id中较大的一个继续。
+已有数据按月份建好分区后整体复制，统计触发器重建到分区表上；
+之后的分区由 app.core.audit_partitions 定期预建和按保留策略删除。
+
+Revision ID: d3a6f1c8b042
+Revises: c8e2f4a7b391
+"""
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 'd3a6f1c8b042'
+down_revision = 'c8e2f4a7b391'
+
+# 预建当月之后的月数
+PARTITIONS_AHEAD = 2
+
+PARTITIONED_TABLE_DDL = """
+CREATE TABLE {schema}.audit_logs (
+    id BIGINT NOT NULL DEFAULT nextval('{schema}.audit_logs_id_seq'),
+    user_id INTEGER,
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(50),
+    resource_id VARCHAR(50),
+    details JSONB,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+COLUMNS = "id, user_id, action, resource_type, resource_id, details, ip_address, user_agent"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade(conn: Connection, schema: str) -> None:
+    relkind = conn.execute(text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = :schema AND c.relname = 'audit_logs'"
+    ), {"schema": schema}).scalar()
+    if relkind == 'p':
+        return
+
+    conn.execute(text(f"ALTER TABLE {schema}.audit_logs RENAME TO audit_logs_unpartitioned"))
+    conn.execute(text(f"ALTER INDEX {schema}.audit_logs_pkey RENAME TO audit_logs_unpartitioned_pkey"))
+    conn.execute(text(f"DROP TRIGGER IF EXISTS audit_logs_stats_insert ON {schema}.audit_logs_unpartitioned"))
+    # 原identity序列随旧表删除，先改名让出 audit_logs_id_seq
+    old_sequence = conn.execute(text(
+        f"SELECT pg_get_serial_sequence('{schema}.audit_logs_unpartitioned', 'id')"
+    )).scalar()
+    if old_sequence:
+        conn.execute(text(f"ALTER SEQUENCE {old_sequence} RENAME TO audit_logs_unpartitioned_id_seq"))
+        old_sequence = f"{schema}.audit_logs_unpartitioned_id_seq"
+    conn.execute(text(f"CREATE SEQUENCE {schema}.audit_logs_id_seq"))
+    conn.execute(text(PARTITIONED_TABLE_DDL.format(schema=schema)))
+    conn.execute(text(f"ALTER SEQUENCE {schema}.audit_logs_id_seq OWNED BY {schema}.audit_logs.id"))
+    conn.execute(text(f"CREATE INDEX audit_logs_created_at_brin ON {schema}.audit_logs USING brin (created_at)"))
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    oldest = conn.execute(text(
+        f"SELECT (date_trunc('month', min(created_at) AT TIME ZONE 'UTC'))::date "
+        f"FROM {schema}.audit_logs_unpartitioned"
+    )).scalar()
+    month = min(oldest, current) if oldest else current
+    while month <= _add_months(current, PARTITIONS_AHEAD):
+        conn.execute(text(
+            f"CREATE TABLE {schema}.audit_logs_p{month:%Y%m} PARTITION OF {schema}.audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+        ))
+        month = _add_months(month, 1)
+
+    conn.execute(text(
+        f"INSERT INTO {schema}.audit_logs ({COLUMNS}, created_at) "
+        f"SELECT {COLUMNS}, COALESCE(created_at, NOW()) FROM {schema}.audit_logs_unpartitioned"
+    ))
+    # 下一个id：原identity序列的下一个值与已有最大id+1中的较大者
+    old_next = "1"
+    if old_sequence:
+        old_next = (f"(SELECT CASE WHEN is_called THEN last_value + 1 ELSE last_value END "
+                    f"FROM {old_sequence})")
+    conn.execute(text(
+        f"SELECT setval('{schema}.audit_logs_id_seq', GREATEST(COALESCE(MAX(id), 0) + 1, {old_next}), false) "
+        f"FROM {schema}.audit_logs"
+    ))
+    conn.execute(text(f"DROP TABLE {schema}.audit_logs_unpartitioned"))
+    conn.execute(text(
+        f"CREATE TRIGGER audit_logs_stats_insert AFTER INSERT ON {schema}.audit_logs "
+        f"REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION public.tenant_stats_audit_logged()"
+    ))
@@ -0,0 +1,29 @@
+"""add_audit_log_query_indexes
+
+审计日志查询接口（GET /audit-logs）的索引：按 (created_at, id) 游标分页，
+分别按操作、资源、用户过滤后同样按 (created_at, id) 排序，
+details 的包含查询（@>）使用 GIN(jsonb_path_ops)。
+分区表上的索引自动建到每个分区及之后新建的分区上。
+
+Revision ID: f1b7c3d9e264
+Revises: d3a6f1c8b042
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+revision = 'f1b7c3d9e264'
+down_revision = 'd3a6f1c8b042'
+
+# (索引名, 索引定义)
+INDEXES = [
+    ("audit_logs_created_id_idx", "(created_at, id)"),
+    ("audit_logs_action_created_idx", "(action, created_at, id)"),
+    ("audit_logs_resource_created_idx", "(resource_type, resource_id, created_at, id)"),
+    ("audit_logs_user_created_idx", "(user_id, created_at, id)"),
+    ("audit_logs_details_gin", "USING gin (details jsonb_path_ops)"),
+]
+
+
+def upgrade(conn: Connection, schema: str) -> None:
+    for name, definition in INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {schema}.audit_logs {definition}"))
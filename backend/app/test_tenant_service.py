@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy.orm import Session
 from core.pq_db import SessionLocal
 from services.tenant import TenantService
+from schemas.tenant import TenantCreateRequest
 
 def test_create_tenant():
     """测试创建租户"""
@@ -37,7 +38,7 @@ def test_create_tenant():
         print("开始创建租户...")
         
         # 创建租户
-        result = tenant_service.create_tenant(tenant_data)
+        result = tenant_service.create_tenant(TenantCreateRequest(**tenant_data))
         
         print("✅ 租户创建成功！")
         print(f"租户信息: {result['tenant']}")
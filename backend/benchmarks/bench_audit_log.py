@@ -0,0 +1,127 @@
+"""
+审计日志写入压测：请求内逐条INSERT vs 异步缓冲 + COPY批量写入
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_audit_log --events 50000 --tenants 20 --concurrency 50
+
+使用已开通的前 --tenants 个租户，--concurrency 个协程轮流为各租户记录事件：
+- insert:   每个事件在独立事务中 INSERT 一行（请求内同步写入的写法）
+- pipeline: AuditLogWriter.log()，报告记录延迟、端到端吞吐（直到全部写入）与批大小
+- overflow: 缓冲上限很小且不等待时的丢弃计数
+
+压测结束后删除写入的压测事件。
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.audit_log_writer import AuditLogWriter
+from app.core.metrics import registry
+from app.core.pq_db import async_engine
+from benchmarks.common import print_report, quiet_sql_logging, run_concurrent
+
+ACTION_PREFIX = "bench."
+
+
+async def bench_tenants(count: int) -> list:
+    async with async_engine.connect() as conn:
+        return (await conn.execute(text(
+            "SELECT t.tenant_id, t.schema_name FROM public.tenants t "
+            "JOIN pg_namespace n ON n.nspname = t.schema_name ORDER BY t.tenant_id LIMIT :count"
+        ), {"count": count})).all()
+
+
+async def cleanup(tenants: list) -> None:
+    for _, schema_name in tenants:
+        async with async_engine.begin() as conn:
+            await conn.execute(text(f"DELETE FROM {schema_name}.audit_logs WHERE action LIKE :prefix"),
+                               {"prefix": f"{ACTION_PREFIX}%"})
+
+
+def event_fields(i: int) -> dict:
+    return {
+        "user_id": i % 100, "resource_type": "document", "resource_id": str(i),
+        "details": {"seq": i, "field": "title"}, "ip_address": "10.0.0.1", "user_agent": "bench",
+    }
+
+
+async def bench_insert(tenants: list, events: int, concurrency: int):
+    async def call(i: int) -> bool:
+        _, schema_name = tenants[i % len(tenants)]
+        fields = event_fields(i)
+        async with async_engine.begin() as conn:
+            await conn.execute(text(
+                f"INSERT INTO {schema_name}.audit_logs "
+                f"(user_id, action, resource_type, resource_id, details, ip_address, user_agent) "
+                f"VALUES (:user_id, :action, :resource_type, :resource_id, CAST(:details AS JSONB), "
+                f"CAST(:ip_address AS INET), :user_agent)"
+            ), {**fields, "action": f"{ACTION_PREFIX}insert", "details": '{"seq": %d}' % i})
+        return True
+
+    return await run_concurrent(call, events, concurrency)
+
+
+async def bench_pipeline(tenants: list, events: int, concurrency: int):
+    writer = AuditLogWriter()
+    writer.start()
+    written = registry.counter("audit_events_written_total", "")
+    written_before = written.value()
+
+    async def call(i: int) -> bool:
+        tenant_id, _ = tenants[i % len(tenants)]
+        return await writer.log(tenant_id, f"{ACTION_PREFIX}pipeline", **event_fields(i))
+
+    started = time.perf_counter()
+    stats = await run_concurrent(call, events, concurrency)
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+    batches = registry.histogram("audit_batch_size", "").samples()[0]
+    stats.update({
+        "written": int(written.value() - written_before),
+        "end_to_end_s": round(elapsed, 3),
+        "events_per_s": round((written.value() - written_before) / elapsed, 1),
+        "avg_batch_size": round(batches["sum"] / batches["count"], 1),
+    })
+    return stats
+
+
+async def bench_overflow(tenants: list, events: int):
+    writer = AuditLogWriter(queue_size=1000, flush_interval=60)
+    writer.start()
+    dropped = registry.counter("audit_events_dropped_total", "", ["reason"])
+    dropped_before = dropped.value(reason="full")
+    accepted = sum(
+        writer.log_nowait(tenants[i % len(tenants)][0], f"{ACTION_PREFIX}overflow", **event_fields(i))
+        for i in range(events)
+    )
+    await writer.stop()
+    return {"accepted": accepted, "dropped_full": int(dropped.value(reason="full") - dropped_before)}
+
+
+async def main_async(args) -> None:
+    tenants = await bench_tenants(args.tenants)
+    await cleanup(tenants)
+    try:
+        print_report(f"insert x{args.events // 10}", await bench_insert(tenants, args.events // 10, args.concurrency))
+        print_report(f"pipeline x{args.events}", await bench_pipeline(tenants, args.events, args.concurrency))
+        print_report("overflow (queue_size=1000, no wait)", await bench_overflow(tenants, 5000))
+    finally:
+        await cleanup(tenants)
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审计日志写入压测")
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+审计日志分区压测：单表（仅主键） vs 月度分区 + BRIN
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_audit_partitions --rows 2000000 --months 12
+
+- 在两个压测schema中分别建改造前的单表和分区表，写入相同的 --rows 行、按时间顺序跨 --months 个月的审计日志
+- range:     最近7天的计数、最近7天最新100条，报告耗时和读取的数据页数
+- retention: 单表 DELETE 早于保留期的数据 vs 分区表 DROP 过期分区
+- maintain:  对全部租户schema执行一轮分区维护的耗时
+
+压测结束后删除压测schema。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.audit_partitions import (
+    AuditLogPartitionManager, add_months, create_partition_sql, month_start, partition_name,
+)
+from app.core.pq_db import async_engine, engine
+from app.core.tenant_template import TENANT_TABLES_DDL
+from app.tenant_migrations.versions.d3a6f1c8b042_partition_audit_logs import PARTITIONED_TABLE_DDL
+from benchmarks.common import print_report, quiet_sql_logging
+
+HEAP_SCHEMA = "bench_audit_heap"
+PARTITIONED_SCHEMA = "bench_audit_partitioned"
+
+QUERIES = {
+    "count_7d": "SELECT count(*) FROM {schema}.audit_logs WHERE created_at >= now() - interval '7 days'",
+    "latest_7d": "SELECT * FROM {schema}.audit_logs WHERE created_at >= now() - interval '7 days' "
+                 "ORDER BY created_at DESC LIMIT 100",
+}
+
+
+def audit_logs_ddl() -> str:
+    return next(ddl for ddl in TENANT_TABLES_DDL if ".audit_logs (" in ddl)
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        for schema in (HEAP_SCHEMA, PARTITIONED_SCHEMA):
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+
+def setup(rows: int, months: int) -> None:
+    current = month_start()
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {HEAP_SCHEMA}"))
+        conn.execute(text(audit_logs_ddl().format(schema=HEAP_SCHEMA)))
+        conn.execute(text(f"CREATE SCHEMA {PARTITIONED_SCHEMA}"))
+        conn.execute(text(PARTITIONED_TABLE_DDL.format(schema=PARTITIONED_SCHEMA)))
+        conn.execute(text(
+            f"CREATE INDEX audit_logs_created_at_brin ON {PARTITIONED_SCHEMA}.audit_logs USING brin (created_at)"
+        ))
+        for offset in range(-months, 3):
+            conn.execute(text(create_partition_sql(PARTITIONED_SCHEMA, add_months(current, offset))))
+    # 按时间顺序写入，与审计日志只追加的写入模式一致
+    for schema in (HEAP_SCHEMA, PARTITIONED_SCHEMA):
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                INSERT INTO {schema}.audit_logs (user_id, action, resource_type, resource_id, details, created_at)
+                SELECT g % 500, 'document.update', 'document', g::text, jsonb_build_object('seq', g),
+                       now() - (:months * interval '30 days') * (1 - g::float8 / :rows)
+                FROM generate_series(1, :rows) g
+            """), {"rows": rows, "months": months})
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(text(f"VACUUM ANALYZE {schema}.audit_logs"))
+
+
+def total_bytes(conn, schema: str) -> int:
+    return conn.scalar(text(
+        "SELECT COALESCE(sum(pg_total_relation_size(c.oid)), 0) FROM pg_class c "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema AND c.relkind = 'r'"
+    ), {"schema": schema})
+
+
+def bench_range(schema: str, repeat: int) -> dict:
+    report = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            query = sql.format(schema=schema)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(text(query)).all()
+                timings.append((time.perf_counter() - start) * 1000)
+            plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")).scalar()[0]["Plan"]
+            report[f"{name}_p50_ms"] = round(statistics.median(timings), 2)
+            report[f"{name}_pages"] = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    return report
+
+
+def bench_retention(retention: int) -> None:
+    cutoff = add_months(month_start(), -retention)
+    with engine.connect() as conn:
+        heap_before = total_bytes(conn, HEAP_SCHEMA)
+        start = time.perf_counter()
+        deleted = conn.execute(text(f"DELETE FROM {HEAP_SCHEMA}.audit_logs WHERE created_at < :cutoff"),
+                               {"cutoff": datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)}).rowcount
+        conn.commit()
+        heap_elapsed = time.perf_counter() - start
+        heap_after = total_bytes(conn, HEAP_SCHEMA)
+
+        partitioned_before = total_bytes(conn, PARTITIONED_SCHEMA)
+        expired = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass) AND c.relname < :cutoff"
+        ), {"parent": f"{PARTITIONED_SCHEMA}.audit_logs", "cutoff": partition_name(cutoff)}).scalars().all()
+        start = time.perf_counter()
+        for name in expired:
+            conn.execute(text(f"DROP TABLE {PARTITIONED_SCHEMA}.{name}"))
+        conn.commit()
+        partitioned_elapsed = time.perf_counter() - start
+        partitioned_after = total_bytes(conn, PARTITIONED_SCHEMA)
+
+    print_report(f"retention heap DELETE ({retention} months)", {
+        "rows": deleted, "elapsed_s": round(heap_elapsed, 3),
+        "size_before_mb": round(heap_before / 2 ** 20, 1), "size_after_mb": round(heap_after / 2 ** 20, 1),
+    })
+    print_report(f"retention partition DROP ({retention} months)", {
+        "partitions": len(expired), "elapsed_s": round(partitioned_elapsed, 3),
+        "size_before_mb": round(partitioned_before / 2 ** 20, 1),
+        "size_after_mb": round(partitioned_after / 2 ** 20, 1),
+    })
+
+
+async def bench_maintain() -> dict:
+    start = time.perf_counter()
+    result = await AuditLogPartitionManager().maintain()
+    await async_engine.dispose()
+    return {**result, "elapsed_s": round(time.perf_counter() - start, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审计日志分区压测")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--retention", type=int, default=3, help="保留月数")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        setup(args.rows, args.months)
+        with engine.connect() as conn:
+            print_report("size", {
+                "heap_mb": round(total_bytes(conn, HEAP_SCHEMA) / 2 ** 20, 1),
+                "partitioned_mb": round(total_bytes(conn, PARTITIONED_SCHEMA) / 2 ** 20, 1),
+            })
+        print_report(f"range heap x{args.rows}", bench_range(HEAP_SCHEMA, args.repeat))
+        print_report(f"range partitioned x{args.rows}", bench_range(PARTITIONED_SCHEMA, args.repeat))
+        bench_retention(args.retention)
+        print_report("maintain", asyncio.run(bench_maintain()))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+审计日志查询压测：无查询索引 + OFFSET分页 vs 复合/GIN索引 + 游标分页
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_audit_query --rows 1000000 --months 6
+
+- 建一个压测schema并执行租户迁移到 d3a6f1c8b042（月度分区，仅主键和BRIN），
+  写入 --rows 行按时间顺序跨 --months 个月的审计日志
+- 先在无查询索引时测各类过滤查询和深分页（OFFSET），再执行迁移 f1b7c3d9e264 建索引后
+  用 AsyncAuditLogRepo 测同样的过滤查询和游标翻页
+- export: AuditLogService.export 导出全部数据的吞吐
+
+压测结束后删除压测schema。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.audit_partitions import add_months, create_partition_sql, month_start
+from app.core.pq_db import async_engine, engine
+from app.core.tenant_migrations import upgrade_schema
+from app.core.tenant_routing import async_tenant_session
+from app.core.tenant_template import TENANT_TABLES_DDL
+from app.repos.audit import AsyncAuditLogRepo
+from app.services.audit import AuditLogService
+from benchmarks.common import print_report, quiet_sql_logging
+
+SCHEMA = "bench_audit_query"
+PARTITIONED_REVISION = "d3a6f1c8b042"
+INDEXED_REVISION = "f1b7c3d9e264"
+
+# 过滤条件：名称 -> AsyncAuditLogRepo 过滤参数
+FILTERS = {
+    "action_7d": {"action": "document.delete"},
+    "user": {"user_id": 42},
+    "resource": {"resource_type": "document", "resource_id": "777"},
+    "details": {"details": {"field": "permissions"}},
+}
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+def setup(rows: int, months: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        for ddl in TENANT_TABLES_DDL:
+            conn.execute(text(ddl.format(schema=SCHEMA)))
+        upgrade_schema(conn, SCHEMA, target=PARTITIONED_REVISION)
+        for offset in range(-months, 0):
+            conn.execute(text(create_partition_sql(SCHEMA, add_months(month_start(), offset))))
+        conn.execute(text(f"""
+            INSERT INTO {SCHEMA}.audit_logs (user_id, action, resource_type, resource_id, details, ip_address, created_at)
+            SELECT g % 1000,
+                   CASE WHEN g % 100 = 0 THEN 'document.delete'
+                        ELSE (ARRAY['user.login', 'document.update', 'document.view'])[1 + g % 3] END,
+                   'document', (g % 5000)::text,
+                   jsonb_build_object('seq', g, 'field', CASE WHEN g % 997 = 0 THEN 'permissions' ELSE 'title' END),
+                   '10.0.0.1', now() - (:months * interval '30 days') * (1 - g::float8 / :rows)
+            FROM generate_series(1, :rows) g
+        """), {"rows": rows, "months": months})
+    analyze()
+
+
+def analyze() -> None:
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text(f"VACUUM ANALYZE {SCHEMA}.audit_logs"))
+
+
+def filters_for(name: str) -> dict:
+    filters = dict(FILTERS[name])
+    if name == "action_7d":
+        filters["since"] = datetime.now(timezone.utc) - timedelta(days=7)
+    return filters
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+async def bench_filters(repeat: int) -> dict:
+    report = {}
+    async with async_tenant_session(SCHEMA) as db:
+        repo = AsyncAuditLogRepo(db)
+        for name in FILTERS:
+            report[f"{name}_p50_ms"] = await timed(lambda: repo.list_by_cursor(50, **filters_for(name)), repeat)
+    return report
+
+
+async def bench_offset(depth: int, repeat: int) -> dict:
+    async with async_engine.connect() as conn:
+        query = text(f"SELECT * FROM {SCHEMA}.audit_logs ORDER BY created_at DESC, id DESC LIMIT 50 OFFSET :offset")
+        return {f"offset_{depth}_p50_ms": await timed(lambda: conn.execute(query, {"offset": depth}), repeat)}
+
+
+async def bench_keyset(depth: int) -> dict:
+    async with async_tenant_session(SCHEMA) as db:
+        repo = AsyncAuditLogRepo(db)
+        result = await repo.list_by_cursor(1000)
+        for _ in range(depth // 1000 - 1):
+            result = await repo.list_by_cursor(1000, result["pagination"]["next_cursor"])
+        cursor = result["pagination"]["next_cursor"]
+        return {f"keyset_at_{depth}_p50_ms": await timed(lambda: repo.list_by_cursor(50, cursor), 20)}
+
+
+async def bench_export() -> dict:
+    async with async_tenant_session(SCHEMA) as db:
+        start = time.perf_counter()
+        rows = size = 0
+        async for chunk in AuditLogService(db).export("ndjson"):
+            rows += chunk.count("\n")
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+    return {"rows": rows, "mb": round(size / 2 ** 20, 1), "elapsed_s": round(elapsed, 2),
+            "rows_per_s": round(rows / elapsed)}
+
+
+async def main_async(args) -> None:
+    print_report("no query indexes", {
+        **await bench_filters(args.repeat), **await bench_offset(args.depth, args.repeat)
+    })
+    with engine.begin() as conn:
+        upgrade_schema(conn, SCHEMA, target=INDEXED_REVISION)
+    analyze()
+    print_report("indexed + keyset", {
+        **await bench_filters(args.repeat), **await bench_keyset(args.depth)
+    })
+    print_report("export ndjson", await bench_export())
+    with engine.connect() as conn:
+        sizes = conn.execute(text(
+            "SELECT regexp_replace(c.relname, '_p[0-9]{6}', '') AS name, sum(pg_relation_size(c.oid)) FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema AND c.relkind = 'i' "
+            "AND c.relname LIKE 'audit_logs_p%' GROUP BY 1 ORDER BY 1"
+        ), {"schema": SCHEMA}).all()
+    print_report("index size (mb)", {name: round(size / 2 ** 20, 1) for name, size in sizes})
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审计日志查询压测")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=100000, help="深分页位置")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        setup(args.rows, args.months)
+        asyncio.run(main_async(args))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
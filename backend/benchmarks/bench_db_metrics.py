@@ -0,0 +1,145 @@
+"""
+请求级数据库指标的采集开销
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_db_metrics --requests 2000 --rounds 5
+
+- requests: 经完整应用（httpx ASGITransport）请求租户接口，交替执行开启/关闭采集
+  （DBMetricsMiddleware + 语句计时事件）的轮次，比较平均与p50耗时
+- hooks:    单条语句的 before/after_cursor_execute 回调耗时、单个请求的中间件耗时（空ASGI应用），
+  按每请求平均语句数折算出占请求耗时的比例（单核机器上端到端对比的波动大于采集开销本身）
+
+压测前写入1个压测租户，压测结束后删除。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app.config import settings
+from app.core import db_metrics
+from app.core.pq_db import async_engine, engine
+from app.main import app
+from benchmarks.bench_tenant_storage import cleanup, setup
+from benchmarks.common import print_report, quiet_sql_logging
+
+HOOKS = (("before_cursor_execute", db_metrics._before_cursor_execute),
+         ("after_cursor_execute", db_metrics._after_cursor_execute))
+
+
+def set_instrumented(enabled: bool) -> None:
+    """开启/关闭语句计时事件和请求中间件（连接池等待计时始终开启）"""
+    for target in (engine, async_engine.sync_engine):
+        for name, hook in HOOKS:
+            if enabled and not event.contains(target, name, hook):
+                event.listen(target, name, hook)
+            elif not enabled and event.contains(target, name, hook):
+                event.remove(target, name, hook)
+    middleware = [m for m in app.user_middleware if m.cls is not db_metrics.DBMetricsMiddleware]
+    if enabled:
+        middleware.insert(0, next(m for m in _all_middleware if m.cls is db_metrics.DBMetricsMiddleware))
+    app.user_middleware = middleware
+    app.middleware_stack = None
+
+
+_all_middleware = list(app.user_middleware)
+
+
+async def run_round(client: httpx.AsyncClient, paths: list, headers: dict, requests: int) -> list:
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        response = await client.get(paths[i % len(paths)], headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def bench_requests(tenant_id: str, requests: int, rounds: int) -> dict:
+    paths = ["/api/v1/audit-logs", f"/api/v1/tenants/{tenant_id}"]
+    headers = {"x-tenant_id": tenant_id}
+    results = {True: [], False: []}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        set_instrumented(True)
+        await run_round(client, paths, headers, 200)
+        for _ in range(rounds):
+            for enabled in (False, True):
+                set_instrumented(enabled)
+                results[enabled].extend(await run_round(client, paths, headers, requests))
+    set_instrumented(True)
+    await async_engine.dispose()
+
+    report = {}
+    for enabled, label in ((False, "off"), (True, "on")):
+        report[f"{label}_mean_ms"] = round(statistics.fmean(results[enabled]) * 1000, 3)
+        report[f"{label}_p50_ms"] = round(statistics.median(results[enabled]) * 1000, 3)
+    report["overhead_mean_pct"] = round((report["on_mean_ms"] / report["off_mean_ms"] - 1) * 100, 2)
+    report["overhead_p50_pct"] = round((report["on_p50_ms"] / report["off_p50_ms"] - 1) * 100, 2)
+    return report
+
+
+class _Context:
+    pass
+
+
+class _Cursor:
+    rowcount = 1
+
+
+async def bench_hooks(iterations: int) -> dict:
+    context, cursor = _Context(), _Cursor()
+    token = db_metrics._request_stats.set(db_metrics.RequestDBStats({"path": "/"}))
+    start = time.perf_counter()
+    for _ in range(iterations):
+        db_metrics._before_cursor_execute(None, cursor, "SELECT 1", None, context, False)
+        db_metrics._after_cursor_execute(None, cursor, "SELECT 1", None, context, False)
+    per_query = (time.perf_counter() - start) / iterations
+    db_metrics._request_stats.reset(token)
+
+    async def empty_app(scope, receive, send):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/audit-logs"}
+    timings = {}
+    for label, asgi in (("bare", empty_app), ("middleware", db_metrics.DBMetricsMiddleware(empty_app))):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await asgi(dict(scope), None, None)
+        timings[label] = (time.perf_counter() - start) / iterations
+    return {
+        "per_query_us": round(per_query * 1e6, 2),
+        "middleware_us": round((timings["middleware"] - timings["bare"]) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库指标采集开销压测")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    # 不受租户限流影响
+    settings.TENANT_RATE_LIMITS = {plan: 10 ** 9 for plan in settings.TENANT_RATE_LIMITS}
+    cleanup()
+    try:
+        tenant_id, _ = setup(1, 1)[0]
+        requests = asyncio.run(bench_requests(tenant_id, args.requests, args.rounds))
+        print_report("requests (off vs on)", requests)
+        queries = db_metrics.request_db_queries.samples()
+        queries_per_request = sum(sample["sum"] for sample in queries) / sum(sample["count"] for sample in queries)
+        hooks = asyncio.run(bench_hooks(args.iterations))
+        hooks["queries_per_request"] = round(queries_per_request, 2)
+        per_request_us = hooks["middleware_us"] + hooks["per_query_us"] * hooks["queries_per_request"]
+        hooks["overhead_pct"] = round(per_request_us / (requests["off_mean_ms"] * 1000) * 100, 3)
+        print_report("hooks", hooks)
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
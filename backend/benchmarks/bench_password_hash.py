@@ -0,0 +1,79 @@
+"""
+密码哈希压测：事件循环内直接哈希 vs 进程池
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_password_hash --hashes 40 --concurrency 8
+
+- inline: 改造前的方式，在协程中直接调用 generate_password_hash，阻塞事件循环
+- pool:   通过 password_hasher 提交到进程池，事件循环只等待结果
+
+哈希进行期间，探测协程每隔 --probe-ms 毫秒醒来一次，记录实际唤醒延迟，
+模拟同一进程中其它请求（如 /health）的响应延迟。
+"""
+import argparse
+import asyncio
+import time
+
+from app.config import settings
+from app.core.password_hasher import compute_hash, hash_params, password_hasher
+from benchmarks.common import print_report, run_concurrent, summarize
+
+
+async def probe(stop: asyncio.Event, interval: float, lags: list) -> None:
+    """按固定间隔睡眠，记录超出预期的唤醒延迟"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(mode: str, hashes: int, concurrency: int, interval: float):
+    params = hash_params()
+
+    async def hash_inline(i: int) -> bool:
+        compute_hash(f"password-{i}", params)
+        return True
+
+    async def hash_pool(i: int) -> bool:
+        await password_hasher.hash(f"password-{i}")
+        return True
+
+    call = hash_inline if mode == "inline" else hash_pool
+    stop = asyncio.Event()
+    lags: list = []
+    probe_task = asyncio.create_task(probe(stop, interval, lags))
+    stats = await run_concurrent(call, hashes, concurrency)
+    stop.set()
+    await probe_task
+    return stats, summarize(lags, stats["elapsed_s"])
+
+
+async def main_async(args) -> None:
+    # 预热进程池，避免把工作进程启动时间计入结果
+    await asyncio.gather(*(password_hasher.hash("warmup") for _ in range(password_hasher.workers)))
+    print(f"算法: {hash_params()}，进程池大小: {password_hasher.workers}")
+
+    for mode in ("inline", "pool"):
+        stats, lag_stats = await run(mode, args.hashes, args.concurrency, args.probe_ms / 1000)
+        print_report(f"{mode} - 哈希", stats)
+        print_report(f"{mode} - 事件循环唤醒延迟", lag_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="密码哈希对事件循环的影响")
+    parser.add_argument("--hashes", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--probe-ms", type=float, default=10.0)
+    parser.add_argument("--algorithm", choices=["pbkdf2", "scrypt", "argon2"], default=None)
+    args = parser.parse_args()
+    if args.algorithm:
+        settings.PASSWORD_HASH_ALGORITHM = args.algorithm
+
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
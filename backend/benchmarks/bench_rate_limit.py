@@ -0,0 +1,124 @@
+"""
+租户API限流压测：中间件开销与用量批量写入
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_rate_limit --requests 200000 --tenants 5000
+
+- middleware: 同一个空ASGI应用，分别直接调用和经 TenantRateLimitMiddleware 调用，
+  比较单次请求耗时（租户套餐已预热，不含数据库查询）
+- flush:      --tenants 个租户的用量计数，逐行upsert vs 一条 unnest 批量upsert
+
+压测结束后删除写入的用量记录。
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.pq_db import async_engine
+from app.core.rate_limit import (
+    UPSERT_USAGE_SQL, TenantRateLimiter, TenantRateLimitMiddleware, UsageFlusher, current_period
+)
+from benchmarks.common import print_report, quiet_sql_logging, summarize
+
+TENANT_PREFIX = "bench_rl_"
+
+
+async def empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def bench_middleware(app, requests: int, tenants: int):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scopes = [
+        {"type": "http", "method": "GET", "path": "/api/v1/users", "query_string": b"",
+         "headers": [(b"host", b"api"), (b"x-tenant_id", f"{TENANT_PREFIX}{i}".encode())]}
+        for i in range(tenants)
+    ]
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        start = time.perf_counter()
+        await app(scopes[i % tenants], receive, send)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def bench_flush_rows(limiter: TenantRateLimiter):
+    usage = limiter.drain_usage()
+    started = time.perf_counter()
+    async with async_engine.begin() as conn:
+        for (tenant_id, period), (request_count, throttled_count) in usage.items():
+            await conn.execute(UPSERT_USAGE_SQL, {
+                "tenant_ids": [tenant_id], "periods": [period],
+                "request_counts": [request_count], "throttled_counts": [throttled_count],
+            })
+    return {"rows": len(usage), "elapsed_s": round(time.perf_counter() - started, 3)}
+
+
+async def bench_flush_batch(limiter: TenantRateLimiter):
+    started = time.perf_counter()
+    rows = await UsageFlusher(limiter).flush()
+    return {"rows": rows, "elapsed_s": round(time.perf_counter() - started, 3)}
+
+
+def fill_usage(limiter: TenantRateLimiter, tenants: int) -> None:
+    for i in range(tenants):
+        limiter.hit(f"{TENANT_PREFIX}{i}", "enterprise")
+
+
+async def cleanup() -> None:
+    async with async_engine.begin() as conn:
+        await conn.execute(text("DELETE FROM public.tenant_api_usage WHERE tenant_id LIKE :prefix"),
+                           {"prefix": f"{TENANT_PREFIX}%"})
+
+
+async def main_async(args) -> None:
+    limiter = TenantRateLimiter(plan_refresh_interval=float("inf"))
+    # 预热令牌桶套餐，中间件不再查询租户
+    fill_usage(limiter, args.tenants)
+    limiter.drain_usage()
+    middleware = TenantRateLimitMiddleware(empty_app, limiter=limiter)
+
+    print_report("middleware off", await bench_middleware(empty_app, args.requests, args.tenants))
+    print_report("middleware on", await bench_middleware(middleware, args.requests, args.tenants))
+    limiter.drain_usage()
+
+    await cleanup()
+    try:
+        fill_usage(limiter, args.tenants)
+        print_report(f"flush row-by-row x{args.tenants}", await bench_flush_rows(limiter))
+        fill_usage(limiter, args.tenants)
+        print_report(f"flush batched x{args.tenants}", await bench_flush_batch(limiter))
+
+        async with async_engine.connect() as conn:
+            total = await conn.scalar(
+                text("SELECT sum(request_count) FROM public.tenant_api_usage "
+                     "WHERE tenant_id LIKE :prefix AND period = :period"),
+                {"prefix": f"{TENANT_PREFIX}%", "period": current_period()},
+            )
+        print(f"   {'persisted_requests':<24}{total}")
+    finally:
+        await cleanup()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户API限流压测")
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--tenants", type=int, default=5000)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+租户schema存在性检查与列表的耗时（information_schema / pg_namespace / 进程内集合）
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_schema_exists --schemas 50000 --lookups 1000
+
+- exists: SchemaManager.schema_exists 的三种实现，按存在 / 不存在的名称分别统计p50/p99：
+  information_schema.schemata（改造前）、pg_namespace 点查、集合命中（不存在的名称仍回查 pg_namespace）
+- list:   列出全部租户schema，information_schema / pg_namespace / 集合
+- notify: 另一连接 CREATE / DROP SCHEMA 提交后，监听任务把变更应用到集合的延迟（需要事件触发器）
+
+压测前批量创建空schema（tenant_bench_sx_ 前缀），压测结束后删除。
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Callable, List
+
+from sqlalchemy import text
+
+from app.core.pq_db import SessionLocal, async_engine, engine
+from app.core.schema_cache import TenantSchemaCache, TenantSchemaCacheListener
+from app.core import schema_manager as schema_manager_module
+from app.core.schema_manager import SchemaManager
+from benchmarks.common import percentile, print_report, quiet_sql_logging
+
+# 压测schema名称为 tenant_ + BENCH_TENANT_ID_PREFIX + 序号
+BENCH_TENANT_ID_PREFIX = "bench_sx_"
+BENCH_SCHEMA_PATTERN = r"tenant\_bench\_sx\_%"
+
+INFORMATION_SCHEMA_EXISTS_SQL = text(
+    "SELECT schema_name FROM information_schema.schemata WHERE schema_name = :schema_name")
+INFORMATION_SCHEMA_LIST_SQL = text(
+    "SELECT schema_name FROM information_schema.schemata WHERE schema_name LIKE 'tenant_%'")
+
+
+def create_schemas(count: int, batch: int) -> None:
+    """分批创建空schema（每批一个事务，避免锁表项耗尽）"""
+    for start in range(1, count + 1, batch):
+        end = min(count, start + batch - 1)
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+            DO $$
+            BEGIN
+                FOR i IN {start}..{end} LOOP
+                    EXECUTE format('CREATE SCHEMA IF NOT EXISTS %I', 'tenant_{BENCH_TENANT_ID_PREFIX}' || i);
+                END LOOP;
+            END $$
+            """))
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE pg_catalog.pg_namespace"))
+
+
+def cleanup(batch: int = 1000) -> None:
+    """删除压测schema"""
+    while True:
+        with engine.begin() as conn:
+            names = conn.execute(
+                text("SELECT nspname FROM pg_namespace WHERE nspname LIKE :pattern LIMIT :batch"),
+                {"pattern": BENCH_SCHEMA_PATTERN, "batch": batch}
+            ).scalars().all()
+            if not names:
+                break
+            conn.execute(text("DROP SCHEMA " + ", ".join(f'"{name}"' for name in names) + " CASCADE"))
+
+
+def time_calls(call: Callable[[int], object], iterations: int) -> dict:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        start = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "calls": iterations,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 1),
+        "max_us": round(latencies[-1] * 1e6, 1),
+    }
+
+
+def bench_exists(manager: SchemaManager, count: int, lookups: int) -> dict:
+    present = [f"{BENCH_TENANT_ID_PREFIX}{random.randint(1, count)}" for _ in range(lookups)]
+    missing = [f"{BENCH_TENANT_ID_PREFIX}missing_{i}" for i in range(lookups)]
+    db = manager.db_session
+
+    def information_schema(tenant_ids):
+        return lambda i: db.execute(INFORMATION_SCHEMA_EXISTS_SQL, {"schema_name": f"tenant_{tenant_ids[i]}"}).first()
+
+    cache = schema_manager_module.tenant_schema_cache
+    results = {}
+    for label, tenant_ids in (("present", present), ("missing", missing)):
+        results[f"information_schema/{label}"] = time_calls(information_schema(tenant_ids), lookups)
+        cache.mark_stale()
+        results[f"pg_namespace/{label}"] = time_calls(lambda i: manager.schema_exists(tenant_ids[i]), lookups)
+        cache.replace(cache.names())
+        results[f"cache/{label}"] = time_calls(lambda i: manager.schema_exists(tenant_ids[i]), lookups)
+    for i in range(lookups):
+        assert manager.schema_exists(present[i]) and not manager.schema_exists(missing[i])
+    return results
+
+
+def bench_list(manager: SchemaManager, iterations: int) -> dict:
+    db = manager.db_session
+    cache = schema_manager_module.tenant_schema_cache
+    results = {
+        "information_schema": time_calls(lambda i: db.execute(INFORMATION_SCHEMA_LIST_SQL).fetchall(), iterations)}
+    cache.mark_stale()
+    results["pg_namespace"] = time_calls(lambda i: manager.list_tenant_schemas(), iterations)
+    cache.replace(cache.names())
+    results["cache"] = time_calls(lambda i: manager.list_tenant_schemas(), iterations)
+    return results
+
+
+async def bench_notify(cache: TenantSchemaCache, iterations: int) -> dict:
+    """从发出COMMIT到集合完成更新的延迟"""
+    latencies = {"add": [], "drop": []}
+    for i in range(iterations):
+        schema_name = f"tenant_{BENCH_TENANT_ID_PREFIX}notify_{i}"
+        for op, statement in (("add", f'CREATE SCHEMA "{schema_name}"'), ("drop", f'DROP SCHEMA "{schema_name}"')):
+            async with async_engine.connect() as conn:
+                await conn.execute(text(statement))
+                start = time.perf_counter()
+                await conn.commit()
+            while (schema_name in cache) != (op == "add"):
+                if time.perf_counter() - start > 5:
+                    raise RuntimeError(f"5秒内未收到 {op} {schema_name} 的通知（事件触发器是否已创建？）")
+                await asyncio.sleep(0.0002)
+            latencies[op].append(time.perf_counter() - start)
+    report = {}
+    for op, values in latencies.items():
+        values.sort()
+        report[f"{op}_p50_ms"] = round(percentile(values, 50) * 1000, 2)
+        report[f"{op}_p99_ms"] = round(percentile(values, 99) * 1000, 2)
+    return report
+
+
+async def run(count: int, lookups: int, list_iterations: int, notify_iterations: int) -> None:
+    cache = TenantSchemaCache()
+    listener = TenantSchemaCacheListener(cache, resync_interval=3600)
+    schema_manager_module.tenant_schema_cache = cache
+    listener.start()
+    try:
+        while not cache.live:
+            await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        async with async_engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await listener._resync(raw.driver_connection)
+        print_report("full load", {"schemas": len(cache), "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+        with SessionLocal() as db:
+            manager = SchemaManager(db)
+            for name, stats in bench_exists(manager, count, lookups).items():
+                print_report(f"exists {name}", stats)
+            for name, stats in bench_list(manager, list_iterations).items():
+                print_report(f"list {name}", stats)
+        print_report("notify", await bench_notify(cache, notify_iterations))
+    finally:
+        await listener.stop()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户schema存在性检查压测")
+    parser.add_argument("--schemas", type=int, default=50000, help="压测schema数量")
+    parser.add_argument("--batch", type=int, default=1000, help="每个事务创建的schema数量")
+    parser.add_argument("--lookups", type=int, default=1000, help="每种实现的存在性检查次数")
+    parser.add_argument("--list-iterations", type=int, default=20)
+    parser.add_argument("--notify-iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        start = time.perf_counter()
+        create_schemas(args.schemas, args.batch)
+        print(f"已创建 {args.schemas} 个schema，耗时 {time.perf_counter() - start:.1f}s")
+        asyncio.run(run(args.schemas, args.lookups, args.list_iterations, args.notify_iterations))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
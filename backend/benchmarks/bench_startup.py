@@ -0,0 +1,135 @@
+"""
+应用启动（模块导入）耗时
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_startup --runs 10 --top 15
+    python -m benchmarks.bench_startup --max-import-ms 800    # app.main 导入耗时超过阈值时退出码为1
+
+每个场景在新的解释器进程中以 python -X importtime 执行，统计执行代码后新导入模块的累计耗时，
+各场景轮流执行 --runs 次，取中位数（import_min_ms 为最小值，受机器负载影响较小）：
+- app:          import app.main（默认配置，settings.LAZY_ROUTERS 中的路由延迟加载）
+- app_eager:    启动时加载全部路由
+- models:       import app.models（alembic、运维命令等只需要模型的场景）
+- process_ms 为子进程总耗时（含解释器启动），modules 为新导入的模块数
+
+--top 按顶层包汇总 app 场景的自身导入耗时（app 内按二级包），列出耗时最多的包。
+bench_suite 会调用 measure_startup 把结果写入套件结果并与基线对比。
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from benchmarks.common import print_report
+
+# 写到stderr的标记：之前的是解释器启动时的导入，之后的才是场景代码的导入
+MARKER = "--bench-startup--"
+
+SCENARIOS = {
+    "app": "import app.main",
+    "app_eager": "from app.config import settings; settings.LAZY_ROUTERS = (); import app.main",
+    "models": "import app.models",
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    解析 -X importtime 输出中标记之后的记录
+
+    Returns:
+        [(模块名, 嵌套深度, 自身耗时us, 累计耗时us)]
+    """
+    records = []
+    started = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # 表头
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return records
+
+
+def run_scenario(code: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """在新进程中执行一次场景，返回 (进程耗时ms, 导入记录)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; print({MARKER!r}, file=sys.stderr); {code}"],
+        capture_output=True, text=True, check=True,
+    )
+    return (time.perf_counter() - start) * 1000, parse_importtime(result.stderr)
+
+
+def package_of(module: str) -> str:
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" else parts[0]
+
+
+def measure_startup(runs: int = 5, scenarios: Dict[str, str] = SCENARIOS) -> Dict[str, Dict[str, float]]:
+    """
+    各场景的导入耗时（中位数）
+
+    Args:
+        runs: 每个场景执行的次数
+        scenarios: 场景名 -> 执行的代码
+
+    Returns:
+        场景名 -> {import_ms, import_min_ms, process_ms, modules}
+    """
+    samples = {name: {"import_ms": [], "process_ms": [], "modules": []} for name in scenarios}
+    # 各场景轮流执行，机器负载的波动均摊到每个场景
+    for _ in range(runs):
+        for name, code in scenarios.items():
+            elapsed, records = run_scenario(code)
+            samples[name]["process_ms"].append(elapsed)
+            samples[name]["import_ms"].append(
+                sum(cumulative for _, depth, _, cumulative in records if depth == 0) / 1000)
+            samples[name]["modules"].append(len(records))
+    return {
+        name: {
+            "import_ms": round(statistics.median(values["import_ms"]), 1),
+            "import_min_ms": round(min(values["import_ms"]), 1),
+            "process_ms": round(statistics.median(values["process_ms"]), 1),
+            "modules": int(statistics.median(values["modules"])),
+        }
+        for name, values in samples.items()
+    }
+
+
+def top_packages(code: str, runs: int, top: int) -> Dict[str, float]:
+    """按包汇总自身导入耗时（各次运行取平均），返回耗时最多的 top 个包（ms）"""
+    totals: Counter = Counter()
+    for _ in range(runs):
+        for module, _, self_us, _ in run_scenario(code)[1]:
+            totals[package_of(module)] += self_us
+    return {package: round(us / runs / 1000, 1) for package, us in totals.most_common(top)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="应用启动导入耗时")
+    parser.add_argument("--runs", type=int, default=10, help="每个场景执行次数，取中位数")
+    parser.add_argument("--top", type=int, default=0, help="列出 app 场景自身导入耗时最多的N个包")
+    parser.add_argument("--max-import-ms", type=float, default=0,
+                        help="app 场景导入耗时超过该值时以退出码1结束（0表示不检查）")
+    args = parser.parse_args()
+
+    results = measure_startup(args.runs)
+    for name, report in results.items():
+        print_report(name, report)
+    if args.top:
+        print_report(f"app top {args.top} packages (self ms)", top_packages(SCENARIOS["app"], args.runs, args.top))
+    if args.max_import_ms and results["app"]["import_ms"] > args.max_import_ms:
+        print(f"\n❌ 启动回退: app import_ms {results['app']['import_ms']} > {args.max_import_ms:g}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+租户API基准测试套件：启动服务、写入租户目录、按固定并发驱动各类请求并与基线对比
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_suite --tenants 10000 --schemas 10000 --concurrency 32
+    python -m benchmarks.bench_suite --save-baseline          # 把本次结果保存为基线
+    python -m benchmarks.bench_suite --keep                   # 保留租户目录，下次运行直接复用
+
+- 目录：写入 --tenants 个压测租户记录，并基于模板为前 --schemas 个开通schema；
+  已有相同规模的压测目录时复用（只补开缺少的schema）
+- 服务：在独立进程中用uvicorn启动 app.main:app（关闭SQL回显），经本机TCP访问；
+  压测端使用基于asyncio streams的HTTP/1.1长连接客户端（每个并发一条连接），
+  单次请求的客户端开销约为httpx的十分之一，避免与服务端争抢CPU时压测端先成为瓶颈
+- 服务就绪后等待 --settle 秒，让启动时的后台任务（统计校正、存储统计等）完成首轮，再开始负载
+- 负载（按 --seed 生成固定的请求序列，每类先预热 --warmup 次）：
+  - get:      GET /api/v1/tenants/{tenant_id}
+  - list:     GET /api/v1/tenants/ 页码分页，轮换状态、套餐过滤
+  - search:   GET /api/v1/tenants/?search=...&total=none
+  - register: POST /api/v1/tenants/register（含密码哈希和schema开通）
+- 启动：压测前按 benchmarks.bench_startup 在新进程中测量导入 app.main 等的耗时（--startup-runs 次，
+  与基线对比最小值 import_min_ms，受机器负载影响较小）
+- 结果（吞吐与p50/p95/p99等、启动导入耗时，以及git提交、数据库版本、参数）写入 --output JSON；
+  指定的基线文件存在时逐项对比，吞吐下降或延迟、导入耗时上升超过容差记为回退，进程以状态码1退出
+
+基线与机器相关，应在同一台机器上用相同参数生成（--save-baseline）。
+压测结束后删除注册产生的租户；未指定 --keep 时同时删除压测目录。
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import httpx
+from sqlalchemy import text
+
+from app.core.pq_db import SessionLocal, engine
+from app.core.tenant_template import TenantTemplateManager
+from benchmarks.bench_startup import measure_startup
+from benchmarks.bench_tenant_storage import bench_schemas, cleanup as cleanup_catalog
+from benchmarks.common import print_report, quiet_sql_logging, run_concurrent, seed_tenants
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+# 注册负载使用的域名后缀，清理时按此删除
+REGISTER_DOMAIN_SUFFIX = ".bench-suite.example"
+
+SEARCH_TERMS = ["Globex", "Tyrell Wonka", "hooli42", "Stark科技", "7345", "Umbrella Pied", "zzqxj"]
+LIST_FILTERS = [{}, {"status": "active"}, {"plan_type": "pro"}, {"status": "active", "plan_type": "enterprise"}]
+
+WORKLOADS = ("get", "list", "search", "register")
+
+# 比较的指标：(名称, 越大越好)
+COMPARED_METRICS = (("throughput_rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+STARTUP_METRICS = (("import_min_ms", False),)
+
+
+def seed_catalog(tenants: int, schemas: int, workers: int) -> Dict[str, float]:
+    """
+    准备压测租户目录（规模相同时复用）
+
+    Returns:
+        写入耗时统计
+    """
+    start = time.perf_counter()
+    existing = bench_schemas()
+    if len(existing) != tenants:
+        cleanup_catalog()
+        seed_tenants(tenants)
+        existing = bench_schemas()
+    seeded_at = time.perf_counter()
+
+    with engine.connect() as conn:
+        present = set(conn.execute(text("SELECT nspname FROM pg_namespace")).scalars())
+    missing = [schema_name for _, schema_name in existing[:schemas] if schema_name not in present]
+
+    def provision(schema_name: str) -> None:
+        with SessionLocal() as db:
+            TenantTemplateManager(db).clone_into(schema_name)
+            db.commit()
+
+    if missing:
+        with SessionLocal() as db:
+            TenantTemplateManager(db).ensure_template()
+            db.commit()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(provision, missing))
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("VACUUM ANALYZE public.tenants"))
+        conn.execute(text("CHECKPOINT"))
+    return {
+        "tenants": len(existing),
+        "schemas": min(schemas, len(existing)),
+        "provisioned": len(missing),
+        "seed_s": round(seeded_at - start, 2),
+        "provision_s": round(time.perf_counter() - seeded_at, 2),
+    }
+
+
+def cleanup_registered() -> int:
+    """删除注册负载产生的租户及其schema"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT tenant_id, schema_name FROM public.tenants WHERE domain LIKE :pattern"),
+                            {"pattern": "%" + REGISTER_DOMAIN_SUFFIX}).all()
+    for _, schema_name in rows:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+    tenant_ids = [tenant_id for tenant_id, _ in rows]
+    with engine.begin() as conn:
+        for table in ("tenant_api_usage", "tenant_storage_usage", "tenant_stats", "tenants"):
+            conn.execute(text(f"DELETE FROM public.{table} WHERE tenant_id = ANY(CAST(:ids AS varchar[]))"),
+                         {"ids": tenant_ids})
+    return len(rows)
+
+
+def serve(port: int) -> None:
+    """子进程入口：关闭SQL回显后启动服务"""
+    import uvicorn
+
+    quiet_sql_logging()
+    uvicorn.run("app.main:app", host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(base_url: str, process, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if not process.is_alive():
+                raise RuntimeError("服务进程启动失败")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"服务在 {timeout} 秒内未就绪")
+
+
+class KeepAliveConnection:
+    """极简HTTP/1.1长连接客户端（只处理本套件的请求与响应）"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None,
+                      body: Optional[dict] = None) -> int:
+        """
+        发送请求并读完响应体
+
+        复用的连接可能已被服务端按空闲超时关闭，未收到任何响应时在新连接上重试一次。
+
+        Returns:
+            HTTP状态码
+        """
+        target = f"{path}?{urlencode(params)}" if params else path
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Length: {len(payload)}\r\n"
+        if payload:
+            head += "Content-Type: application/json\r\n"
+        message = head.encode() + b"\r\n" + payload
+
+        reused = self._writer is not None
+        if not reused:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            self._writer.write(message)
+            status_line = await self._reader.readuntil(b"\r\n")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self.close()
+            if not reused or (isinstance(e, asyncio.IncompleteReadError) and e.partial):
+                raise
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self._writer.write(message)
+            status_line = await self._reader.readuntil(b"\r\n")
+        try:
+            headers = {}
+            while True:
+                line = await self._reader.readuntil(b"\r\n")
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if "content-length" in headers:
+                await self._reader.readexactly(int(headers["content-length"]))
+            elif headers.get("transfer-encoding") == "chunked":
+                while True:
+                    size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                    await self._reader.readexactly(size + 2)
+                    if size == 0:
+                        break
+            if headers.get("connection") == "close":
+                self.close()
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            self.close()
+            raise
+        return int(status_line.split()[1])
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def build_requests(workload: str, count: int, tenant_ids: List[str], rng: random.Random,
+                   run_id: str) -> List[Tuple[str, str, Optional[dict], Optional[dict]]]:
+    """生成固定的请求序列：(方法, 路径, 查询参数, 请求体)"""
+    requests = []
+    for i in range(count):
+        if workload == "get":
+            requests.append(("GET", f"/api/v1/tenants/{rng.choice(tenant_ids)}", None, None))
+        elif workload == "list":
+            params = {"page": rng.randint(1, 50), "size": 20, **LIST_FILTERS[i % len(LIST_FILTERS)]}
+            requests.append(("GET", "/api/v1/tenants/", params, None))
+        elif workload == "search":
+            requests.append(("GET", "/api/v1/tenants/",
+                             {"search": rng.choice(SEARCH_TERMS), "size": 20, "total": "none"}, None))
+        else:
+            name = f"suite{run_id}{i}"
+            requests.append(("POST", "/api/v1/tenants/register", None, {
+                "name": f"基准测试租户 {name}",
+                "domain": f"{name}{REGISTER_DOMAIN_SUFFIX}",
+                "plan_type": rng.choice(["basic", "basic", "pro", "enterprise"]),
+                "admin_user": {
+                    "full_name": "基准测试管理员",
+                    "email": f"admin@{name}{REGISTER_DOMAIN_SUFFIX}",
+                    "password": "BenchPass123!",
+                },
+            }))
+    return requests
+
+
+async def drive(connections: asyncio.Queue, requests: list, concurrency: int) -> Dict[str, float]:
+    """以固定并发执行请求序列，返回 summarize() 的统计结果及各状态码（或异常类型）的次数"""
+    statuses: Dict[str, int] = {}
+
+    async def call(i: int) -> bool:
+        method, path, params, body = requests[i]
+        connection = await connections.get()
+        try:
+            status = await connection.request(method, path, params, body)
+            key = str(status)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            status, key = None, type(e).__name__
+        finally:
+            connections.put_nowait(connection)
+        statuses[key] = statuses.get(key, 0) + 1
+        return status is not None and status < 400
+
+    stats = await run_concurrent(call, len(requests), concurrency)
+    stats["statuses"] = dict(sorted(statuses.items()))
+    return stats
+
+
+async def run_workloads(args, port: int, tenant_ids: List[str]) -> Dict[str, dict]:
+    rng = random.Random(args.seed)
+    run_id = datetime.now(timezone.utc).strftime("%H%M%S")
+    connections: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.concurrency):
+        connections.put_nowait(KeepAliveConnection("localhost", port))
+    results = {}
+    try:
+        for workload in args.workloads:
+            count = args.register_requests if workload == "register" else args.requests
+            warmup = min(args.warmup, count)
+            sequence = build_requests(workload, warmup + count, tenant_ids, rng, run_id)
+            await drive(connections, sequence[:warmup], args.concurrency)
+            results[workload] = await drive(connections, sequence[warmup:], args.concurrency)
+            print_report(workload, results[workload])
+    finally:
+        while not connections.empty():
+            connections.get_nowait().close()
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """记录影响结果可比性的环境信息"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCHMARKS_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    with engine.connect() as conn:
+        server_version = conn.execute(text("SHOW server_version")).scalar()
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count()),
+        "postgres": server_version,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float, p99_tolerance: float) -> List[str]:
+    """
+    与基线逐项对比并打印
+
+    Returns:
+        回退项说明列表
+    """
+    if baseline.get("params") != result["params"]:
+        print(f"⚠️  基线参数与本次不同，对比仅供参考: {baseline.get('params')}")
+    regressions = []
+    print(f"\n{'workload':<10}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for section, metrics in (("startup", STARTUP_METRICS), ("workloads", COMPARED_METRICS)):
+        for workload, stats in result.get(section, {}).items():
+            base_stats = baseline.get(section, {}).get(workload)
+            if not base_stats:
+                continue
+            for metric, higher_is_better in metrics:
+                before, after = base_stats.get(metric), stats.get(metric)
+                if not before or after is None:
+                    continue
+                change = after / before - 1
+                allowed = p99_tolerance if metric == "p99_ms" else tolerance
+                regressed = -change > allowed if higher_is_better else change > allowed
+                flag = "  ❌" if regressed else ""
+                print(f"{workload:<10}{metric:<16}{before:>12}{after:>12}{change:>+10.1%}{flag}")
+                if regressed:
+                    regressions.append(f"{section}.{workload}.{metric}: {before} -> {after} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户API基准测试套件")
+    parser.add_argument("--tenants", type=int, default=10000, help="压测目录中的租户数")
+    parser.add_argument("--schemas", type=int, default=1000, help="为前N个压测租户开通schema")
+    parser.add_argument("--provision-workers", type=int, default=8)
+    parser.add_argument("--workloads", type=lambda value: value.split(","), default=list(WORKLOADS),
+                        help=f"逗号分隔，可选 {','.join(WORKLOADS)}")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="get/list/search 每类请求数")
+    parser.add_argument("--register-requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--settle", type=float, default=10.0, help="服务就绪后开始负载前的等待秒数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--startup-runs", type=int, default=5, help="启动导入耗时的测量次数（0表示不测量）")
+    parser.add_argument("--output", help="结果JSON路径，默认 benchmarks/results/suite-<时间>.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写入 --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="吞吐、p50、p95允许的变化比例")
+    parser.add_argument("--p99-tolerance", type=float, default=0.25)
+    parser.add_argument("--keep", action="store_true", help="结束后保留压测目录")
+    args = parser.parse_args()
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"未知负载: {','.join(sorted(unknown))}")
+
+    # 先于写入目录和启动服务测量，避免与其争抢CPU
+    startup = measure_startup(args.startup_runs) if args.startup_runs else {}
+    for name, report in startup.items():
+        print_report(f"startup {name}", report)
+
+    quiet_sql_logging()
+    catalog = seed_catalog(args.tenants, args.schemas, args.provision_workers)
+    print_report("catalog", catalog)
+    engine.dispose()
+
+    port = free_port()
+    base_url = f"http://localhost:{port}"
+    # 非daemon进程：服务内的密码哈希进程池需要创建子进程
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(port,))
+    server.start()
+    try:
+        asyncio.run(wait_until_ready(base_url, server))
+        time.sleep(args.settle)
+        tenant_ids = [tenant_id for tenant_id, _ in bench_schemas()[:args.schemas]]
+        workloads = asyncio.run(run_workloads(args, port, tenant_ids))
+    finally:
+        server.terminate()
+        server.join(10)
+        cleanup_registered()
+        if not args.keep:
+            cleanup_catalog()
+
+    params = {key: getattr(args, key) for key in
+              ("tenants", "schemas", "workloads", "concurrency", "requests", "register_requests", "warmup", "seed",
+               "startup_runs")}
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": params,
+        "catalog": catalog,
+        "startup": startup,
+        "workloads": workloads,
+    }
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"suite-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"基线已写入 {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线 {args.baseline}，跳过对比（可用 --save-baseline 生成）")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(result, json.load(f), args.tolerance, args.p99_tolerance)
+    if regressions:
+        print("\n❌ 性能回退:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\n✅ 未发现超出容差的性能回退")
+
+
+if __name__ == "__main__":
+    main()
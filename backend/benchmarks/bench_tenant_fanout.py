@@ -0,0 +1,96 @@
+"""
+跨租户查询压测：逐个schema串行查询 vs TenantFanOut 并发查询
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_fanout --tenants 1000 --concurrency 16
+
+- 写入 --tenants 个压测租户并基于模板开通schema，部分租户写入一批用户（同存储统计压测）
+- serial: SchemaManager.list_tenant_schemas 列出schema后，在一个会话中逐个执行查询（改造前的写法）
+- fanout: TenantFanOut.run(merge=merge_sum)，并发数1和 --concurrency
+- cpu 为普通统计查询；io 在每个schema额外等待5ms，模拟非CPU等待（数据库与应用同机单核时并发只对这类查询有效）
+- 另外让少量schema超时，验证单个schema失败不影响整体结果
+
+压测结束后删除租户记录和schema。
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.pq_db import SessionLocal
+from app.core.schema_manager import SchemaManager
+from app.core.tenant_fanout import TenantFanOut, merge_sum
+from benchmarks.bench_tenant_storage import bench_schemas, cleanup, setup
+from benchmarks.common import print_report, quiet_sql_logging
+
+QUERY = (
+    "SELECT count(*) FILTER (WHERE status = 'active') AS active_users, count(*) AS users, "
+    "count(*) FILTER (WHERE last_login_at >= date_trunc('day', now())) AS logged_in_today "
+    "FROM {schema}.users"
+)
+# 每个schema额外等待5ms，模拟冷数据读盘或跨机房往返等非CPU等待
+IO_QUERY = QUERY.replace("FROM {schema}.users", ", min(s.slept) AS slept FROM {schema}.users, "
+                         "(SELECT pg_sleep(0.005)::text AS slept) s")
+
+
+def run_serial(schemas: set, query: str) -> dict:
+    start = time.perf_counter()
+    totals = {}
+    with SessionLocal() as db:
+        for schema_name in SchemaManager(db).list_tenant_schemas():
+            if schema_name not in schemas:
+                continue
+            row = db.execute(text(query.replace("{schema}", schema_name))).mappings().one()
+            for column, value in row.items():
+                if isinstance(value, int):
+                    totals[column] = totals.get(column, 0) + value
+    return {"elapsed_s": round(time.perf_counter() - start, 3), **totals}
+
+
+async def run_fanout(schemas: list, concurrency: int, query: str) -> dict:
+    fanout = TenantFanOut(concurrency=concurrency)
+    try:
+        result = await fanout.run(query, schemas=schemas, merge=merge_sum)
+    finally:
+        await fanout.dispose()
+    report = {key: result[key] for key in ("elapsed_s", "ok", "failed", "timed_out")}
+    report.update(result["merged"])
+    return report
+
+
+async def run_partial(schemas: list, concurrency: int) -> dict:
+    """前5个schema睡眠超过语句超时，其余正常返回"""
+    fanout = TenantFanOut(concurrency=concurrency, statement_timeout_ms=200)
+    slow_query = "SELECT pg_sleep(CASE WHEN '{schema}' = ANY(CAST(:slow AS text[])) THEN 1 ELSE 0 END), 1 AS one"
+    try:
+        result = await fanout.run(slow_query, {"slow": schemas[:5]}, schemas=schemas, merge=merge_sum)
+    finally:
+        await fanout.dispose()
+    return {key: result[key] for key in ("elapsed_s", "ok", "failed", "timed_out")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨租户查询压测")
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--users-every", type=int, default=10, help="每隔多少个租户写入一批用户")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        setup(args.tenants, args.users_every)
+        schemas = [schema_name for _, schema_name in bench_schemas()]
+        for name, query in (("cpu", QUERY), ("io", IO_QUERY)):
+            print_report(f"{name} serial x{len(schemas)}", run_serial(set(schemas), query))
+            for concurrency in sorted({1, args.concurrency}):
+                print_report(f"{name} fanout x{len(schemas)} (concurrency={concurrency})",
+                             asyncio.run(run_fanout(schemas, concurrency, query)))
+        print_report("partial (5 schemas time out)", asyncio.run(run_partial(schemas, args.concurrency)))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+同步 vs 异步数据库栈对比压测：并发 GET /api/v1/tenants/{tenant_id}
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_get --concurrency 200 --requests 400
+
+- sync:  改造前的写法，async路由里直接使用同步Session，每次查询都会阻塞事件循环
+- async: 当前 app.main:app，路由使用 AsyncSession
+
+两组都通过 httpx.ASGITransport 在同一个事件循环内驱动，
+因此同步查询造成的阻塞会直接体现在并发延迟上。
+"""
+import argparse
+import asyncio
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.core.pq_db import SessionLocal
+from app.main import app as async_app
+from app.models.tenant import Tenant
+from app.services.tenant import TenantService
+from benchmarks.common import print_report, quiet_sql_logging, run_concurrent
+
+# 同步对照组的连接池等待超时（秒）：事件循环被阻塞时，
+# 归还连接的清理逻辑无法被调度，请求只能等到超时失败
+POOL_TIMEOUT = 1
+
+
+def build_sync_app() -> FastAPI:
+    """构造使用同步Session的对照应用（连接池配置与异步engine一致）"""
+    sync_engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    sync_session = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+    def get_sync_db():
+        db = sync_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    sync_app = FastAPI()
+
+    @sync_app.get("/api/v1/tenants/{tenant_id}")
+    async def get_tenant(tenant_id: str, db: Session = Depends(get_sync_db)):
+        tenant_service = TenantService(db)
+        tenant = tenant_service.get_tenant(tenant_id)
+        if not tenant:
+            raise HTTPException(status_code=404)
+        return {"code": 200, "message": "获取成功", "data": tenant_service._format_tenant_response(tenant)}
+
+    return sync_app
+
+
+def pick_tenant_id() -> str:
+    """取一个已存在的租户ID"""
+    db = SessionLocal()
+    try:
+        tenant = db.query(Tenant).order_by(Tenant.id).first()
+        if not tenant:
+            raise SystemExit("❌ 数据库中没有租户，请先注册一个租户或使用 --tenant-id 指定")
+        return tenant.tenant_id
+    finally:
+        db.close()
+
+
+async def drive(app, tenant_id: str, total: int, concurrency: int):
+    """对指定应用发起并发请求"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(_):
+            try:
+                response = await client.get(f"/api/v1/tenants/{tenant_id}")
+            except Exception:
+                return False
+            return response.status_code == 200
+
+        # 预热连接池
+        await call(0)
+        return await run_concurrent(call, total, concurrency)
+
+
+async def main(args):
+    quiet_sql_logging()
+    tenant_id = args.tenant_id or pick_tenant_id()
+    print(f"🚀 目标租户: {tenant_id}，并发 {args.concurrency}，总请求 {args.requests}\n")
+
+    sync_stats = await drive(build_sync_app(), tenant_id, args.requests, args.concurrency)
+    print_report("sync (Session)", sync_stats)
+    async_stats = await drive(async_app, tenant_id, args.requests, args.concurrency)
+    print_report("async (AsyncSession)", async_stats)
+
+    if sync_stats["throughput_rps"]:
+        ratio = async_stats["throughput_rps"] / sync_stats["throughput_rps"]
+        print(f"\n⚡ 吞吐量提升: {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenant-id", help="压测使用的租户ID（默认取第一个租户）")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=400)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+租户批量注册压测：逐个调用注册接口 vs 批量导入接口
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_import --tenants 500 --concurrency 8
+
+- register: 以 --concurrency 并发逐个调用 POST /api/v1/tenants/register
+- bulk:     一次调用 POST /api/v1/tenants/bulk-register 流式提交NDJSON
+
+通过 httpx ASGITransport 在进程内调用应用。默认用低代价pbkdf2哈希，
+避免密码哈希耗时掩盖数据库路径的差异（--real-hash 使用当前配置）。
+压测结束后删除产生的租户记录和schema。
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.pq_db import engine
+from benchmarks.common import print_report, quiet_sql_logging, run_concurrent
+
+NAME_PREFIX = "BenchImport"
+
+
+def tenant_payload(mode: str, i: int) -> dict:
+    return {
+        "name": f"{NAME_PREFIX} {mode} {i}",
+        "domain": f"{mode}{i}.bench-import.example.com",
+        "admin_user": {"full_name": "Bench Admin", "email": f"admin{i}@bench-import.com", "password": "Passw0rdX"},
+    }
+
+
+def cleanup() -> None:
+    """删除压测租户；每个schema单独提交，避免单个事务持有过多锁"""
+    with engine.connect() as conn:
+        schemas = conn.execute(
+            text("SELECT schema_name FROM public.tenants WHERE name LIKE :prefix"), {"prefix": f"{NAME_PREFIX}%"}
+        ).scalars().all()
+    for schema_name in schemas:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM public.tenants WHERE name LIKE :prefix"), {"prefix": f"{NAME_PREFIX}%"})
+
+
+async def bench_register(client: httpx.AsyncClient, tenants: int, concurrency: int):
+    async def call(i: int) -> bool:
+        response = await client.post("/api/v1/tenants/register", json=tenant_payload("register", i))
+        return response.status_code == 201
+
+    return await run_concurrent(call, tenants, concurrency)
+
+
+async def bench_bulk(client: httpx.AsyncClient, tenants: int):
+    async def body():
+        for i in range(tenants):
+            yield (json.dumps(tenant_payload("bulk", i)) + "\n").encode("utf-8")
+
+    started = time.perf_counter()
+    summary = {}
+    async with client.stream("POST", "/api/v1/tenants/bulk-register", content=body(),
+                             headers={"content-type": "application/x-ndjson"}) as response:
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            result = json.loads(line)
+            if "summary" in result:
+                summary = result["summary"]
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": summary.get("total", 0),
+        "errors": summary.get("failed", 0),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(summary.get("created", 0) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def main_async(args) -> None:
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        await client.post("/api/v1/tenants/register", json=tenant_payload("warmup", 0))
+        print_report(f"register x{args.tenants} (concurrency={args.concurrency})",
+                     await bench_register(client, args.tenants, args.concurrency))
+        print_report(f"bulk-register x{args.tenants}", await bench_bulk(client, args.tenants))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户批量注册压测")
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--real-hash", action="store_true", help="使用当前配置的密码哈希参数")
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    if not args.real_hash:
+        settings.PASSWORD_HASH_ALGORITHM = "pbkdf2"
+        settings.PASSWORD_HASH_PBKDF2_ITERATIONS = 1000
+
+    cleanup()
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        password_hasher.shutdown()
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
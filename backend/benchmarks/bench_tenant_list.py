@@ -0,0 +1,80 @@
+"""
+租户列表分页压测：OFFSET页码分页 vs 游标分页，以及三种总数模式
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_list --rows 200000 --size 20 --repeat 20
+
+在public.tenants中写入rows条压测记录，分别在不同深度取一页：
+- offset: list_all(page=N)，OFFSET (N-1)*size
+- cursor: list_by_cursor(cursor=第(N-1)*size条记录的游标)
+每种深度的total模式单独统计：exact / estimated / none。压测结束后删除压测记录。
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.core.pagination import (
+    CURSOR_NEXT, TOTAL_ESTIMATED, TOTAL_EXACT, TOTAL_NONE, count_rows, encode_cursor
+)
+from app.core.pq_db import AsyncSessionLocal
+from app.models.tenant import Tenant
+from app.repos.tenant import AsyncTenantRepo
+from benchmarks.common import cleanup_tenants, quiet_sql_logging, seed_tenants
+
+
+async def timed(call, repeat: int) -> float:
+    """重复执行并返回中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return round(samples[len(samples) // 2] * 1000, 2)
+
+
+async def cursor_at(offset: int) -> str:
+    """取第offset条记录（按created_at, id排序）的游标，不计入压测"""
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(Tenant.created_at, Tenant.id).order_by(Tenant.created_at, Tenant.id).offset(offset - 1).limit(1)
+        )).first()
+    return encode_cursor([row.created_at, row.id], CURSOR_NEXT)
+
+
+async def run(args):
+    depths = [page for page in (1, 10, 100, 1000, 5000) if (page - 1) * args.size < args.rows]
+    print(f"{'page':>6} {'offset(ms)':>12} {'cursor(ms)':>12}")
+    async with AsyncSessionLocal() as db:
+        repo = AsyncTenantRepo(db)
+        for page in depths:
+            cursor = await cursor_at((page - 1) * args.size) if page > 1 else None
+            offset_ms = await timed(lambda: repo.list_all(page, args.size, total_mode=TOTAL_NONE), args.repeat)
+            cursor_ms = await timed(lambda: repo.list_by_cursor(args.size, cursor, total_mode=TOTAL_NONE), args.repeat)
+            print(f"{page:>6} {offset_ms:>12} {cursor_ms:>12}")
+
+        print(f"\n{'total':>10} {'ms':>10} {'value':>10}")
+        for mode in (TOTAL_EXACT, TOTAL_ESTIMATED, TOTAL_NONE):
+            query = AsyncTenantRepo._filtered_query(status="active")
+            value = await count_rows(db, query, mode)
+            ms = await timed(lambda: count_rows(db, query, mode), args.repeat)
+            print(f"{mode:>10} {ms:>10} {str(value):>10}")
+
+
+def main(args):
+    quiet_sql_logging()
+    seed_tenants(args.rows)
+    try:
+        asyncio.run(run(args))
+    finally:
+        cleanup_tenants()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="压测租户记录数")
+    parser.add_argument("--size", type=int, default=20, help="每页数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每项重复次数（取中位数）")
+    main(parser.parse_args())
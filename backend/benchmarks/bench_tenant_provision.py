@@ -0,0 +1,115 @@
+"""
+租户schema开通压测：逐条DDL vs 模板克隆
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_provision --count 200 --workers 4
+
+- ddl:      改造前的流程，CREATE SCHEMA + 5条CREATE TABLE + 3条角色INSERT，逐条发送
+- template: 基于模板schema，调用 public.clone_tenant_schema 一次完成
+
+每次开通在独立事务中执行并提交，压测结束后删除所有压测schema。
+本地压测网络往返几乎为零，可用 --rtt-ms 为每条语句模拟网络往返延迟。
+"""
+import argparse
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, text
+
+from app.core.pq_db import SessionLocal, engine
+from app.core.tenant_template import DEFAULT_ROLES, TENANT_TABLES_DDL, TenantTemplateManager
+from benchmarks.common import quiet_sql_logging, summarize, print_report
+
+SCHEMA_PREFIX = "bench_provision_"
+
+
+def provision_with_ddl(db, schema_name: str) -> None:
+    """逐条发送DDL和种子数据"""
+    db.execute(text(f"CREATE SCHEMA {schema_name}"))
+    for ddl in TENANT_TABLES_DDL:
+        db.execute(text(ddl.format(schema=schema_name)))
+    for role in DEFAULT_ROLES:
+        db.execute(
+            text(f"INSERT INTO {schema_name}.roles (name, description, permissions, is_system) "
+                 f"VALUES (:name, :description, CAST(:permissions AS JSONB), true)"),
+            {**role, "permissions": json.dumps(role["permissions"])}
+        )
+
+
+def provision_with_template(db, schema_name: str) -> None:
+    """基于模板克隆"""
+    TenantTemplateManager(db).clone_into(schema_name)
+
+
+def run(mode: str, provision, count: int, workers: int):
+    """以固定线程数开通count个schema"""
+    def task(_):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            provision(db, f"{SCHEMA_PREFIX}{mode}_{uuid.uuid4().hex[:8]}")
+            db.commit()
+            return time.perf_counter() - start
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(task, range(count)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def simulate_rtt(rtt_ms: float) -> None:
+    """为每条语句增加固定延迟，模拟应用与数据库之间的网络往返"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _delay(*_):
+        time.sleep(rtt_ms / 1000)
+
+
+def cleanup() -> None:
+    """删除压测产生的schema"""
+    db = SessionLocal()
+    try:
+        schemas = db.execute(
+            text("SELECT nspname FROM pg_namespace WHERE nspname LIKE :prefix"),
+            {"prefix": SCHEMA_PREFIX.replace("_", r"\_") + "%"}
+        ).scalars().all()
+        for schema_name in schemas:
+            db.execute(text(f"DROP SCHEMA {schema_name} CASCADE"))
+            db.commit()
+    finally:
+        db.close()
+
+
+def main(args):
+    quiet_sql_logging()
+    db = SessionLocal()
+    try:
+        # 模板构建是一次性成本，不计入压测
+        TenantTemplateManager(db).ensure_template()
+    finally:
+        db.close()
+
+    if args.rtt_ms:
+        simulate_rtt(args.rtt_ms)
+
+    try:
+        ddl_stats = run("ddl", provision_with_ddl, args.count, args.workers)
+        print_report("ddl (逐条DDL)", ddl_stats)
+        template_stats = run("template", provision_with_template, args.count, args.workers)
+        print_report("template (模板克隆)", template_stats)
+        if ddl_stats["throughput_rps"]:
+            ratio = template_stats["throughput_rps"] / ddl_stats["throughput_rps"]
+            print(f"\n⚡ 每秒开通数提升: {ratio:.2f}x")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="每种方式开通的schema数量")
+    parser.add_argument("--workers", type=int, default=4, help="并发线程数")
+    parser.add_argument("--rtt-ms", type=float, default=0, help="模拟的单条语句网络往返延迟（毫秒）")
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+"""
+请求租户解析耗时
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_resolver --iterations 100000
+
+按请求来源统计 TenantResolver.resolve 的单次耗时：
+- host_hit:       自定义域名，Host缓存命中
+- subdomain_hit:  平台子域名，Host缓存命中
+- unknown_host:   未知Host（负缓存命中）后回退到 X-Tenant-ID 请求头
+- header:         不带点的Host（不查询）+ X-Tenant-ID 请求头
+- host_miss:      Host缓存未命中（经租户缓存，通常不产生SQL）
+- starlette_request: 对照，每请求构造 Request 并读取 headers / query_params 的耗时
+
+压测前写入1个压测租户，压测结束后删除。
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from app.core.pq_db import SessionLocal, async_engine
+from app.core.tenant_resolver import tenant_resolver
+from app.models.tenant import Tenant
+from benchmarks.bench_tenant_storage import cleanup, setup
+from benchmarks.common import print_report, quiet_sql_logging
+
+
+def make_scope(host: str, tenant_header: str = "", path: str = "/api/v1/audit-logs") -> dict:
+    headers = [(b"host", host.encode()), (b"user-agent", b"bench"), (b"accept", b"*/*")]
+    if tenant_header:
+        headers.append((b"x-tenant_id", tenant_header.encode()))
+    return {"type": "http", "method": "GET", "path": path, "query_string": b"page=1&size=20", "headers": headers}
+
+
+async def time_resolve(scope: dict, iterations: int, expected: str) -> float:
+    assert await tenant_resolver.resolve(scope) == expected
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await tenant_resolver.resolve(scope)
+    return (time.perf_counter() - start) / iterations
+
+
+async def bench(tenant_id: str, domain: str, iterations: int) -> dict:
+    results = {}
+    for label, scope in (
+        ("host_hit", make_scope(domain)),
+        ("subdomain_hit", make_scope(f"{tenant_id}.localhost:8000")),
+        ("unknown_host", make_scope("unknown.example.org", tenant_id)),
+        ("header", make_scope("localhost:8000", tenant_id)),
+    ):
+        results[f"{label}_us"] = round(await time_resolve(scope, iterations, tenant_id) * 1e6, 2)
+
+    scope = make_scope(domain)
+    misses = max(1, iterations // 100)
+    start = time.perf_counter()
+    for _ in range(misses):
+        tenant_resolver.cache.clear()
+        await tenant_resolver.resolve(scope)
+    results["host_miss_us"] = round((time.perf_counter() - start) / misses * 1e6, 2)
+
+    scope = make_scope("localhost:8000", tenant_id)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        request = Request(scope)
+        request.headers.get("host")
+        request.query_params.get("tenant_id")
+        request.headers.get("x-tenant_id")
+    results["starlette_request_us"] = round((time.perf_counter() - start) / iterations * 1e6, 2)
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="请求租户解析压测")
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        tenant_id, _ = setup(1, 1)[0]
+        with SessionLocal() as db:
+            domain = db.query(Tenant.domain).filter(Tenant.tenant_id == tenant_id).scalar()
+        print_report("resolve", asyncio.run(bench(tenant_id, domain, args.iterations)))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
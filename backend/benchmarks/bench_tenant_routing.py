@@ -0,0 +1,119 @@
+"""
+租户路由压测：SET search_path vs schema_translate_map
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_routing --tenants 500 --requests 5000
+
+- search_path: 改造前的方式，每个请求先 SET search_path 再查询
+- translate:   通过 schema_translate_map 执行选项路由，不发送SET语句
+
+每个请求随机选择一个租户，查询其users表并计数。
+报告吞吐、每请求语句数以及编译缓存条目数（应与租户数量无关）。
+"""
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import event, func, select, text
+
+from app.core.pq_db import SessionLocal, engine
+from app.core.tenant_routing import tenant_session
+from app.core.tenant_template import TenantTemplateManager
+from app.models.user import User
+from benchmarks.common import quiet_sql_logging, summarize, print_report
+
+SCHEMA_PREFIX = "bench_routing_"
+
+
+def setup(tenants: int) -> list:
+    """基于模板开通压测租户schema"""
+    schemas = []
+    db = SessionLocal()
+    try:
+        manager = TenantTemplateManager(db)
+        for _ in range(tenants):
+            schema_name = f"{SCHEMA_PREFIX}{uuid.uuid4().hex[:8]}"
+            manager.clone_into(schema_name)
+            db.commit()
+            schemas.append(schema_name)
+    finally:
+        db.close()
+    return schemas
+
+
+def request_search_path(schema_name: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text(f"SET search_path TO {schema_name}, public"))
+        db.execute(select(func.count()).select_from(User)).scalar()
+    finally:
+        db.close()
+
+
+def request_translate(schema_name: str) -> None:
+    db = tenant_session(schema_name)
+    try:
+        db.execute(select(func.count()).select_from(User)).scalar()
+    finally:
+        db.close()
+
+
+def run(request, schemas: list, requests: int) -> dict:
+    statements = 0
+
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    engine._compiled_cache.clear()
+    latencies = []
+    started = time.perf_counter()
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            request(random.choice(schemas))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    stats = summarize(latencies, time.perf_counter() - started)
+    stats["statements_per_request"] = round(statements / requests, 2)
+    stats["compiled_cache_entries"] = len(engine._compiled_cache)
+    return stats
+
+
+def cleanup() -> None:
+    """删除压测产生的schema"""
+    db = SessionLocal()
+    try:
+        schemas = db.execute(
+            text("SELECT nspname FROM pg_namespace WHERE nspname LIKE :prefix"),
+            {"prefix": SCHEMA_PREFIX.replace("_", r"\_") + "%"}
+        ).scalars().all()
+        for schema_name in schemas:
+            db.execute(text(f"DROP SCHEMA {schema_name} CASCADE"))
+            db.commit()
+    finally:
+        db.close()
+
+
+def main(args):
+    quiet_sql_logging()
+    try:
+        schemas = setup(args.tenants)
+        for name, request in (("search_path (SET + 查询)", request_search_path),
+                              ("translate (schema_translate_map)", request_translate)):
+            # 预热连接池
+            run(request, schemas, min(100, args.requests))
+            stats = run(request, schemas, args.requests)
+            print_report(name, stats)
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=500, help="压测租户schema数量")
+    parser.add_argument("--requests", type=int, default=5000, help="请求总数")
+    main(parser.parse_args())
@@ -0,0 +1,113 @@
+"""
+租户列表响应的序列化耗时（按每个租户折算）
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_serialize --sizes 20 100 1000
+
+对同一页ORM对象比较：
+- legacy:        改造前的路由：_format_tenant_response 转字典 -> 构造 TenantListResponse ->
+                 FastAPI 按 response_model 再校验并序列化（dump_json快速路径）
+- legacy_stdlib: 同上，但按旧版FastAPI的 jsonable_encoder + json.dumps 序列化
+- fast:          model_response：row_values 取ORM实例字典，TypeAdapter 校验一次并直接序列化
+- orjson:        参考值，只把 _format_tenant_response 的字典交给 orjson（不校验，需安装orjson）
+
+压测前写入压测租户记录，压测结束后删除。
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.pq_db import SessionLocal
+from app.core.responses import render_model, row_values
+from app.models.tenant import Tenant
+from app.schemas.tenant import TenantData, TenantListResponse
+from app.services.tenant.tenane_service import TenantService
+from benchmarks.common import cleanup_tenants, print_report, quiet_sql_logging, seed_tenants
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PAGINATION = {"page": 1, "size": 20, "total": 10000, "pages": 500, "next_cursor": None, "prev_cursor": None}
+
+
+def legacy_content(tenants: list) -> TenantListResponse:
+    return TenantListResponse(code=200, message="获取成功", data={
+        "tenants": [TenantService._format_tenant_response(tenant) for tenant in tenants],
+        "pagination": PAGINATION,
+    })
+
+
+async def render_legacy(field, tenants: list) -> bytes:
+    return await serialize_response(field=field, response_content=legacy_content(tenants), dump_json=True)
+
+
+async def render_legacy_stdlib(field, tenants: list) -> bytes:
+    content = await serialize_response(field=field, response_content=legacy_content(tenants))
+    return JSONResponse(content).body
+
+
+async def render_fast(field, tenants: list) -> bytes:
+    return render_model(TenantListResponse, {"code": 200, "message": "获取成功",
+                                             "data": {"tenants": [row_values(tenant, TenantData) for tenant in tenants],
+                                                      "pagination": PAGINATION}})
+
+
+async def render_orjson(field, tenants: list) -> bytes:
+    return orjson.dumps({"code": 200, "message": "获取成功", "data": {
+        "tenants": [TenantService._format_tenant_response(tenant) for tenant in tenants],
+        "pagination": PAGINATION,
+    }})
+
+
+async def bench(tenants: list, sizes: list, min_items: int) -> dict:
+    field = create_model_field("Response_list_tenants", TenantListResponse, mode="serialization")
+    variants = {"legacy": render_legacy, "legacy_stdlib": render_legacy_stdlib, "fast": render_fast}
+    if orjson is not None:
+        variants["orjson"] = render_orjson
+
+    import json
+    reference = json.loads(await render_legacy(field, tenants[:20]))
+    assert json.loads(await render_fast(field, tenants[:20])) == reference
+
+    results = {}
+    for size in sizes:
+        page = tenants[:size]
+        rounds = max(5, min_items // size)
+        report = {}
+        for label, render in variants.items():
+            await render(field, page)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await render(field, page)
+            report[f"{label}_us"] = round((time.perf_counter() - start) / rounds / size * 1e6, 2)
+        report["speedup"] = round(report["legacy_us"] / report["fast_us"], 2)
+        results[size] = report
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户列表序列化压测")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--min-items", type=int, default=200000, help="每种实现每个页大小至少序列化的租户数")
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup_tenants()
+    try:
+        seed_tenants(max(args.sizes))
+        with SessionLocal() as db:
+            tenants = db.query(Tenant).filter(Tenant.tenant_id.like("bench\\_%")).order_by(Tenant.id).all()
+            for size, report in asyncio.run(bench(tenants, args.sizes, args.min_items)).items():
+                print_report(f"page size {size} (us per tenant)", report)
+    finally:
+        cleanup_tenants()
+
+
+if __name__ == "__main__":
+    main()
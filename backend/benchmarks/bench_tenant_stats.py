@@ -0,0 +1,140 @@
+"""
+租户统计压测：每次请求COUNT(*) vs 读取统计汇总
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_stats --users 200000 --requests 200 --concurrency 10
+
+- 开通一个租户并写入 --users 个用户
+- count:  每次请求对租户users表做 count(*) / FILTER 统计
+- rollup: AsyncTenantService.get_tenant_stats，读取 public.tenant_stats 汇总行
+- writes: 逐条插入用户，分别在触发器关闭/开启时测量单条写入延迟
+
+压测结束后删除租户记录、schema和统计行。
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.core.password_hasher import password_hasher
+from app.core.pq_db import AsyncSessionLocal, async_engine, engine
+from app.core.rate_limit import current_period
+from app.core.tenant_stats import _month_start
+from app.schemas.tenant import TenantCreateRequest
+from app.services.tenant import AsyncTenantService
+from benchmarks.common import print_report, quiet_sql_logging, run_concurrent, summarize
+
+TENANT_NAME = "BenchStats"
+USER_TRIGGERS = ("users_stats_insert", "users_stats_update", "users_stats_delete")
+
+
+async def create_tenant(users: int):
+    async with AsyncSessionLocal() as db:
+        result = await AsyncTenantService(db).create_tenant(TenantCreateRequest(
+            name=TENANT_NAME, domain="stats.bench.example.com",
+            admin_user={"full_name": "Bench Admin", "email": "admin@bench-stats.com", "password": "Passw0rdX"},
+        ))
+    tenant = result["tenant"]
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"""
+            INSERT INTO {tenant['schema_name']}.users (user_id, username, email, hashed_password, status, created_at)
+            SELECT 'bench_' || g, 'user' || g, 'user' || g || '@bench-stats.com', 'x',
+                   (ARRAY['active', 'active', 'inactive', 'suspended'])[1 + g % 4]::public.user_status,
+                   now() - (g % 90) * interval '1 day'
+            FROM generate_series(1, :users) g
+        """), {"users": users})
+        await conn.execute(text(f"ANALYZE {tenant['schema_name']}.users"))
+    return tenant["tenant_id"], tenant["schema_name"]
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT tenant_id, schema_name FROM public.tenants WHERE name = :name"),
+                            {"name": TENANT_NAME}).all()
+        for tenant_id, schema_name in rows:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema_name} CASCADE"))
+            conn.execute(text("DELETE FROM public.tenant_stats WHERE tenant_id = :t"), {"t": tenant_id})
+        conn.execute(text("DELETE FROM public.tenants WHERE name = :name"), {"name": TENANT_NAME})
+
+
+async def bench_count(schema_name: str, requests: int, concurrency: int):
+    period = current_period()
+
+    async def call(i: int) -> bool:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text(
+                f"SELECT count(*), count(*) FILTER (WHERE status = 'active'), "
+                f"count(*) FILTER (WHERE created_at >= :since) FROM {schema_name}.users"
+            ), {"since": _month_start(period)})
+        return True
+
+    return await run_concurrent(call, requests, concurrency)
+
+
+async def bench_rollup(tenant_id: str, requests: int, concurrency: int):
+    async def call(i: int) -> bool:
+        async with AsyncSessionLocal() as db:
+            return await AsyncTenantService(db).get_tenant_stats(tenant_id) is not None
+
+    return await run_concurrent(call, requests, concurrency)
+
+
+async def bench_writes(schema_name: str, writes: int, triggers: bool, offset: int):
+    action = "ENABLE" if triggers else "DISABLE"
+    async with async_engine.begin() as conn:
+        for name in USER_TRIGGERS:
+            await conn.execute(text(f"ALTER TABLE {schema_name}.users {action} TRIGGER {name}"))
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(offset, offset + writes):
+        start = time.perf_counter()
+        async with async_engine.begin() as conn:
+            await conn.execute(text(
+                f"INSERT INTO {schema_name}.users (user_id, username, email, hashed_password) "
+                f"VALUES (:user_id, :user_id, :user_id, 'x')"
+            ), {"user_id": f"write_{i}"})
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def main_async(args) -> None:
+    tenant_id, schema_name = await create_tenant(args.users)
+    async with AsyncSessionLocal() as db:
+        stats = await AsyncTenantService(db).get_tenant_stats(tenant_id)
+    print(f"   {'user_stats':<24}{stats['user_stats']}")
+
+    print_report(f"count x{args.requests} ({args.users} users)",
+                 await bench_count(schema_name, args.requests, args.concurrency))
+    print_report(f"rollup x{args.requests} ({args.users} users)",
+                 await bench_rollup(tenant_id, args.requests, args.concurrency))
+    print_report(f"writes x{args.writes} (triggers off)", await bench_writes(schema_name, args.writes, False, 0))
+    print_report(f"writes x{args.writes} (triggers on)", await bench_writes(schema_name, args.writes, True, args.writes))
+
+    async with AsyncSessionLocal() as db:
+        stats = await AsyncTenantService(db).get_tenant_stats(tenant_id)
+    # 关闭触发器期间的写入不计入汇总，需后台校正修正
+    print(f"   {'user_stats (before fix)':<24}{stats['user_stats']}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户统计压测")
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+
+    quiet_sql_logging()
+    cleanup()
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        password_hasher.shutdown()
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
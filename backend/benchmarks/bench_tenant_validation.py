@@ -0,0 +1,108 @@
+"""
+租户注册请求的校验吞吐
+
+用法（在backend目录下）:
+    python -m benchmarks.bench_tenant_validation --rows 20000
+    python -m benchmarks.bench_tenant_validation --min-rows-per-sec 50000   # 低于阈值时退出码为1
+
+批量导入逐行执行 TenantCreateRequest.model_validate，本压测只统计这一步（不连接数据库）：
+- valid:   全部合法的行
+- invalid: 每行有一个字段不合法（邮箱、手机号、域名、密码复杂度、套餐、用户数轮换）
+- mixed:   每10行中1行不合法，接近实际导入文件
+"""
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List
+
+from pydantic import ValidationError
+
+from app.schemas.tenant import TenantCreateRequest
+from benchmarks.common import print_report
+
+PLAN_TYPES = ("basic", "pro", "enterprise")
+
+# 每种不合法行只改动一个字段
+INVALID_MUTATIONS: List[Callable[[dict], None]] = [
+    lambda row: row["admin_user"].update(email="not-an-email"),
+    lambda row: row["admin_user"].update(phone="12345"),
+    lambda row: row.update(domain="-bad-.example.com"),
+    lambda row: row["admin_user"].update(password="alllowercase1"),
+    lambda row: row.update(plan_type="gold"),
+    lambda row: row.update(max_users=5),
+]
+
+
+def valid_row(i: int) -> dict:
+    return {
+        "name": f"Bench Co {i}",
+        "domain": f"co{i}.bench-validate.example.com",
+        "plan_type": PLAN_TYPES[i % len(PLAN_TYPES)],
+        "max_users": 50,
+        "admin_user": {"full_name": "Bench Admin", "email": f"admin{i}@bench-validate.com",
+                       "phone": "13800138000", "password": "Passw0rdX"},
+    }
+
+
+def invalid_row(i: int) -> dict:
+    row = valid_row(i)
+    INVALID_MUTATIONS[i % len(INVALID_MUTATIONS)](row)
+    return row
+
+
+def build_rows(workload: str, count: int) -> List[dict]:
+    if workload == "valid":
+        return [valid_row(i) for i in range(count)]
+    if workload == "invalid":
+        return [invalid_row(i) for i in range(count)]
+    return [invalid_row(i) if i % 10 == 0 else valid_row(i) for i in range(count)]
+
+
+def validate_all(rows: List[dict]) -> int:
+    """逐行校验，返回不合法的行数"""
+    failed = 0
+    for row in rows:
+        try:
+            TenantCreateRequest.model_validate(row)
+        except ValidationError:
+            failed += 1
+    return failed
+
+
+def bench(workload: str, count: int, rounds: int) -> Dict[str, float]:
+    rows = build_rows(workload, count)
+    failed = validate_all(rows)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        validate_all(rows)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "rows": count,
+        "failed": failed,
+        "rows_per_sec": round(count / best),
+        "us_per_row": round(best / count * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="租户注册请求校验吞吐压测")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5, help="每种负载重复次数，取最快一次")
+    parser.add_argument("--min-rows-per-sec", type=float, default=0,
+                        help="任一负载吞吐低于该值时以退出码1结束（0表示不检查）")
+    args = parser.parse_args()
+
+    regressions = []
+    for workload in ("valid", "invalid", "mixed"):
+        report = bench(workload, args.rows, args.rounds)
+        print_report(workload, report)
+        if report["rows_per_sec"] < args.min_rows_per_sec:
+            regressions.append(f"{workload}: {report['rows_per_sec']} rows/s < {args.min_rows_per_sec:g}")
+    if regressions:
+        print("\n❌ 性能回退:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+压测公共工具：并发驱动与延迟统计
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List
+
+
+def quiet_sql_logging() -> None:
+    """关闭SQL回显，避免日志IO干扰压测结果"""
+    from app.core.pq_db import engine, async_engine
+
+    engine.echo = False
+    async_engine.echo = False
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """计算已排序序列的百分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """
+    汇总延迟数据
+
+    Args:
+        latencies: 单次请求耗时（秒）
+        elapsed: 总耗时（秒）
+        errors: 失败次数
+
+    Returns:
+        吞吐量与p50/p95/p99（毫秒）
+    """
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+async def run_concurrent(call: Callable[[int], Awaitable[bool]], total: int, concurrency: int) -> Dict[str, float]:
+    """
+    以固定并发度执行total次调用
+
+    Args:
+        call: 单次调用，参数为序号，返回是否成功
+        total: 总调用次数
+        concurrency: 并发度
+
+    Returns:
+        summarize() 的统计结果
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            ok = await call(i)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def print_report(title: str, stats: Dict[str, float]) -> None:
+    """打印单组压测结果"""
+    print(f"📊 {title}")
+    for key, value in stats.items():
+        print(f"   {key:<24}{value}")
+
+
+# 压测租户记录的tenant_id前缀，清理时按此前缀删除
+BENCH_TENANT_PREFIX = "bench_"
+
+_NAME_WORDS = [
+    "Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Soylent", "Tyrell",
+    "Cyberdyne", "Aperture", "Wonka", "Gringotts", "Oscorp", "Massive", "Dynamic", "Pied", "Piper", "Monarch",
+]
+_NAME_SUFFIXES = ["科技", "网络", "信息", "数据", "软件", "云计算", "智能", "传媒", "咨询", "电子"]
+
+
+def seed_tenants(count: int, created_from: str = "2020-01-01") -> None:
+    """
+    批量写入压测租户记录（只写public.tenants，不创建schema）
+
+    在服务端用generate_series生成数据；事务内关闭触发器，避免逐行发送缓存失效通知。
+
+    Args:
+        count: 记录数
+        created_from: created_at起始时间，之后每条递增1秒
+    """
+    from sqlalchemy import text
+    from app.core.pq_db import engine
+
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL session_replication_role = replica"))
+        conn.execute(
+            text("""
+            INSERT INTO public.tenants
+                (tenant_id, name, domain, status, plan_type, max_users, max_storage, settings, schema_name, created_at)
+            SELECT
+                :prefix || i,
+                (:words)[1 + i % 20] || ' ' || (:words)[1 + (i / 20) % 20] || (:suffixes)[1 + (i / 400) % 10] || ' ' || i,
+                lower((:words)[1 + i % 20]) || i || '.example.com',
+                (ARRAY['pending', 'active', 'active', 'active', 'suspended', 'inactive'])[1 + i % 6]::tenant_status,
+                (ARRAY['basic', 'basic', 'basic', 'pro', 'enterprise'])[1 + i % 5]::tenant_plan_type,
+                10, 1073741824, '{}'::jsonb,
+                'tenant_' || :prefix || i,
+                CAST(:created_from AS timestamptz) + i * interval '1 second'
+            FROM generate_series(1, :count) AS i
+            """),
+            {"prefix": BENCH_TENANT_PREFIX, "words": _NAME_WORDS, "suffixes": _NAME_SUFFIXES,
+             "count": count, "created_from": created_from}
+        )
+        conn.execute(text("ANALYZE public.tenants"))
+
+
+def cleanup_tenants() -> None:
+    """删除压测租户记录"""
+    from sqlalchemy import text
+    from app.core.pq_db import engine
+
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL session_replication_role = replica"))
+        conn.execute(
+            text("DELETE FROM public.tenants WHERE tenant_id LIKE :prefix"),
+            {"prefix": BENCH_TENANT_PREFIX.replace("_", r"\_") + "%"}
+        )
+        conn.execute(text("ANALYZE public.tenants"))